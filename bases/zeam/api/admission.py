@@ -0,0 +1,181 @@
+"""
+Admission control of the API.
+
+Requests of each route class share a number of slots in flight. A request
+that finds them taken waits in line for at most ADMISSION_QUEUE_MS, then is
+shed: served a degraded response built from memory when its route class has
+one, otherwise answered 503 with Retry-After. Admin routes also yield to
+recommend traffic: they are shed while recommend requests wait in line or
+use ADMISSION_ADMIN_YIELD_FRACTION of their slots. Limits are per process.
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from zeam.config.core import settings
+
+logger = logging.getLogger(__name__)
+
+# Builds the response of a shed request without I/O; None when it has nothing to serve
+DegradedResponder = Callable[[Request], Awaitable[Optional[Response]]]
+
+
+class RouteClass:
+    RECOMMEND = "recommend"
+    EVENTS = "events"
+    ADMIN = "admin"
+
+
+# Route class of each path prefix; other paths (health, profiles) are never limited
+ROUTE_PREFIXES = [
+    ("/api/v1/recommend", RouteClass.RECOMMEND),
+    ("/api/v1/events", RouteClass.EVENTS),
+    ("/api/redis", RouteClass.ADMIN),
+    ("/api/scheduler", RouteClass.ADMIN),
+]
+
+
+def classify(path: str) -> Optional[str]:
+    return next((route_class for prefix, route_class in ROUTE_PREFIXES if path.startswith(prefix)), None)
+
+
+class AdmissionLimiter:
+    """
+    At most `limit` holders at once (0 for no limit), handing released slots
+    to waiting requests in arrival order; waiters that time out leave the
+    line. Waiters are futures of the running event loop, so one limiter can
+    serve several loops (e.g. in tests).
+    """
+
+    def __init__(self, limit: int, queue_ms: int):
+        self.limit = limit
+        self.queue_ms = queue_ms
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.degraded = 0
+        self.rejected = 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def busy(self, fraction: float = 1.0) -> bool:
+        """Requests are waiting, or at least `fraction` of the slots are held."""
+        if not self.limit:
+            return False
+        return self.waiting > 0 or self.in_flight >= self.limit * fraction
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting up to `queue_ms`; False when the request should be shed."""
+        if not self.limit or (self.in_flight < self.limit and not self.waiting):
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if self.queue_ms <= 0:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_ms / 1000)
+        except asyncio.TimeoutError:
+            # Handed a slot in the same loop tick as the timeout: the request holds it
+            if waiter.done() and not waiter.cancelled():
+                self.admitted += 1
+                return True
+            return False
+        except asyncio.CancelledError:
+            # Handed a slot just as the request was cancelled: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Give the slot to the first live waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.degraded + self.rejected,
+            "shed_degraded": self.degraded,
+            "shed_rejected": self.rejected,
+        }
+
+
+limiters: Dict[str, AdmissionLimiter] = {
+    RouteClass.RECOMMEND: AdmissionLimiter(settings.ADMISSION_RECOMMEND_CONCURRENCY, settings.ADMISSION_QUEUE_MS),
+    RouteClass.EVENTS: AdmissionLimiter(settings.ADMISSION_EVENTS_CONCURRENCY, settings.ADMISSION_QUEUE_MS),
+    # Admin requests never wait: they are cheap to retry and must not hold slots in line
+    RouteClass.ADMIN: AdmissionLimiter(settings.ADMISSION_ADMIN_CONCURRENCY, 0),
+}
+
+
+async def _admit(route_class: str) -> bool:
+    if route_class == RouteClass.ADMIN and limiters[RouteClass.RECOMMEND].busy(settings.ADMISSION_ADMIN_YIELD_FRACTION):
+        return False
+    return await limiters[route_class].acquire()
+
+
+def overloaded_response() -> Response:
+    return JSONResponse(
+        {"detail": "Service overloaded, retry later"},
+        status_code=503,
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+    )
+
+
+def admission_middleware(degraded: Optional[Dict[str, DegradedResponder]] = None):
+    """
+    HTTP middleware admitting requests per route class; shed requests get the
+    response of their class's `degraded` responder, if it has one to serve.
+    """
+    degraded = degraded or {}
+
+    async def admit_requests(request: Request, call_next):
+        route_class = classify(request.url.path)
+        if route_class is None:
+            return await call_next(request)
+
+        limiter = limiters[route_class]
+        if not await _admit(route_class):
+            responder = degraded.get(route_class)
+            response = await responder(request) if responder else None
+            if response is not None:
+                limiter.degraded += 1
+                return response
+            limiter.rejected += 1
+            logger.debug(f"Shed {request.method} {request.url.path}: {limiter.in_flight} {route_class} requests in flight")
+            return overloaded_response()
+
+        try:
+            return await call_next(request)
+        finally:
+            limiter.release()
+
+    return admit_requests
+
+
+def admission_stats() -> Dict[str, Dict[str, Any]]:
+    """Slots, queue and shed counts of every route class."""
+    return {route_class: limiter.summary() for route_class, limiter in limiters.items()}
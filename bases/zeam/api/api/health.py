@@ -1,7 +1,10 @@
 import asyncio
 import logging
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Response
+from zeam.api.admission import admission_stats
+from zeam.api.prober import HealthProber
+from zeam.config.core import settings
 from zeam.redshift import health_check as redshift_health_check
 from zeam.redis_client import ping
 
@@ -9,28 +12,55 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+async def _probe_redis():
+    if not await ping():
+        raise ConnectionError("Redis did not answer PING")
+
+
+async def _probe_redshift():
+    # Connect + SELECT 1, off the event loop; the driver gives up at the probe timeout
+    await asyncio.to_thread(redshift_health_check, settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+
+
+prober = HealthProber({
+    "redis": (_probe_redis, settings.HEALTH_REDIS_PROBE_INTERVAL_SECONDS),
+    "redshift": (_probe_redshift, settings.HEALTH_REDSHIFT_PROBE_INTERVAL_SECONDS),
+})
+
+
 @router.get("/")
 async def health_check():
     return {"status": "ok"}
 
 
+@router.get("/live")
+async def liveness():
+    """The process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness(response: Response):
+    """Ready to serve recommendations: the latest Redis probe succeeded."""
+    redis_status = prober.stats["redis"].status
+    if redis_status != "ok":
+        response.status_code = 503
+    return {"status": "ok" if redis_status == "ok" else "unavailable", "redis": redis_status}
+
+
 @router.get("/connections")
 async def health_connections():
-    redis_status = "error"
-    redshift_status = "error"
-
-    # Redis: ping with a short timeout
-    try:
-        await asyncio.wait_for(ping(), timeout=1.0)
-        redis_status = "ok"
-    except Exception as e:
-        logger.warning("Redis health check failed: %s", e)
-
-    # Redshift/Postgres: connect + SELECT 1
-    try:
-        redshift_health_check()
-        redshift_status = "ok"
-    except Exception as e:
-        logger.warning("Database health check failed: %s", e)
-
-    return {"redis": redis_status, "redshift": redshift_status}
+    """Latest status of each dependency, from the background probes."""
+    return {name: await prober.status(name) for name in prober.probes}
+
+
+@router.get("/stats")
+async def health_stats():
+    """Status, latency and error rate of the recent probes of each dependency."""
+    return {name: stats.summary() for name, stats in prober.stats.items()}
+
+
+@router.get("/admission")
+async def health_admission():
+    """Requests in flight, waiting and shed (served degraded or rejected) per route class of this process."""
+    return admission_stats()
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from zeam.profiling import (
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    PROFILE_QUERY_PARAMETER,
+    SamplingProfiler,
+    get_profile,
+    is_profile_token,
+    list_profiles,
+    request_profiling_enabled,
+    save_profile,
+)
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+async def profile_requests(request: Request, call_next):
+    """
+    Middleware profiling the requests that carry the profiling token; only
+    installed when PROFILING_ENABLED. Samples the event loop thread, so work
+    sent to other threads shows up as waiting, and concurrent requests
+    share the profile.
+    """
+    token = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAMETER)
+    if not is_profile_token(token):
+        return await call_next(request)
+
+    with SamplingProfiler() as profiler:
+        response = await call_next(request)
+    try:
+        profile_id = await asyncio.to_thread(
+            save_profile, f"{request.method} {request.url.path}", profiler, status_code=response.status_code
+        )
+    except Exception as e:
+        logger.warning(f"Could not save the profile of {request.url.path}: {e}")
+    else:
+        response.headers[PROFILE_ID_HEADER] = profile_id
+    return response
+
+
+def _check_token(token: Optional[str]) -> None:
+    if not request_profiling_enabled():
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not is_profile_token(token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@router.get("/")
+async def profiles(
+    x_profile: Optional[str] = Header(default=None),
+    profile: Optional[str] = Query(default=None, description="Profiling token"),
+):
+    """
+    Stored profiles, most recent first.
+    """
+    _check_token(x_profile or profile)
+    return {"profiles": await asyncio.to_thread(list_profiles)}
+
+
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+async def profile_stacks(
+    profile_id: str,
+    x_profile: Optional[str] = Header(default=None),
+    profile: Optional[str] = Query(default=None, description="Profiling token"),
+):
+    """
+    Sampled stacks of a profile in the collapsed format of flamegraph.pl and speedscope.
+    """
+    _check_token(x_profile or profile)
+    stacks = await asyncio.to_thread(get_profile, profile_id)
+    if stacks is None:
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found")
+    return stacks
@@ -1,46 +1,278 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
-from celery import Celery
-import os
+from fastapi import APIRouter, HTTPException, Query
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+import asyncio
 
-from zeam.worker_registry.core import WORKER_NAMES
+from zeam.api.schemas import BackfillRequest, BulkRunRequest, TaskStatusRequest
+from zeam.redis_client.config import RedisRole, settings as redis_settings
+from zeam.worker_registry.backfill import create_backfill, get_backfill, list_backfills, prepare_resume, stop_backfill
+from zeam.worker_registry.core import WORKER_NAMES, WorkerNames
+from zeam.worker_registry.dispatch import (
+    expand_job_args,
+    get_group_task_ids,
+    get_task_states,
+    record_group,
+    summarize_states,
+)
+from zeam.worker_registry.ledger import get_runs
+from zeam.worker_registry.queues import (
+    QueueNames,
+    get_celery_queue_config,
+    get_queue_report,
+    get_send_options,
+    stamp_enqueued_at,
+)
 
 router = APIRouter()
 
-# Create Celery app instance to send tasks
-# This doesn't import the scheduler package, just creates a client
-redis_host = os.getenv("REDIS_HOST", "localhost")
-redis_port = os.getenv("REDIS_PORT", "6379")
-redis_db = os.getenv("REDIS_DB", "0")
 
-celery_app = Celery(
-    "scheduler",
-    broker=f"redis://{redis_host}:{redis_port}/{redis_db}",
-    backend=f"redis://{redis_host}:{redis_port}/{redis_db}"
-)
+@lru_cache(maxsize=1)
+def get_celery_app():
+    """
+    Celery app instance used to send tasks, created on first use.
+    This doesn't import the scheduler package, just creates a client;
+    Celery itself is only imported when a task is first triggered.
+    """
+    from celery import Celery
+    from celery.signals import before_task_publish
+
+    app = Celery(
+        "scheduler",
+        broker=redis_settings.url_for(RedisRole.BROKER),
+        backend=redis_settings.url_for(RedisRole.RESULTS)
+    )
+    app.conf.update(**get_celery_queue_config())
+    before_task_publish.connect(stamp_enqueued_at, weak=False)
+    return app
 
 # Map of worker names to their Celery task names
 TASK_NAMES: Dict[str, str] = {
 
 }
 
-@router.post("/run/{worker_name}")
-async def run_worker(worker_name: str, request: Dict[str, Any]):
-    """
-    Trigger a Celery worker task by name.
-    The task runs asynchronously via Celery.
-    """
+def _check_worker(worker_name: str, queue: Optional[str]) -> Dict[str, Any]:
     if worker_name not in WORKER_NAMES:
         raise HTTPException(
             status_code=404,
             detail=f"Worker '{worker_name}' not found. Available workers: {WORKER_NAMES}"
         )
 
-    # Send task to Celery via the message broker
-    result = celery_app.send_task(worker_name, kwargs=request)
+    try:
+        return get_send_options(worker_name, queue)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _send_group(worker_name: str, jobs: List[Dict[str, Any]], options: Dict[str, Any]):
+    """
+    Publish one message per job through a single producer connection.
+    """
+    from celery import group
+
+    app = get_celery_app()
+    tasks = group(app.signature(worker_name, kwargs=job, **options) for job in jobs)
+    with app.producer_or_acquire() as producer:
+        return tasks.apply_async(producer=producer)
+
+@router.post("/run/{worker_name}")
+async def run_worker(
+    worker_name: str,
+    request: Dict[str, Any],
+    queue: Optional[str] = Query(default=QueueNames.INTERACTIVE, description="Queue to run the task on"),
+):
+    """
+    Trigger a Celery worker task by name.
+    The task runs asynchronously via Celery, on the interactive queue unless another one is chosen.
+    """
+    options = _check_worker(worker_name, queue)
+
+    # Send task to Celery via the message broker, off the event loop
+    result = await asyncio.to_thread(get_celery_app().send_task, worker_name, kwargs=request, **options)
 
     return {
         "message": f"Worker '{worker_name}' triggered",
         "task_id": result.id,
+        "queue": options["queue"],
         "status": "pending"
     }
+
+
+@router.post("/run/{worker_name}/bulk")
+async def run_worker_bulk(
+    worker_name: str,
+    request: BulkRunRequest,
+    queue: Optional[str] = Query(default=QueueNames.BACKFILL, description="Queue to run the tasks on"),
+):
+    """
+    Trigger one task per DMA × date window as a Celery group.
+    Runs on the backfill queue unless another one is chosen.
+    """
+    options = _check_worker(worker_name, queue)
+
+    try:
+        jobs = expand_job_args(request.args, request.dma_ids, request.start_date, request.end_date, request.window_days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await asyncio.to_thread(_send_group, worker_name, jobs, options)
+    task_ids = [task.id for task in result.results]
+    try:
+        await record_group(result.id, task_ids)
+    except Exception:
+        # The tasks are queued either way; only the group lookup is lost
+        group_recorded = False
+    else:
+        group_recorded = True
+
+    return {
+        "message": f"Worker '{worker_name}' triggered for {len(jobs)} argument sets",
+        "group_id": result.id,
+        "task_ids": task_ids,
+        "group_recorded": group_recorded,
+        "queue": options["queue"],
+        "status": "pending"
+    }
+
+
+@router.post("/status")
+async def task_status(request: TaskStatusRequest):
+    """
+    States of many tasks, read from the result backend in one round trip.
+    """
+    try:
+        states = await get_task_states(request.task_ids)
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+    return {"summary": summarize_states(states), "tasks": states}
+
+
+@router.get("/groups/{group_id}")
+async def group_status(group_id: str):
+    """
+    States of the tasks of a bulk dispatch.
+    """
+    try:
+        task_ids = await get_group_task_ids(group_id)
+        states = await get_task_states(task_ids)
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+    if not task_ids:
+        raise HTTPException(status_code=404, detail=f"Group '{group_id}' not found")
+    return {"group_id": group_id, "summary": summarize_states(states), "tasks": states}
+
+
+@router.post("/revoke/{task_id}")
+async def revoke_task(task_id: str):
+    """
+    Revoke a task; a running task receives SIGUSR1, which raises SoftTimeLimitExceeded
+    in it and cancels its warehouse statement.
+    """
+    await asyncio.to_thread(get_celery_app().control.revoke, task_id, terminate=True, signal="SIGUSR1")
+    return {"task_id": task_id, "status": "revoked"}
+
+
+@router.get("/runs")
+async def run_ledger(
+    count: int = Query(default=100, ge=1, le=1000, description="Number of most recent runs to read"),
+    task: Optional[str] = Query(default=None, description="Only runs of this worker"),
+    status: Optional[str] = Query(default=None, description="Only runs with this status (success, failure, ...)"),
+):
+    """
+    Most recent task runs from the run ledger.
+    """
+    try:
+        runs = await get_runs(count, task, status)
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+    return {"runs": runs}
+
+
+@router.get("/queues")
+async def queue_report():
+    """
+    Depth and recent wait-time statistics of every task queue.
+    """
+    try:
+        return await get_queue_report()
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+
+
+async def _send_backfill_slice(backfill_id: str) -> None:
+    name = WorkerNames.CURATED_CONTENT_BACKFILL
+    await asyncio.to_thread(get_celery_app().send_task, name, kwargs={"backfill_id": backfill_id}, **get_send_options(name))
+
+
+@router.post("/backfills")
+async def start_backfill(request: BackfillRequest):
+    """
+    Backfill curated content popularity for DMAs × date windows of a range.
+    Chunks run in checkpointed slices on the backfill queue, throttled on warehouse queue time.
+    """
+    try:
+        backfill = await create_backfill(
+            request.start_date, request.end_date, request.dma_ids, request.window_days, request.item_count, request.max_concurrency
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+
+    await _send_backfill_slice(backfill["backfill_id"])
+    return backfill
+
+
+@router.get("/backfills")
+async def backfills(count: int = Query(default=20, ge=1, le=100, description="Number of most recent backfills to read")):
+    """
+    Most recent backfills with their progress, throughput and ETA.
+    """
+    try:
+        return {"backfills": await list_backfills(count)}
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+
+
+@router.get("/backfills/{backfill_id}")
+async def backfill_status(backfill_id: str):
+    """
+    Progress, throughput, ETA and failed chunks of a backfill.
+    """
+    try:
+        backfill = await get_backfill(backfill_id)
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+    if backfill is None:
+        raise HTTPException(status_code=404, detail=f"Backfill '{backfill_id}' not found")
+    return backfill
+
+
+@router.post("/backfills/{backfill_id}/stop")
+async def request_backfill_stop(backfill_id: str):
+    """
+    Stop a backfill after the wave it is running; it can be resumed from there.
+    """
+    try:
+        backfill = await stop_backfill(backfill_id)
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+    if backfill is None:
+        raise HTTPException(status_code=404, detail=f"Backfill '{backfill_id}' not found")
+    return backfill
+
+
+@router.post("/backfills/{backfill_id}/resume")
+async def resume_backfill(backfill_id: str):
+    """
+    Resume a stopped or failed backfill from its last checkpoint.
+    """
+    try:
+        backfill = await prepare_resume(backfill_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+    if backfill is None:
+        raise HTTPException(status_code=404, detail=f"Backfill '{backfill_id}' not found")
+
+    await _send_backfill_slice(backfill_id)
+    return backfill
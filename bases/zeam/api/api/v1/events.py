@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException
+from zeam.api.schemas import PlaybackEventBatch
+from zeam.config.core import settings
+from zeam.worker_registry.live_popularity import ingest_events_async
+
+router = APIRouter()
+
+
+@router.post("/events", status_code=202)
+async def ingest_playback_events(batch: PlaybackEventBatch):
+    """
+    Apply a batch of playback events to the live popularity scores in one
+    Redis round trip. Events too old for the live rankings are dropped.
+    """
+    if len(batch.events) > settings.LIVE_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {settings.LIVE_MAX_BATCH} events per batch")
+
+    events = [event.model_dump(mode="json") for event in batch.events]
+    accepted = await ingest_events_async(events)
+    return {"received": len(events), "accepted": accepted}
@@ -1,8 +1,15 @@
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from zeam.api.fallback import SERVED_FROM_HEADER, Budget, ServedFrom, call_with_budget, last_known, most_degraded, serve_with_fallbacks
+from zeam.api.http_cache import cache_headers, etag_matches, known_version, make_etag, make_version_etag
 from zeam.api.schemas import (
+    ContentType,
+    RecommendationQuery,
     RecommendationRequest,
     RecommendationResponse,
     CuratedRecommendationResponse,
@@ -10,95 +17,361 @@ from zeam.api.schemas import (
     CuratedRecommendationRequest
 )
 
-from zeam.redis_client import get_json
+from zeam.config.core import settings
+from zeam.geo import resolve_dma
+from zeam.redis_client import get_many_versioned_json, get_versioned_json
+from zeam.worker_registry.aliases import AliasCache, AliasKind, resolve_current_week
+from zeam.worker_registry.content_popularity import get_content_popularity_redis_key, get_segment_fallbacks, get_segment_suffix
 from zeam.worker_registry.curated_content import get_curated_content_redis_key
+from zeam.worker_registry.live_popularity import get_live_rankings
+from zeam.worker_registry.seen import drop_seen, get_seen_bitmap
+from zeam.worker_registry.trending import get_trending_redis_key
+from zeam.worker_registry.windows import previous_week_window
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Windows served when a request gives no dates, per segment
+current_week_aliases = AliasCache(settings.ALIAS_CACHE_SECONDS)
+
+DEFAULT_ITEMS = 10
+# Live rankings move by the minute; clients and edge caches keep them briefly
+LIVE_MAX_AGE_SECONDS = 10
+# Live candidates read per item served, leaving room to drop items a device already watched
+SEEN_OVERFETCH = 3
+# POST responses are never stored or revalidated (a 304 only answers GET/HEAD,
+# RFC 9110 §13.1.2); the cacheable variants are served by the GET routes
+NO_STORE_HEADERS = {"Cache-Control": "no-store"}
+
+# Key of each list served by /recommend/{content_type}, by window and DMA
+CONTENT_LIST_KEYS = {
+    "curated": get_curated_content_redis_key,
+    "trending": get_trending_redis_key,
+}
+
+# RecommendationResponse field filled by each content type
+CONTENT_TYPE_FIELDS = {
+    ContentType.CHANNEL: "channels",
+    ContentType.SHOW: "shows",
+    ContentType.VOD: "vods",
+    ContentType.CLIP: "clips",
+    ContentType.LIVE_EVENT: "live_events",
+}
+
+
+def _resolve_dma(request: Union[RecommendationRequest, RecommendationQuery]) -> Optional[int]:
+    if request.dmaid is None and request.latitude is not None and request.longitude is not None:
+        return resolve_dma(request.latitude, request.longitude)
+    return request.dmaid
+
+
+async def _seen_bitmap(device_id: Optional[str]) -> bytes:
+    """The device's "already watched" filter; empty without a device, when disabled or Redis can't answer in time."""
+    if not device_id or not settings.SEEN_FILTER_ENABLED:
+        return b""
+    return await call_with_budget(lambda: get_seen_bitmap(device_id), Budget()) or b""
+
+
+def _drop_seen(lists: Dict[str, Any], seen: bytes) -> Tuple[Dict[str, Any], List[str]]:
+    """Lists without the items in the filter, and the dropped items (for the ETag)."""
+    unseen = {name: drop_seen(items or [], seen) for name, items in lists.items()}
+    dropped = [
+        f"{item.get('type')}:{item.get('id')}"
+        for name, items in lists.items()
+        for item in items or []
+        if item not in unseen[name]
+    ]
+    return unseen, dropped
+
+
+def _parse_items(items_data: Any, limit: int) -> List[ContentItem]:
+    return [ContentItem(**item_dict) for item_dict in items_data[:limit]]
+
+
+async def _read_single(keys: List[str], known_version: Optional[str] = None) -> List[Tuple[Optional[str], Any]]:
+    # Single-key read that skips the payload when the client holds the current version
+    return [await get_versioned_json(keys[0], known_version)]
+
+
+async def overloaded_recommendations(request: Request) -> Optional[Response]:
+    """
+    Response to a recommend request shed by admission control: the global
+    lists of the current window from the last-known-good copy, without
+    Redis reads, the request body or the device filter. None when this
+    process holds no copy.
+    """
+    route = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+    aliases = current_week_aliases.peek()
+
+    if route in CONTENT_LIST_KEYS:
+        window = resolve_current_week(aliases, AliasKind.CURATED, "global")
+        _, items_data = last_known(CONTENT_LIST_KEYS[route](*window))
+        if not items_data:
+            return None
+        body = CuratedRecommendationResponse(items=_parse_items(items_data, DEFAULT_ITEMS))
+    elif route in ("recommend", "live"):
+        window = resolve_current_week(aliases, AliasKind.POPULARITY, "global")
+        body = RecommendationResponse()
+        for content_type, field in CONTENT_TYPE_FIELDS.items():
+            _, items_data = last_known(get_content_popularity_redis_key(content_type.value, *window))
+            if items_data:
+                setattr(body, field, _parse_items(items_data, DEFAULT_ITEMS))
+        if body == RecommendationResponse():
+            return None
+    else:
+        return None
+
+    headers = cache_headers(degraded=True) if request.method == "GET" else dict(NO_STORE_HEADERS)
+    headers[SERVED_FROM_HEADER] = ServedFrom.GLOBAL
+    return JSONResponse(jsonable_encoder(body), headers=headers)
+
+
+async def _recommendations(
+    request: Union[RecommendationRequest, RecommendationQuery],
+    response: Response,
+    if_none_match: Optional[str] = None,
+    cacheable: bool = False,
+):
+    """
+    Popular content recommendations of every content type based on user context.
+    All content types and audience segments are read in one Redis round trip, and each
+    list falls back from the request's DMA + platform segment to its DMA, its platform
+    and the global one (see the segment cube).
+    Each segment is read at the window its current week alias points to.
+    Without an explicit DMA id, the DMA is resolved from the request coordinates.
+    When Redis can't answer within the latency budget, lists are served from the
+    last-known-good copy or the previous window. Items the device already watched
+    are dropped, using its Bloom filter read concurrently with the lists.
+    Only `cacheable` responses carry an ETag and answer a matching If-None-Match with 304.
+    """
+    dma_id = _resolve_dma(request)
+    segments = get_segment_fallbacks(dma_id, request.clientplatformid)
+    aliases = await current_week_aliases.get()
+    previous_window = previous_week_window()
+
+    def current_window(dma_id, client_platform_id):
+        return resolve_current_week(aliases, AliasKind.POPULARITY, get_segment_suffix(dma_id, client_platform_id))
+
+    def window_keys(window_of):
+        return {
+            field: [
+                get_content_popularity_redis_key(content_type.value, *window_of(dma_id, client_platform_id), dma_id, client_platform_id)
+                for dma_id, client_platform_id in segments
+            ]
+            for content_type, field in CONTENT_TYPE_FIELDS.items()
+        }
+
+    # The previous window is only read when nothing of the current one is published yet
+    served, seen = await asyncio.gather(
+        serve_with_fallbacks(
+            get_many_versioned_json,
+            [
+                (ServedFrom.REDIS, window_keys(current_window)),
+                (ServedFrom.PREVIOUS_WINDOW, window_keys(lambda *segment: previous_window)),
+            ],
+            fall_back_on_missing=False,
+        ),
+        _seen_bitmap(request.deviceidentifier),
+    )
+
+    served_from = most_degraded([tier for tier, _ in served.values()])
+    response.headers[SERVED_FROM_HEADER] = served_from
+    if not served:
+        return RecommendationResponse()
+
+    unseen, dropped = _drop_seen({field: items_data for field, (_, (_, items_data)) in served.items()}, seen)
+    if cacheable:
+        versions = [f"{field}={version}" for field, (_, (version, _)) in served.items()]
+        etag = make_etag(DEFAULT_ITEMS, *versions, *dropped)
+        headers = cache_headers(etag, degraded=served_from != ServedFrom.REDIS, private=bool(dropped))
+        headers[SERVED_FROM_HEADER] = served_from
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+    else:
+        response.headers.update(NO_STORE_HEADERS)
+
+    recommendations = RecommendationResponse()
+    for content_type, field in CONTENT_TYPE_FIELDS.items():
+        if field not in unseen:
+            continue
+        items_data = unseen[field]
+
+        try:
+            setattr(recommendations, field, _parse_items(items_data, DEFAULT_ITEMS))
+        except Exception as e:
+            logger.error(f"Error parsing {content_type.value} data: {e}")
+
+    return recommendations
+
+
 @router.post("/recommend", response_model=RecommendationResponse)
-async def get_recommendations(
-    request: RecommendationRequest
+async def get_recommendations(request: RecommendationRequest, response: Response):
+    """
+    Get popular content recommendations of every content type based on user context.
+    Not cached: cacheable responses are served by GET /recommend.
+    """
+    return await _recommendations(request, response)
+
+
+@router.get("/recommend", response_model=RecommendationResponse)
+async def get_cacheable_recommendations(
+    response: Response,
+    request: Annotated[RecommendationQuery, Query()],
+    if_none_match: Optional[str] = Header(default=None),
 ):
     """
-    Get popular content recommendations based on user context.
+    Popular content recommendations of every content type for the segment in the
+    query, with an ETag to revalidate them. Without a device identifier, one
+    public response serves the whole segment.
     """
-    raise HTTPException(
-        status_code=400,
-        detail="Please specify a content type. Use routes like: /recommend/curated"
+    return await _recommendations(request, response, if_none_match, cacheable=True)
+
+
+async def _live_recommendations(
+    request: Union[RecommendationRequest, RecommendationQuery],
+    response: Response,
+    if_none_match: Optional[str] = None,
+    cacheable: bool = False,
+):
+    """
+    Content of every type ranked by recent, time-decayed views in the
+    request's DMA (globally when the DMA has none), from the live scores fed by
+    the playback event ingest, without the items the device already watched.
+    Served from the weekly popularity lists when there are no live scores or
+    Redis can't answer within the latency budget.
+    """
+    dma_id = _resolve_dma(request)
+    content_types = [content_type.value for content_type in CONTENT_TYPE_FIELDS]
+    candidates = DEFAULT_ITEMS * SEEN_OVERFETCH if settings.SEEN_FILTER_ENABLED else DEFAULT_ITEMS
+    rankings, seen = await asyncio.gather(
+        call_with_budget(lambda: get_live_rankings(content_types, dma_id, candidates), Budget()),
+        _seen_bitmap(request.deviceidentifier),
     )
+    if not rankings or not any(rankings.values()):
+        return await _recommendations(request, response, if_none_match, cacheable)
 
+    unseen, dropped = _drop_seen(rankings, seen)
+    response.headers[SERVED_FROM_HEADER] = ServedFrom.LIVE
+    if cacheable:
+        response.headers["Cache-Control"] = f"{'private' if dropped else 'public'}, max-age={LIVE_MAX_AGE_SECONDS}"
+    else:
+        response.headers.update(NO_STORE_HEADERS)
+    recommendations = RecommendationResponse()
+    for content_type, field in CONTENT_TYPE_FIELDS.items():
+        setattr(recommendations, field, _parse_items(unseen[content_type.value], DEFAULT_ITEMS))
+    return recommendations
 
-@router.post("/recommend/{content_type}", response_model=CuratedRecommendationResponse)
-async def get_content_recommendations(
+
+@router.post("/recommend/live", response_model=RecommendationResponse)
+async def get_live_recommendations(request: RecommendationRequest, response: Response):
+    """
+    Get content of every type ranked by recent views in the request's DMA,
+    without the items the device already watched.
+    Not cached: cacheable responses are served by GET /recommend/live.
+    """
+    return await _live_recommendations(request, response)
+
+
+@router.get("/recommend/live", response_model=RecommendationResponse)
+async def get_cacheable_live_recommendations(
+    response: Response,
+    request: Annotated[RecommendationQuery, Query()],
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """Live rankings of the DMA in the query, kept briefly by clients and edge caches."""
+    return await _live_recommendations(request, response, if_none_match, cacheable=True)
+
+
+async def _content_recommendations(
     content_type: str,
-    request: CuratedRecommendationRequest
+    request: CuratedRecommendationRequest,
+    response: Response,
+    if_none_match: Optional[str] = None,
+    cacheable: bool = False,
 ):
     """
-    Get recommendations for a specific content type.
-    Currently, supports: 'curated'
+    Recommendations for a specific content type.
+    Currently, supports: 'curated', 'trending' (shows whose viewers grow fastest)
+    Only `cacheable` responses carry an ETag and answer a matching If-None-Match with 304.
     """
-    if content_type != "curated":
+    if content_type not in CONTENT_LIST_KEYS:
         raise HTTPException(status_code=400, detail=f"Unsupported content type: {content_type}")
+    get_list_key = CONTENT_LIST_KEYS[content_type]
 
-    # Calculate default dates if not provided
-    # Default to current week start (Monday) and end (Sunday)
-    now = datetime.now()
-    
-    start_date_str = request.start_date
-    if not start_date_str:
-        start_of_week = now - timedelta(days=now.weekday())
-        start_date_str = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0).strftime("%Y-%m-%d %H:%M:%S")
-        
-    end_date_str = request.end_date
-    if not end_date_str:
-        # If start_date was computed, end_date is end of that week
-        # If start_date was provided, we probably should default end_date relative to it or just current week end?
-        # Requirement: "end_date = default to current week end date"
-        start_of_week = now - timedelta(days=now.weekday())
-        end_of_week = start_of_week + timedelta(days=6)
-        end_date_str = end_of_week.replace(hour=23, minute=59, second=59, microsecond=0).strftime("%Y-%m-%d %H:%M:%S")
-
-    dma_suffix = str(request.dma_id) if request.dma_id else "global"
-    
-    # Redis Key: popularity:curated:{start_date}:{end_date}:{dma_id_or_global}
-    # We need to extract YYYY-MM-DD from the strings
-    
-    # redis_key = f"zeam-recommender:popularity:curated:{key_start_date}:{key_end_date}:{dma_suffix}"
-    # Use shared function
-    # Note: the shared function expects strings, possibly with HH:MM:SS, but it handles splitting.
-    redis_key = get_curated_content_redis_key(start_date_str, end_date_str, request.dma_id)
-    
-    logger.info(f"Fetching curated content from key: {redis_key}")
+    # Without dates, serve the window the DMA's current week alias points to;
+    # trending lists follow the curated lists they are derived from
+    default_dates = not request.start_date and not request.end_date
+    aliases = await current_week_aliases.get() if default_dates else {}
+    default_start, default_end = resolve_current_week(aliases, AliasKind.CURATED, get_segment_suffix(request.dma_id))
+    start_date_str = request.start_date or default_start
+    end_date_str = request.end_date or default_end
+
+    # Redis Key: popularity:{content_type}:{start_date}:{end_date}:{dma_id_or_global}
+    redis_key = get_list_key(start_date_str, end_date_str, request.dma_id)
     
-    items_data = await get_json(redis_key)
+    logger.info(f"Fetching {content_type} content from key: {redis_key}")
+
+    # The worker already limits items via SQL; slice if Redis holds more than requested
+    limit = request.items if request.items else DEFAULT_ITEMS
+
+    # Fallbacks: last-known-good copy, previous week (for the default window), global key
+    tiers = [(ServedFrom.REDIS, {"items": [redis_key]})]
+    if default_dates:
+        previous_start, previous_end = previous_week_window()
+        tiers.append((ServedFrom.PREVIOUS_WINDOW, {"items": [get_list_key(previous_start, previous_end, request.dma_id)]}))
+    if request.dma_id:
+        global_start, global_end = resolve_current_week(aliases, AliasKind.CURATED, "global") if default_dates else (start_date_str, end_date_str)
+        tiers.append((ServedFrom.GLOBAL, {"items": [get_list_key(global_start, global_end)]}))
+
+    # Skip transferring the payload when the client already holds the current version
+    client_version = known_version(if_none_match, limit) if cacheable else None
+    served = await serve_with_fallbacks(_read_single, tiers, known_version=client_version)
+    served_from, (version, items_data) = served.get("items", (ServedFrom.NONE, (None, None)))
+    response.headers[SERVED_FROM_HEADER] = served_from
+    if not cacheable:
+        response.headers.update(NO_STORE_HEADERS)
+    if version is None:
+        return CuratedRecommendationResponse()
+
+    if cacheable:
+        etag = make_version_etag(version, limit)
+        headers = cache_headers(etag, degraded=served_from != ServedFrom.REDIS)
+        headers[SERVED_FROM_HEADER] = served_from
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+
     if not items_data:
         return CuratedRecommendationResponse()
 
-    response = CuratedRecommendationResponse()
-    
-    # Filter/Limit items if needed? 
-    # The worker already limits items via SQL, but the request has 'items' count.
-    # The user says "items = default to 10". If Redis has more, we should slice?
-    # Or if Redis has fewer?
-    # I'll slice if it exceeds request.items
-    
-    count = 0
-    limit = request.items if request.items else 10
-    
     try:
-        for item_dict in items_data:
-            if count >= limit:
-                break
-                
-            item = ContentItem(**item_dict)
-            response.items.append(item)
-            
-            count += 1
-            
+        return CuratedRecommendationResponse(items=_parse_items(items_data, limit))
     except Exception as e:
-        logger.error(f"Error parsing curated data: {e}")
-        return CuratedRecommendationResponse() # Return empty on error to avoid crash? or raise?
-        
-    return response
+        logger.error(f"Error parsing {content_type} data: {e}")
+        return CuratedRecommendationResponse() # Return empty on error to avoid crash
+
+
+@router.post("/recommend/{content_type}", response_model=CuratedRecommendationResponse)
+async def get_content_recommendations(
+    content_type: str,
+    request: CuratedRecommendationRequest,
+    response: Response,
+):
+    """
+    Get recommendations for a specific content type.
+    Currently, supports: 'curated', 'trending' (shows whose viewers grow fastest)
+    Not cached: cacheable responses are served by GET /recommend/{content_type}.
+    """
+    return await _content_recommendations(content_type, request, response)
+
 
+@router.get("/recommend/{content_type}", response_model=CuratedRecommendationResponse)
+async def get_cacheable_content_recommendations(
+    content_type: str,
+    response: Response,
+    request: Annotated[CuratedRecommendationRequest, Query()],
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """Recommendations for a specific content type, with an ETag to revalidate them."""
+    return await _content_recommendations(content_type, request, response, if_none_match, cacheable=True)
@@ -0,0 +1,256 @@
+"""
+Latency budget and fallback tiers of the recommend path.
+
+Redis reads run under a per-call timeout within a per-request budget, behind
+a circuit breaker. When Redis can't answer, responses are served from an
+in-process copy of the last payloads read (last-known-good), then from the
+previous window, then from the global key. The tier is reported in the
+X-Served-From header.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from zeam.config.core import settings
+
+logger = logging.getLogger(__name__)
+
+SERVED_FROM_HEADER = "X-Served-From"
+
+Versioned = Tuple[Optional[str], Any]
+
+
+class ServedFrom:
+    LIVE = "live"
+    REDIS = "redis"
+    LAST_KNOWN_GOOD = "last-known-good"
+    PREVIOUS_WINDOW = "previous-window"
+    GLOBAL = "global"
+    NONE = "none"
+
+
+# Tiers from freshest to most degraded
+SERVED_FROM_ORDER = [
+    ServedFrom.LIVE,
+    ServedFrom.REDIS,
+    ServedFrom.LAST_KNOWN_GOOD,
+    ServedFrom.PREVIOUS_WINDOW,
+    ServedFrom.GLOBAL,
+    ServedFrom.NONE,
+]
+
+
+def most_degraded(tiers: List[str]) -> str:
+    return max(tiers, key=SERVED_FROM_ORDER.index, default=ServedFrom.NONE)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failures and rejects calls for
+    `reset_seconds`; then lets one trial call through, closing again if it succeeds.
+    A trial that never reports back (e.g. cancelled) is replaced after `reset_seconds`.
+    """
+
+    def __init__(self, failures: int, reset_seconds: float):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._trial_started = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        now = time.monotonic()
+        if self._trial and now - self._trial_started < self.reset_seconds:
+            return False
+        if now - self._opened_at >= self.reset_seconds:
+            self._trial = True
+            self._trial_started = now
+            return True
+        return False
+
+    def record_cancelled(self) -> None:
+        """A call ended without an outcome: let the next call be the trial."""
+        self._trial = False
+
+    def record_success(self) -> None:
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self._consecutive += 1
+        if self._trial or self._consecutive >= self.failures:
+            if self._opened_at is None:
+                logger.warning(f"Redis circuit breaker opened after {self._consecutive} failures")
+            self._opened_at = time.monotonic()
+            self._trial = False
+
+
+class LastKnownGood:
+    """Last (version, payload) read for each key, evicting the least recently refreshed."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[str, Versioned]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: str, version: Optional[str], data: Any) -> None:
+        with self._lock:
+            self._entries[key] = (version, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Versioned:
+        with self._lock:
+            return self._entries.get(key, (None, None))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+breaker = CircuitBreaker(settings.SERVING_BREAKER_FAILURES, settings.SERVING_BREAKER_RESET_SECONDS)
+last_known_good = LastKnownGood(settings.SERVING_LAST_GOOD_MAX_KEYS)
+
+
+def last_known(key: str) -> Versioned:
+    """Last (version, payload) read for `key` by this process, without touching Redis."""
+    return last_known_good.get(key)
+
+
+class Budget:
+    """Deadline shared by the Redis reads of one request."""
+
+    def __init__(self, budget_ms: Optional[int] = None):
+        self.deadline = time.monotonic() + (budget_ms or settings.SERVING_BUDGET_MS) / 1000
+
+    def call_timeout(self) -> float:
+        remaining = self.deadline - time.monotonic()
+        return max(0.0, min(remaining, settings.SERVING_REDIS_TIMEOUT_MS / 1000))
+
+
+async def read_with_budget(
+    read: Callable[..., Awaitable[Any]],
+    keys: List[str],
+    budget: Budget,
+    known_version: Optional[str] = None,
+) -> Optional[List[Versioned]]:
+    """
+    Read `keys` with `read(keys)`, or `read(keys, known_version)` when the client
+    holds a version, within the budget.
+    Returns None when the breaker is open, the budget is spent or Redis fails.
+    """
+    timeout = budget.call_timeout()
+    if timeout <= 0 or not breaker.allow():
+        return None
+
+    try:
+        reading = read(keys) if known_version is None else read(keys, known_version)
+        values = await asyncio.wait_for(reading, timeout)
+    except asyncio.CancelledError:
+        breaker.record_cancelled()
+        raise
+    except Exception as e:
+        breaker.record_failure()
+        logger.warning(f"Redis read of {len(keys)} keys failed ({type(e).__name__}), serving fallbacks")
+        return None
+
+    breaker.record_success()
+    for key, (version, data) in zip(keys, values):
+        if data:
+            last_known_good.put(key, version, data)
+    return values
+
+
+async def call_with_budget(call: Callable[[], Awaitable[Any]], budget: Budget) -> Optional[Any]:
+    """
+    Await `call()`, which may take several round trips, within what is left of
+    the budget. Returns None when the breaker is open, the budget is spent or Redis fails.
+    """
+    remaining = budget.deadline - time.monotonic()
+    if remaining <= 0 or not breaker.allow():
+        return None
+
+    try:
+        result = await asyncio.wait_for(call(), remaining)
+    except asyncio.CancelledError:
+        breaker.record_cancelled()
+        raise
+    except Exception as e:
+        breaker.record_failure()
+        logger.warning(f"Redis call failed ({type(e).__name__}), serving fallbacks")
+        return None
+
+    breaker.record_success()
+    return result
+
+
+def first_available(keys: List[str], values: Dict[str, Versioned]) -> Optional[Versioned]:
+    """First key, in order, with a version."""
+    return next((values[key] for key in keys if values.get(key, (None, None))[0]), None)
+
+
+async def serve_with_fallbacks(
+    read: Callable[..., Awaitable[Any]],
+    tiers: List[Tuple[str, Dict[str, List[str]]]],
+    budget: Optional[Budget] = None,
+    known_version: Optional[str] = None,
+    fall_back_on_missing: bool = True,
+) -> Dict[str, Tuple[str, Versioned]]:
+    """
+    Resolve every field from the first tier able to serve it.
+
+    Args:
+        read: Redis reader (see read_with_budget)
+        tiers: (ServedFrom tier, {field: candidate keys in order}), freshest first
+        budget: Latency budget of the request
+        known_version: Version the client holds (single field, single key reads)
+        fall_back_on_missing: Whether fields missing from a healthy Redis move on to the
+            next tier, or only when no field at all was found (e.g. a window not published yet)
+
+    Returns:
+        {field: (tier, (version, data))} for the fields that could be served
+    """
+    budget = budget or Budget()
+    served: Dict[str, Tuple[str, Versioned]] = {}
+    healthy = True
+
+    for index, (tier, candidates) in enumerate(tiers):
+        pending = {field: keys for field, keys in candidates.items() if field not in served}
+        if not pending:
+            break
+        if index and healthy and served and not fall_back_on_missing:
+            break
+
+        keys = list(dict.fromkeys(key for field_keys in pending.values() for key in field_keys))
+        values = None
+        if healthy:
+            values = await read_with_budget(read, keys, budget, known_version if index == 0 else None)
+            healthy = values is not None
+        if values is None:
+            label = ServedFrom.LAST_KNOWN_GOOD if index == 0 else tier
+            found = {key: last_known_good.get(key) for key in keys}
+        else:
+            label = tier
+            found = dict(zip(keys, values))
+
+        for field, field_keys in pending.items():
+            hit = first_available(field_keys, found)
+            if hit is not None:
+                served[field] = (label, hit)
+
+    return served
@@ -0,0 +1,56 @@
+"""
+HTTP validators and cache headers for recommendation responses.
+"""
+import hashlib
+from typing import Dict, Iterable, Optional
+
+from zeam.config.core import settings
+from zeam.worker_registry.windows import seconds_until_next_refresh
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag derived from the published versions and parameters behind a response."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+    return f'"{digest}"'
+
+
+def parse_if_none_match(if_none_match: Optional[str]) -> Iterable[str]:
+    """Return the entity tags listed in an If-None-Match header, weak prefixes removed."""
+    if not if_none_match:
+        return []
+    return [tag.strip().removeprefix("W/") for tag in if_none_match.split(",") if tag.strip()]
+
+
+def make_version_etag(version: str, variant: object) -> str:
+    """ETag of a response rendered from a single published version."""
+    return f'"{version}.{variant}"'
+
+
+def known_version(if_none_match: Optional[str], variant: object) -> Optional[str]:
+    """The published version a client already holds for this variant, if any."""
+    suffix = f'.{variant}"'
+    for tag in parse_if_none_match(if_none_match):
+        if tag.startswith('"') and tag.endswith(suffix):
+            return tag[1:-len(suffix)]
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    tags = parse_if_none_match(if_none_match)
+    return "*" in tags or etag in tags
+
+
+def cache_headers(etag: Optional[str] = None, degraded: bool = False, private: bool = False) -> Dict[str, str]:
+    """
+    Cache-Control lets clients and edge caches keep a response until the next
+    scheduled worker refresh, then revalidate it with the ETag. Responses
+    served by a fallback tier are only kept for SERVING_DEGRADED_MAX_AGE_SECONDS,
+    and responses specific to one device are kept by the client only.
+    """
+    max_age = seconds_until_next_refresh()
+    if degraded:
+        max_age = min(max_age, settings.SERVING_DEGRADED_MAX_AGE_SECONDS)
+    headers = {"Cache-Control": f"{'private' if private else 'public'}, max-age={max_age}"}
+    if etag:
+        headers["ETag"] = etag
+    return headers
@@ -1,28 +1,77 @@
-from fastapi import FastAPI
-from zeam.api.api.v1.recommend import router as v1_router
-from zeam.api.api.health import router as health_router
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from zeam.api.admission import RouteClass, admission_middleware
+from zeam.api.api.v1.events import router as events_router
+from zeam.api.api.v1.recommend import overloaded_recommendations, router as v1_router
+from zeam.api.api.health import prober, router as health_router
+from zeam.api.api.profiles import profile_requests, router as profiles_router
 from zeam.api.api.redis import router as redis_router
 from zeam.api.api.scheduler import router as scheduler_router
 from zeam.config.core import settings
-import uvicorn
+from zeam.geo import get_dma_index
+from zeam.profiling import request_profiling_enabled
+from zeam.redis_client import close_pool, warm_up
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the DMA spatial index and open Redis connections before serving traffic
+    get_dma_index()
+    try:
+        await warm_up()
+    except Exception as e:
+        logger.warning(f"Redis warm-up failed: {e}")
+    prober.start()
+    yield
+    await prober.stop()
+    await close_pool()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API for Zeam Recommender Service",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.include_router(v1_router, prefix="/api/v1")
+app.include_router(events_router, prefix="/api/v1")
 app.include_router(health_router, prefix="/api/health")
 app.include_router(redis_router, prefix="/api/redis")
 app.include_router(scheduler_router, prefix="/api/scheduler")
+app.include_router(profiles_router, prefix="/api/profiles")
+
+# Requests only pay for the profiling middleware when it can be used
+if request_profiling_enabled():
+    app.middleware("http")(profile_requests)
+
+# Added last so that it runs first: shed requests skip every other middleware
+if settings.ADMISSION_ENABLED:
+    app.middleware("http")(admission_middleware({RouteClass.RECOMMEND: overloaded_recommendations}))
+
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError):
+    # Errors echo the rejected input, and NaN or Infinity have no JSON form
+    errors = jsonable_encoder(exc.errors(), custom_encoder={float: lambda value: value if math.isfinite(value) else str(value)})
+    return JSONResponse({"detail": errors}, status_code=422)
 
 @app.get("/")
 async def root():
     return {"message": "Zeam Recommender Service"}
 
 if __name__ == "__main__":
+    import uvicorn
+
     # Start a development server that respects SERVER_PORT environment variable
+    # (use `python -m zeam.api` for the production server)
     uvicorn.run(
         "zeam.api.main:app",
         host="0.0.0.0",
@@ -0,0 +1,113 @@
+"""
+Background dependency probes.
+
+Each dependency is probed on its own interval by a task started in the API
+lifespan; health endpoints read the latest status and recent latency and
+error rate from memory, so polling them never reaches Redis or Redshift.
+A probe that outlives its timeout is recorded as failed but left to finish,
+and the dependency is not probed again until it has, so a hung dependency
+holds at most one thread or connection.
+"""
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from zeam.config.core import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeStats:
+    """Outcome and latency of the last `window` probes of one dependency."""
+
+    def __init__(self, window: int):
+        self.samples: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self.status = "unknown"
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def record(self, ok: bool, latency_ms: float, error: Optional[str] = None) -> None:
+        self.samples.append((ok, latency_ms))
+        self.status = "ok" if ok else "error"
+        self.checked_at = time.time()
+        if error:
+            self.last_error = error
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(latency for _, latency in self.samples)
+        failures = sum(1 for ok, _ in self.samples if not ok)
+        return {
+            "status": self.status,
+            "checked_at": self.checked_at,
+            "samples": len(self.samples),
+            "error_rate": round(failures / len(self.samples), 3) if self.samples else None,
+            "latency_ms": {
+                "last": round(self.samples[-1][1], 2) if self.samples else None,
+                "p50": round(statistics.median(latencies), 2) if latencies else None,
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else None,
+                "max": round(latencies[-1], 2) if latencies else None,
+            },
+            "last_error": self.last_error,
+        }
+
+
+class HealthProber:
+    """
+    Runs `probes` (name -> (async check, interval seconds)) in the background
+    and keeps their recent results.
+    """
+
+    def __init__(self, probes: Dict[str, Tuple[Callable[[], Awaitable[Any]], float]], window: Optional[int] = None):
+        self.probes = probes
+        self.stats = {name: ProbeStats(window or settings.HEALTH_PROBE_WINDOW) for name in probes}
+        self._tasks: List[asyncio.Task] = []
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    async def probe(self, name: str) -> bool:
+        check, _ = self.probes[name]
+        running = self._in_flight.get(name)
+        if running is not None and not running.done():
+            logger.warning(f"{name} health probe skipped: the previous probe is still running")
+            self.stats[name].record(False, 0.0, "ProbeStillRunning: the previous probe has not finished")
+            return False
+
+        started = time.perf_counter()
+        task = self._in_flight[name] = asyncio.ensure_future(check())
+        # The outcome of a check that finishes after its timeout is not recorded
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        try:
+            # Shielded: a timed-out check (e.g. a thread blocked on a socket) can't be
+            # interrupted, so it is awaited by the next probe instead of abandoned
+            await asyncio.wait_for(asyncio.shield(task), timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+        except Exception as e:
+            latency_ms = (time.perf_counter() - started) * 1000
+            logger.warning(f"{name} health probe failed: {type(e).__name__}: {e}")
+            self.stats[name].record(False, latency_ms, f"{type(e).__name__}: {e}")
+            return False
+        self.stats[name].record(True, (time.perf_counter() - started) * 1000)
+        return True
+
+    async def _run(self, name: str, interval: float) -> None:
+        while True:
+            await self.probe(name)
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run(name, interval)) for name, (_, interval) in self.probes.items()]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks + list(self._in_flight.values()), []
+        self._in_flight = {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def status(self, name: str) -> str:
+        """Cached status, probing once when the dependency was never probed (e.g. prober not started)."""
+        if self.stats[name].checked_at is None:
+            await self.probe(name)
+        return self.stats[name].status
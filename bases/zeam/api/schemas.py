@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from enum import Enum
 from pydantic import BaseModel, Field
+from zeam.config.core import settings
 
 class ContentType(str, Enum):
     CHANNEL = "channel"
@@ -12,8 +13,16 @@ class ContentType(str, Enum):
 class RecommendationRequest(BaseModel):
     deviceidentifier: str = Field(..., description="Device/session-level identifier")
     islocalized: bool = Field(..., description="Whether geo fields are populated from localization")
-    latitude: Optional[float] = Field(None, description="Latitude (approximate)")
-    longitude: Optional[float] = Field(None, description="Longitude (approximate)")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Latitude (approximate)")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Longitude (approximate)")
+    dmaid: Optional[int] = Field(None, description="DMA market id")
+    clientplatformid: Optional[int] = Field(None, description="Client platform taxonomy id")
+
+class RecommendationQuery(BaseModel):
+    """Query of the cacheable GET recommend routes; without a device, one response serves the whole segment."""
+    deviceidentifier: Optional[str] = Field(None, description="Device/session-level identifier, to drop watched items")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Latitude (approximate)")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Longitude (approximate)")
     dmaid: Optional[int] = Field(None, description="DMA market id")
     clientplatformid: Optional[int] = Field(None, description="Client platform taxonomy id")
 
@@ -29,6 +38,7 @@ class ContentItem(BaseModel):
     type: ContentType
     description: Optional[str] = None
     image_url: Optional[str] = None
+    viewers: Optional[int] = Field(None, description="Distinct recent viewers (live rankings only)")
     # Additional metadata can be added here
 
 class RecommendationResponse(BaseModel):
@@ -41,3 +51,34 @@ class RecommendationResponse(BaseModel):
 class CuratedRecommendationResponse(BaseModel):
     items: List[ContentItem] = Field(default_factory=list)
 
+
+class BulkRunRequest(BaseModel):
+    args: Dict[str, Any] = Field(default_factory=dict, description="Arguments shared by every task")
+    dma_ids: Optional[List[Optional[int]]] = Field(None, description="DMAs to run for (null entry = global)")
+    start_date: Optional[str] = Field(None, description="First day of the range (YYYY-MM-DD)")
+    end_date: Optional[str] = Field(None, description="Last day of the range (YYYY-MM-DD)")
+    window_days: int = Field(7, description="Length of each date window in days")
+
+class BackfillRequest(BaseModel):
+    start_date: str = Field(..., description="First day of the range (YYYY-MM-DD)")
+    end_date: str = Field(..., description="Last day of the range (YYYY-MM-DD)")
+    dma_ids: Optional[List[Optional[int]]] = Field(None, description="DMAs to backfill (null entry = global); default global only")
+    window_days: int = Field(7, description="Length of each date window in days")
+    item_count: int = Field(10, ge=1, description="Items kept per window")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Most concurrent warehouse queries (default and cap BACKFILL_MAX_CONCURRENCY)")
+
+class TaskStatusRequest(BaseModel):
+    task_ids: List[str] = Field(..., description="Celery task IDs")
+
+
+class PlaybackEvent(BaseModel):
+    content_id: str = Field(..., description="Content identifier")
+    content_type: ContentType
+    device_id: Optional[str] = Field(None, description="Viewer device, counted once per item")
+    dma_id: Optional[int] = Field(None, description="DMA market id")
+    title: Optional[str] = Field(None, description="Content title shown in live rankings")
+    timestamp: Optional[float] = Field(None, allow_inf_nan=False, description="Playback time (epoch seconds); defaults to now")
+    weight: float = Field(1.0, ge=0, le=settings.LIVE_MAX_EVENT_WEIGHT, allow_inf_nan=False, description="Weight of the view, e.g. minutes watched")
+
+class PlaybackEventBatch(BaseModel):
+    events: List[PlaybackEvent] = Field(..., description="Playback events")
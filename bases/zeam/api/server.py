@@ -0,0 +1,88 @@
+"""
+Production server entry point for the API.
+
+    python -m zeam.api
+
+Runs uvicorn with one process per available CPU (respecting cgroup limits),
+uvloop and httptools when installed, and no auto-reload.
+"""
+import importlib.util
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+import uvicorn
+from zeam.config.core import settings
+
+logger = logging.getLogger(__name__)
+
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_CPU_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_CPU_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU limit imposed by the container runtime, in CPUs, or None when unlimited."""
+    try:
+        if CGROUP_V2_CPU_MAX.exists():
+            quota, period = CGROUP_V2_CPU_MAX.read_text().split()[:2]
+            if quota == "max":
+                return None
+            return int(quota) / int(period)
+        if CGROUP_V1_CPU_QUOTA.exists() and CGROUP_V1_CPU_PERIOD.exists():
+            quota = int(CGROUP_V1_CPU_QUOTA.read_text())
+            if quota <= 0:
+                return None
+            return quota / int(CGROUP_V1_CPU_PERIOD.read_text())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read cgroup CPU limit: {e}")
+    return None
+
+
+def detect_worker_count() -> int:
+    """
+    Number of worker processes: SERVER_WORKERS when set, otherwise the CPUs
+    this process may use, capped by the cgroup CPU quota.
+    """
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main():
+    workers = detect_worker_count()
+    loop = "uvloop" if _available("uvloop") else "asyncio"
+    http = "httptools" if _available("httptools") else "h11"
+    logger.info(f"Starting API on {settings.SERVER_HOST}:{settings.SERVER_PORT} with {workers} workers ({loop}/{http})")
+
+    uvicorn.run(
+        "zeam.api.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        proxy_headers=True,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        access_log=settings.SERVER_ACCESS_LOG,
+    )
+
+
+if __name__ == "__main__":
+    main()
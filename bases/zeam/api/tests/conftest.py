@@ -0,0 +1,20 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_seen_items():
+    # Recommend routes read the device's watched filter; tests opt in by patching it themselves
+    with patch("zeam.api.api.v1.recommend.get_seen_bitmap", new_callable=AsyncMock) as mock_seen:
+        mock_seen.return_value = b""
+        yield mock_seen
+
+
+@pytest.fixture(autouse=True)
+def current_week_aliases():
+    # No aliases published: default windows are the calendar week
+    with patch("zeam.api.api.v1.recommend.current_week_aliases") as mock_aliases:
+        mock_aliases.get = AsyncMock(return_value={})
+        mock_aliases.peek.return_value = {}
+        yield mock_aliases
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zeam.api import admission, fallback
+from zeam.api.admission import AdmissionLimiter, RouteClass, classify
+from zeam.api.fallback import LastKnownGood
+from zeam.api.main import app
+from zeam.worker_registry.content_popularity import get_content_popularity_redis_key
+from zeam.worker_registry.windows import current_week_window
+
+client = TestClient(app)
+
+REQUEST = {"deviceidentifier": "device-1", "dmaid": 501, "clientplatformid": 3}
+ITEMS = [{"id": "1", "title": "Show", "type": "show"}]
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    limiters = {
+        RouteClass.RECOMMEND: AdmissionLimiter(limit=2, queue_ms=10),
+        RouteClass.EVENTS: AdmissionLimiter(limit=2, queue_ms=10),
+        RouteClass.ADMIN: AdmissionLimiter(limit=1, queue_ms=0),
+    }
+    with patch.object(admission, "limiters", limiters), \
+            patch.object(fallback, "last_known_good", LastKnownGood(max_keys=100)):
+        yield limiters
+
+
+def test_route_classes():
+    assert classify("/api/v1/recommend") == RouteClass.RECOMMEND
+    assert classify("/api/v1/recommend/curated") == RouteClass.RECOMMEND
+    assert classify("/api/redis/keys") == RouteClass.ADMIN
+    assert classify("/api/scheduler/run/x") == RouteClass.ADMIN
+    assert classify("/api/health/ready") is None
+
+
+def test_released_slot_goes_to_the_waiting_request():
+    limiter = AdmissionLimiter(limit=1, queue_ms=1000)
+
+    async def scenario():
+        assert await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        limiter.release()
+        assert await waiting
+        assert limiter.in_flight == 1
+        limiter.release()
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 0
+    assert limiter.summary()["admitted"] == 2
+
+
+def test_slot_handed_over_as_the_wait_times_out_is_kept():
+    limiter = AdmissionLimiter(limit=1, queue_ms=50)
+
+    async def scenario():
+        assert await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        # The slot is released just before the wait times out, while the loop is blocked
+        asyncio.get_running_loop().call_later(0.04, limiter.release)
+        time.sleep(0.1)
+        return await waiting
+
+    assert asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+def test_request_is_shed_after_the_queue_budget():
+    limiter = AdmissionLimiter(limit=1, queue_ms=10)
+
+    async def scenario():
+        assert await limiter.acquire()
+        return await limiter.acquire()
+
+    assert not asyncio.run(scenario())
+    assert limiter.waiting == 0
+    assert limiter.in_flight == 1
+
+
+def test_overloaded_recommend_without_copy_is_rejected(fresh_state):
+    fresh_state[RouteClass.RECOMMEND].in_flight = 2
+
+    response = client.post("/api/v1/recommend", json=REQUEST)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert fresh_state[RouteClass.RECOMMEND].summary()["shed_rejected"] == 1
+
+
+@patch("zeam.api.api.v1.recommend.get_many_versioned_json", new_callable=AsyncMock)
+def test_overloaded_recommend_serves_the_global_copy(mock_read, fresh_state):
+    fresh_state[RouteClass.RECOMMEND].in_flight = 2
+    global_key = get_content_popularity_redis_key("show", *current_week_window())
+    fallback.last_known_good.put(global_key, "v1", ITEMS)
+
+    response = client.post("/api/v1/recommend", json=REQUEST)
+
+    assert response.status_code == 200
+    assert response.headers["X-Served-From"] == "global"
+    assert response.json()["shows"][0]["id"] == "1"
+    mock_read.assert_not_called()
+    assert fresh_state[RouteClass.RECOMMEND].summary()["shed_degraded"] == 1
+
+
+def test_admin_routes_yield_to_busy_recommend_traffic(fresh_state):
+    fresh_state[RouteClass.RECOMMEND].in_flight = 1
+
+    response = client.get("/api/redis/keys")
+
+    assert response.status_code == 503
+    assert fresh_state[RouteClass.ADMIN].summary()["shed"] == 1
+
+
+def test_admitted_requests_release_their_slot(fresh_state):
+    response = client.get("/api/health/admission")
+    assert response.json()["recommend"]["in_flight"] == 0
+
+    with patch("zeam.api.api.v1.recommend.get_many_versioned_json", new_callable=AsyncMock) as mock_read:
+        mock_read.return_value = []
+        client.post("/api/v1/recommend", json=REQUEST)
+
+    stats = client.get("/api/health/admission").json()["recommend"]
+    assert stats["admitted"] == 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,48 @@
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+from zeam.api.main import app
+
+client = TestClient(app)
+
+ITEMS = [{"id": "1", "title": "Show", "type": "show"}]
+LAST_WEEK = ("2025-01-06 00:00:00", "2025-01-12 23:59:59")
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_curated_default_window_follows_alias(mock_get, current_week_aliases):
+    current_week_aliases.get.return_value = {"curated:123": LAST_WEEK}
+    mock_get.return_value = ("v1", ITEMS)
+
+    response = client.post("/api/v1/recommend/curated", json={"dma_id": 123})
+
+    assert response.status_code == 200
+    assert mock_get.call_args[0][0] == "zeam-recommender:popularity:curated:{2025-01-06:2025-01-12}:123"
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_curated_explicit_dates_ignore_alias(mock_get, current_week_aliases):
+    current_week_aliases.get.return_value = {"curated:123": LAST_WEEK}
+    mock_get.return_value = ("v1", ITEMS)
+
+    client.post("/api/v1/recommend/curated", json={"dma_id": 123, "start_date": "2025-02-03", "end_date": "2025-02-09"})
+
+    assert mock_get.call_args[0][0] == "zeam-recommender:popularity:curated:{2025-02-03:2025-02-09}:123"
+    current_week_aliases.get.assert_not_called()
+
+
+@patch("zeam.api.api.v1.recommend.get_many_versioned_json", new_callable=AsyncMock)
+def test_recommend_reads_each_segment_at_its_alias(mock_get_many, current_week_aliases):
+    # The DMA's new week isn't published yet; the global one is
+    current_week_aliases.get.return_value = {
+        "popularity:501": LAST_WEEK,
+        "popularity:global": ("2025-01-13 00:00:00", "2025-01-19 23:59:59"),
+    }
+    mock_get_many.return_value = []
+
+    client.post("/api/v1/recommend", json={"deviceidentifier": "d1", "islocalized": True, "dmaid": 501})
+
+    keys = mock_get_many.call_args_list[0][0][0]
+    assert "zeam-recommender:popularity:show:{2025-01-06:2025-01-12}:501" in keys
+    assert "zeam-recommender:popularity:show:{2025-01-13:2025-01-19}:global" in keys
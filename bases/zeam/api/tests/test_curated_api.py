@@ -7,7 +7,7 @@ from zeam.api.main import app
 
 client = TestClient(app)
 
-@patch("zeam.api.api.v1.recommend.get_json")
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
 def test_curated_recommendation_explicit_dates(mock_get_json):
     """Test curated recommendation with explicit dates provided."""
     mock_data = [
@@ -18,12 +18,12 @@ def test_curated_recommendation_explicit_dates(mock_get_json):
         }
     ]
     
-    async def mock_get(key):
+    async def mock_get(key, known_version=None):
         # Redis Key: popularity:curated:{start_date}:{end_date}:{dma_id_or_global}
-        expected_key = "zeam-recommender:popularity:curated:2025-01-01:2025-01-07:123"
+        expected_key = "zeam-recommender:popularity:curated:{2025-01-01:2025-01-07}:123"
         if key == expected_key:
-            return mock_data
-        return None
+            return "abc123", mock_data
+        return None, None
         
     mock_get_json.side_effect = mock_get
     
@@ -41,10 +41,10 @@ def test_curated_recommendation_explicit_dates(mock_get_json):
     assert len(data["items"]) == 1
     assert data["items"][0]["title"] == "Curated Show"
 
-@patch("zeam.api.api.v1.recommend.get_json")
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
 def test_curated_recommendation_defaults(mock_get_json):
     """Test defaults for dates and global fallback."""
-    mock_get_json.return_value = None # Reset
+    mock_get_json.return_value = (None, None) # Reset
     
     request_start = None
     request_end = None
@@ -76,3 +76,51 @@ def test_curated_recommendation_defaults(mock_get_json):
 def test_invalid_content_type():
     response = client.post("/api/v1/recommend/invalid_type", json={})
     assert response.status_code == 400
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_curated_recommendation_etag(mock_get_json):
+    """GET responses carry an ETag and Cache-Control; a matching If-None-Match gets an empty 304."""
+    mock_get_json.return_value = ("abc123", [{"id": "1", "title": "Curated Show", "type": "show"}])
+    params = {"dma_id": 123, "items": 5}
+
+    response = client.get("/api/v1/recommend/curated", params=params)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag == '"abc123.5"'
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert mock_get_json.call_args[0][0].endswith(":123")
+
+    mock_get_json.return_value = ("abc123", None)
+    response = client.get("/api/v1/recommend/curated", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    # The held version is passed down so Redis can skip sending the payload
+    assert mock_get_json.call_args[0][1] == "abc123"
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_curated_recommendation_etag_changed(mock_get_json):
+    """A stale ETag gets the full new body."""
+    mock_get_json.return_value = ("def456", [{"id": "2", "title": "New Show", "type": "show"}])
+
+    response = client.get("/api/v1/recommend/curated", params={"items": 5}, headers={"If-None-Match": '"abc123.5"'})
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["title"] == "New Show"
+    assert response.headers["etag"] == '"def456.5"'
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_curated_recommendation_post_is_not_cached(mock_get_json):
+    """POST never revalidates: a matching If-None-Match still gets the full body, without an ETag."""
+    mock_get_json.return_value = ("abc123", [{"id": "1", "title": "Curated Show", "type": "show"}])
+
+    response = client.post("/api/v1/recommend/curated", json={"items": 5}, headers={"If-None-Match": '"abc123.5"'})
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["title"] == "Curated Show"
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
+    assert mock_get_json.call_args[0][1] is None
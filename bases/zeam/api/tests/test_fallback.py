@@ -0,0 +1,164 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zeam.api import fallback
+from zeam.api.fallback import CircuitBreaker, LastKnownGood
+from zeam.api.main import app
+from zeam.worker_registry.windows import current_week_window, previous_week_window, window_hash_tag
+
+client = TestClient(app)
+
+ITEMS = [{"id": "1", "title": "Show", "type": "show"}]
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    with patch.object(fallback, "breaker", CircuitBreaker(failures=2, reset_seconds=60)), \
+            patch.object(fallback, "last_known_good", LastKnownGood(max_keys=100)):
+        yield
+
+
+def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(failures=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    asyncio.run(asyncio.sleep(0.06))
+    # One trial call is let through once the reset time passed
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+
+def test_cancelled_trial_does_not_keep_the_breaker_open():
+    async def hang(keys):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        fallback.breaker.record_failure()
+        fallback.breaker.record_failure()
+        fallback.breaker._opened_at -= 60
+        trial = asyncio.create_task(fallback.read_with_budget(hang, ["key"], fallback.Budget(5000)))
+        await asyncio.sleep(0)
+        assert not fallback.breaker.allow()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(scenario())
+    # The next call is the trial again
+    assert fallback.breaker.allow()
+    assert not fallback.breaker.allow()
+
+
+def test_unreported_trial_is_replaced_after_reset():
+    breaker = CircuitBreaker(failures=1, reset_seconds=0.05)
+    breaker.record_failure()
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.allow()
+    assert not breaker.allow()
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.allow()
+
+
+def test_last_known_good_is_bounded():
+    cache = LastKnownGood(max_keys=2)
+    cache.put("a", "v1", [1])
+    cache.put("b", "v1", [2])
+    cache.put("a", "v2", [1])
+    cache.put("c", "v1", [3])
+
+    assert len(cache) == 2
+    assert cache.get("a") == ("v2", [1])
+    assert cache.get("b") == (None, None)
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_curated_served_from_last_known_good_when_redis_fails(mock_get):
+    payload = {"dma_id": 123, "items": 5}
+    mock_get.return_value = ("v1", ITEMS)
+    response = client.get("/api/v1/recommend/curated", params=payload)
+    assert response.headers["x-served-from"] == "redis"
+
+    mock_get.side_effect = ConnectionError("redis down")
+    response = client.get("/api/v1/recommend/curated", params=payload)
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["title"] == "Show"
+    assert response.headers["x-served-from"] == "last-known-good"
+    assert response.headers["cache-control"] == "public, max-age=30"
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_curated_slow_redis_is_cut_off(mock_get):
+    async def slow(key, known_version=None):
+        await asyncio.sleep(1)
+        return "v1", ITEMS
+
+    mock_get.side_effect = slow
+
+    response = client.post("/api/v1/recommend/curated", json={"items": 5})
+
+    assert response.status_code == 200
+    assert response.json() == {"items": []}
+    assert response.headers["x-served-from"] == "none"
+    # The budget covers the whole chain, not each fallback read
+    assert mock_get.call_count <= 3
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_curated_falls_back_to_previous_window_then_global(mock_get):
+    previous_tag = window_hash_tag(*previous_week_window())
+    current_tag = window_hash_tag(*current_week_window())
+
+    async def only(tag, dma):
+        async def get(key, known_version=None):
+            if tag in key and key.endswith(f":{dma}"):
+                return "v1", ITEMS
+            return None, None
+        return get
+
+    mock_get.side_effect = asyncio.run(only(previous_tag, 123))
+    response = client.post("/api/v1/recommend/curated", json={"dma_id": 123})
+    assert response.headers["x-served-from"] == "previous-window"
+
+    mock_get.side_effect = asyncio.run(only(current_tag, "global"))
+    response = client.post("/api/v1/recommend/curated", json={"dma_id": 123})
+    assert response.headers["x-served-from"] == "global"
+    assert len(response.json()["items"]) == 1
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_open_breaker_skips_redis(mock_get):
+    mock_get.side_effect = ConnectionError("redis down")
+    for _ in range(2):
+        client.post("/api/v1/recommend/curated", json={"items": 5})
+    calls = mock_get.call_count
+
+    response = client.post("/api/v1/recommend/curated", json={"items": 5})
+
+    assert response.status_code == 200
+    assert mock_get.call_count == calls
+
+
+@patch("zeam.api.api.v1.recommend.get_many_versioned_json", new_callable=AsyncMock)
+def test_recommend_reads_previous_window_only_when_current_is_unpublished(mock_get_many):
+    previous_tag = window_hash_tag(*previous_week_window())
+
+    async def get_many(keys):
+        return [("v1", ITEMS) if previous_tag in key and ":show:" in key else (None, None) for key in keys]
+
+    mock_get_many.side_effect = get_many
+    payload = {"deviceidentifier": "d", "islocalized": False}
+
+    response = client.post("/api/v1/recommend", json=payload)
+
+    assert response.json()["shows"][0]["title"] == "Show"
+    assert response.headers["x-served-from"] == "previous-window"
+    assert mock_get_many.await_count == 2
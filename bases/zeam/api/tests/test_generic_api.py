@@ -1,4 +1,5 @@
 from unittest.mock import patch, AsyncMock
+import pytest
 from fastapi.testclient import TestClient
 
 from zeam.api.main import app
@@ -23,7 +24,21 @@ def test_health_connections(mock_ping, mock_health_check):
     assert response.json() == {"redis": "ok", "redshift": "ok"}
 
 
-def test_recommendation_global_fallback():
+@patch("zeam.api.api.v1.recommend.get_many_versioned_json", new_callable=AsyncMock)
+def test_recommendation_global_fallback(mock_get_many_versioned_json):
+    async def mock_get_many(keys):
+        values = []
+        for key in keys:
+            if key.startswith("zeam-recommender:popularity:show:") and key.endswith(":4001"):
+                values.append(("v1", [{"id": "1", "title": "Local Show", "type": "show"}]))
+            elif key.startswith("zeam-recommender:popularity:channel:") and key.endswith(":global"):
+                values.append(("v2", [{"id": "2", "title": "Global Channel", "type": "channel"}]))
+            else:
+                values.append((None, None))
+        return values
+
+    mock_get_many_versioned_json.side_effect = mock_get_many
+
     payload = {
         "deviceidentifier": "test_device",
         "islocalized": True,
@@ -32,6 +47,78 @@ def test_recommendation_global_fallback():
     
     response = client.post("/api/v1/recommend", json=payload)
     
-    assert response.status_code == 400
+    assert response.status_code == 200
     data = response.json()
-    assert data["detail"] == "Please specify a content type. Use routes like: /recommend/curated"
+    assert [item["title"] for item in data["shows"]] == ["Local Show"]
+    assert [item["title"] for item in data["channels"]] == ["Global Channel"]
+    assert data["vods"] == []
+    assert data["clips"] == []
+    assert data["live_events"] == []
+
+    # A single Redis round trip covers every content type and segment
+    assert mock_get_many_versioned_json.await_count == 1
+    keys = mock_get_many_versioned_json.await_args[0][0]
+    assert len(keys) == 5 * 2
+    # POST responses are never stored or revalidated
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
+
+    # The segment's GET variant carries an ETag, and unchanged versions revalidate to an empty 304
+    response = client.get("/api/v1/recommend", params={"dmaid": 4001})
+    assert response.status_code == 200
+    assert response.json() == data
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    response = client.get("/api/v1/recommend", params={"dmaid": 4001}, headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+
+
+@patch("zeam.api.api.v1.recommend.get_many_versioned_json", new_callable=AsyncMock)
+def test_recommendation_segment_fallback_order(mock_get_many_versioned_json):
+    mock_get_many_versioned_json.return_value = [(None, None)] * 20
+
+    payload = {
+        "deviceidentifier": "test_device",
+        "islocalized": False,
+        "dmaid": 501,
+        "clientplatformid": 7
+    }
+
+    response = client.post("/api/v1/recommend", json=payload)
+
+    assert response.status_code == 200
+    keys = mock_get_many_versioned_json.await_args[0][0]
+    channel_keys = [key for key in keys if ":channel:" in key]
+    assert [key.split(":", 5)[-1] for key in channel_keys] == ["501:p7", "501", "global:p7", "global"]
+
+
+@patch("zeam.api.api.v1.recommend.resolve_dma")
+@patch("zeam.api.api.v1.recommend.get_many_versioned_json", new_callable=AsyncMock)
+def test_recommendation_resolves_dma_from_coordinates(mock_get_many_versioned_json, mock_resolve_dma):
+    mock_get_many_versioned_json.return_value = [(None, None)] * 10
+    mock_resolve_dma.return_value = 618
+
+    payload = {
+        "deviceidentifier": "test_device",
+        "islocalized": True,
+        "latitude": 29.76,
+        "longitude": -95.37
+    }
+
+    response = client.post("/api/v1/recommend", json=payload)
+
+    assert response.status_code == 200
+    mock_resolve_dma.assert_called_once_with(29.76, -95.37)
+    keys = mock_get_many_versioned_json.await_args[0][0]
+    assert keys[0].endswith(":618")
+
+
+@pytest.mark.parametrize("latitude, longitude", [("nan", "0"), ("0", "inf"), ("-inf", "0"), ("91", "0"), ("0", "-180.5")])
+@patch("zeam.api.api.v1.recommend.resolve_dma")
+def test_recommendation_rejects_invalid_coordinates(mock_resolve_dma, latitude, longitude):
+    response = client.get("/api/v1/recommend", params={"latitude": latitude, "longitude": longitude})
+    assert response.status_code == 422
+
+    body = f'{{"deviceidentifier": "d1", "islocalized": true, "latitude": {latitude.replace("nan", "NaN").replace("inf", "Infinity")}, "longitude": {longitude.replace("inf", "Infinity")}}}'
+    response = client.post("/api/v1/recommend", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    mock_resolve_dma.assert_not_called()
@@ -0,0 +1,108 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zeam.api.api import health
+from zeam.api.main import app
+from zeam.api.prober import HealthProber, ProbeStats
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def fresh_prober():
+    prober = HealthProber({"redis": (health._probe_redis, 5.0), "redshift": (health._probe_redshift, 60.0)})
+    with patch.object(health, "prober", prober):
+        yield prober
+
+
+def test_probe_stats_summary():
+    stats = ProbeStats(window=3)
+    stats.record(True, 10.0)
+    stats.record(False, 30.0, "TimeoutError: ")
+    stats.record(True, 20.0)
+    stats.record(True, 40.0)
+
+    summary = stats.summary()
+    assert summary["status"] == "ok"
+    assert summary["samples"] == 3
+    assert summary["error_rate"] == 0.333
+    assert summary["latency_ms"]["p50"] == 30.0
+    assert summary["latency_ms"]["max"] == 40.0
+    assert summary["last_error"] == "TimeoutError: "
+
+
+def test_prober_runs_in_background():
+    calls = []
+
+    async def check():
+        calls.append(1)
+
+    async def run():
+        prober = HealthProber({"dep": (check, 0.01)})
+        prober.start()
+        await asyncio.sleep(0.05)
+        await prober.stop()
+        return prober
+
+    prober = asyncio.run(run())
+    assert len(calls) >= 2
+    assert prober.stats["dep"].status == "ok"
+
+
+def test_hung_probe_is_not_started_again():
+    release = asyncio.Event()
+    calls = []
+
+    async def hang():
+        calls.append(1)
+        await release.wait()
+
+    async def run():
+        prober = HealthProber({"dep": (hang, 60.0)})
+        with patch("zeam.api.prober.settings") as mock_settings:
+            mock_settings.HEALTH_PROBE_TIMEOUT_SECONDS = 0.01
+            first = await prober.probe("dep")
+            second = await prober.probe("dep")
+            release.set()
+            await asyncio.sleep(0)
+            third = await prober.probe("dep")
+        return prober, first, second, third
+
+    prober, first, second, third = asyncio.run(run())
+    assert (first, second, third) == (False, False, True)
+    # The probe still running when the next one was due was not started twice
+    assert len(calls) == 2
+    assert prober.stats["dep"].samples[1] == (False, 0.0)
+
+
+@patch("zeam.api.api.health.redshift_health_check")
+@patch("zeam.api.api.health.ping", new_callable=AsyncMock)
+def test_connections_are_served_from_cache(mock_ping, mock_redshift, fresh_prober):
+    mock_ping.return_value = True
+    mock_redshift.side_effect = ConnectionError("login failed")
+
+    for _ in range(3):
+        response = client.get("/api/health/connections")
+        assert response.json() == {"redis": "ok", "redshift": "error"}
+
+    # Probed once on the cold cache, then served from memory
+    assert mock_ping.await_count == 1
+    assert mock_redshift.call_count == 1
+
+    stats = client.get("/api/health/stats").json()
+    assert stats["redshift"]["error_rate"] == 1.0
+    assert stats["redshift"]["last_error"] == "ConnectionError: login failed"
+
+
+def test_live_and_ready(fresh_prober):
+    assert client.get("/api/health/live").status_code == 200
+
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["redis"] == "unknown"
+
+    fresh_prober.stats["redis"].record(True, 1.0)
+    assert client.get("/api/health/ready").status_code == 200
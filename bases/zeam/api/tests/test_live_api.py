@@ -0,0 +1,147 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zeam.api import fallback
+from zeam.api.fallback import CircuitBreaker, LastKnownGood
+from zeam.api.main import app
+from zeam.worker_registry.seen import seen_filter
+
+client = TestClient(app)
+
+REQUEST = {"deviceidentifier": "d1", "islocalized": True, "dmaid": 501}
+QUERY = {"deviceidentifier": "d1", "dmaid": 501}
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    with patch.object(fallback, "breaker", CircuitBreaker(failures=2, reset_seconds=60)), \
+            patch.object(fallback, "last_known_good", LastKnownGood(max_keys=100)):
+        yield
+
+
+@patch("zeam.api.api.v1.events.ingest_events_async", new_callable=AsyncMock)
+def test_ingest_events(mock_ingest):
+    mock_ingest.return_value = 1
+    events = [
+        {"content_id": "42", "content_type": "show", "device_id": "d1", "dma_id": 501, "timestamp": 1735689600},
+        {"content_id": "43", "content_type": "vod"},
+    ]
+
+    response = client.post("/api/v1/events", json={"events": events})
+
+    assert response.status_code == 202
+    assert response.json() == {"received": 2, "accepted": 1}
+    ingested = mock_ingest.call_args[0][0]
+    assert ingested[0]["content_type"] == "show"
+    assert ingested[1]["weight"] == 1.0
+
+
+def test_ingest_rejects_invalid_events():
+    response = client.post("/api/v1/events", json={"events": [{"content_id": "1", "content_type": "podcast"}]})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("field", ['"timestamp": NaN', '"timestamp": -Infinity', '"weight": Infinity', '"weight": 100000'])
+@patch("zeam.api.api.v1.events.ingest_events_async", new_callable=AsyncMock)
+def test_ingest_rejects_non_finite_and_oversized_values(mock_ingest, field):
+    body = f'{{"events": [{{"content_id": "1", "content_type": "show", {field}}}]}}'
+
+    response = client.post("/api/v1/events", content=body, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 422
+    mock_ingest.assert_not_called()
+
+
+@patch("zeam.api.api.v1.events.settings")
+def test_ingest_rejects_oversized_batch(mock_settings):
+    mock_settings.LIVE_MAX_BATCH = 1
+    events = [{"content_id": str(i), "content_type": "show"} for i in range(2)]
+
+    response = client.post("/api/v1/events", json={"events": events})
+
+    assert response.status_code == 413
+
+
+@patch("zeam.api.api.v1.recommend.get_live_rankings", new_callable=AsyncMock)
+def test_live_recommendations(mock_rankings):
+    mock_rankings.return_value = {
+        "channel": [],
+        "show": [{"id": "42", "title": "News", "type": "show", "score": 3.5, "viewers": 120}],
+        "vod": [],
+        "clip": [],
+        "live_event": [],
+    }
+
+    response = client.get("/api/v1/recommend/live", params={"dmaid": 501})
+
+    assert response.status_code == 200
+    assert response.json()["shows"][0] == {"id": "42", "title": "News", "type": "show", "description": None, "image_url": None, "viewers": 120}
+    assert response.headers["x-served-from"] == "live"
+    assert response.headers["cache-control"] == "public, max-age=10"
+    assert mock_rankings.call_args[0][1] == 501
+
+    response = client.post("/api/v1/recommend/live", json=REQUEST)
+    assert response.json()["shows"][0]["id"] == "42"
+    assert response.headers["cache-control"] == "no-store"
+
+
+@patch("zeam.api.api.v1.recommend.get_many_versioned_json", new_callable=AsyncMock)
+@patch("zeam.api.api.v1.recommend.get_live_rankings", new_callable=AsyncMock)
+def test_live_falls_back_to_weekly_popularity(mock_rankings, mock_get_many):
+    mock_rankings.side_effect = ConnectionError("redis down")
+
+    async def weekly(keys):
+        return [("v1", [{"id": "1", "title": "Weekly Show", "type": "show"}]) if ":show:" in key else (None, None) for key in keys]
+
+    mock_get_many.side_effect = weekly
+
+    response = client.post("/api/v1/recommend/live", json=REQUEST)
+
+    assert response.status_code == 200
+    assert response.json()["shows"][0]["title"] == "Weekly Show"
+    assert response.headers["x-served-from"] == "redis"
+
+
+def _bitmap(*items):
+    bitmap = bytearray(seen_filter.bits // 8)
+    for item in items:
+        for offset in seen_filter.positions(item):
+            bitmap[offset // 8] |= 0x80 >> (offset % 8)
+    return bytes(bitmap)
+
+
+@patch("zeam.api.api.v1.recommend.get_live_rankings", new_callable=AsyncMock)
+def test_live_drops_watched_items(mock_rankings, no_seen_items):
+    no_seen_items.return_value = _bitmap("show:42")
+    shows = [{"id": str(i), "title": f"Show {i}", "type": "show", "viewers": 1} for i in range(40, 45)]
+    mock_rankings.return_value = {"channel": [], "show": shows, "vod": [], "clip": [], "live_event": []}
+
+    response = client.get("/api/v1/recommend/live", params=QUERY)
+
+    assert [item["id"] for item in response.json()["shows"]] == ["40", "41", "43", "44"]
+    assert response.headers["cache-control"] == "private, max-age=10"
+    # Enough candidates are read to fill the response after filtering
+    assert mock_rankings.call_args[0][2] == 30
+    no_seen_items.assert_called_once_with("d1")
+
+
+@patch("zeam.api.api.v1.recommend.get_many_versioned_json", new_callable=AsyncMock)
+def test_recommend_drops_watched_items(mock_get_many, no_seen_items):
+    async def weekly(keys):
+        return [("v1", [{"id": "1", "title": "A", "type": "show"}, {"id": "2", "title": "B", "type": "show"}]) if ":show:" in key else (None, None) for key in keys]
+
+    mock_get_many.side_effect = weekly
+
+    response = client.get("/api/v1/recommend", params=QUERY)
+    unfiltered_etag = response.headers["etag"]
+    assert [item["id"] for item in response.json()["shows"]] == ["1", "2"]
+    assert response.headers["cache-control"].startswith("public")
+
+    no_seen_items.return_value = _bitmap("show:1")
+    response = client.get("/api/v1/recommend", params=QUERY)
+
+    assert [item["id"] for item in response.json()["shows"]] == ["2"]
+    assert response.headers["cache-control"].startswith("private")
+    assert response.headers["etag"] != unfiltered_etag
@@ -0,0 +1,67 @@
+from collections import Counter
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from zeam.api.api.profiles import profile_requests
+from zeam.api.main import app
+from zeam.profiling import hooks
+
+client = TestClient(app)
+
+
+def enabled():
+    return patch.multiple(hooks.settings, PROFILING_ENABLED=True, PROFILING_TOKEN="secret")
+
+
+def test_profiles_are_hidden_when_disabled():
+    response = client.get("/api/profiles/", headers={"X-Profile": "secret"})
+
+    assert response.status_code == 404
+
+
+@patch("zeam.api.api.profiles.list_profiles")
+def test_profiles_require_the_token(mock_list):
+    mock_list.return_value = [{"id": "1-GET_-abc", "samples": 12}]
+
+    with enabled():
+        assert client.get("/api/profiles/", headers={"X-Profile": "guess"}).status_code == 403
+        response = client.get("/api/profiles/?profile=secret")
+
+    assert response.status_code == 200
+    assert response.json()["profiles"][0]["samples"] == 12
+
+
+@patch("zeam.api.api.profiles.get_profile")
+def test_profile_stacks_are_plain_text(mock_get):
+    mock_get.return_value = "main;handler 3"
+
+    with enabled():
+        response = client.get("/api/profiles/1-GET_-abc", headers={"X-Profile": "secret"})
+
+    assert response.status_code == 200
+    assert response.text == "main;handler 3"
+    assert response.headers["content-type"].startswith("text/plain")
+
+
+@patch("zeam.api.api.profiles.save_profile")
+def test_middleware_profiles_only_flagged_requests(mock_save):
+    mock_save.return_value = "1-GET_ping-abc"
+    profiled = FastAPI()
+    profiled.middleware("http")(profile_requests)
+
+    @profiled.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    with enabled():
+        plain = TestClient(profiled).get("/ping")
+        flagged = TestClient(profiled).get("/ping", headers={"X-Profile": "secret"})
+
+    assert "X-Profile-Id" not in plain.headers
+    assert flagged.headers["X-Profile-Id"] == "1-GET_ping-abc"
+    name, profiler = mock_save.call_args[0]
+    assert name == "GET /ping"
+    assert isinstance(profiler.stacks, Counter)
+    assert mock_save.call_args[1] == {"status_code": 200}
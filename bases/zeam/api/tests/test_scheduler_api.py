@@ -0,0 +1,189 @@
+from unittest.mock import patch, AsyncMock, MagicMock
+from fastapi.testclient import TestClient
+import pytest
+
+from zeam.api.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def mock_celery():
+    with patch("zeam.api.api.scheduler.get_celery_app") as mock_get_app:
+        celery_app = MagicMock()
+        celery_app.send_task.return_value.id = "task-1"
+        mock_get_app.return_value = celery_app
+        yield celery_app
+
+
+def test_run_worker_defaults_to_interactive_queue(mock_celery):
+    response = client.post("/api/scheduler/run/workers.curated_content_popularity", json={"dma_id": 501})
+
+    assert response.status_code == 200
+    assert response.json()["queue"] == "interactive"
+    mock_celery.send_task.assert_called_once_with(
+        "workers.curated_content_popularity", kwargs={"dma_id": 501}, queue="interactive", priority=0
+    )
+
+
+def test_run_worker_on_backfill_queue(mock_celery):
+    response = client.post("/api/scheduler/run/workers.content_popularity?queue=backfill", json={})
+
+    assert response.status_code == 200
+    assert mock_celery.send_task.call_args[1] == {"kwargs": {}, "queue": "backfill", "priority": 9}
+
+
+def test_run_worker_unknown_queue(mock_celery):
+    response = client.post("/api/scheduler/run/workers.content_popularity?queue=bulk", json={})
+
+    assert response.status_code == 400
+    mock_celery.send_task.assert_not_called()
+
+
+def test_run_worker_unknown_worker(mock_celery):
+    response = client.post("/api/scheduler/run/workers.unknown", json={})
+
+    assert response.status_code == 404
+
+
+@patch("zeam.api.api.scheduler.get_queue_report", new_callable=AsyncMock)
+def test_queue_report(mock_report):
+    mock_report.return_value = {"interactive": {"depth": 2, "concurrency": 2, "wait_time": {"samples": 0}}}
+
+    response = client.get("/api/scheduler/queues")
+
+    assert response.status_code == 200
+    assert response.json()["interactive"]["depth"] == 2
+
+
+@patch("zeam.api.api.scheduler.get_queue_report", new_callable=AsyncMock)
+def test_queue_report_error(mock_report):
+    mock_report.side_effect = Exception("Redis down")
+
+    response = client.get("/api/scheduler/queues")
+
+    assert response.status_code == 503
+
+
+@patch("zeam.api.api.scheduler.record_group", new_callable=AsyncMock)
+@patch("zeam.api.api.scheduler._send_group")
+def test_run_worker_bulk(mock_send_group, mock_record_group):
+    mock_send_group.return_value.id = "group-1"
+    mock_send_group.return_value.results = [MagicMock(id="t1"), MagicMock(id="t2")]
+
+    response = client.post(
+        "/api/scheduler/run/workers.curated_content_popularity/bulk",
+        json={"dma_ids": [501, 502], "start_date": "2025-01-01", "end_date": "2025-01-07"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["group_id"] == "group-1"
+    assert data["task_ids"] == ["t1", "t2"]
+    assert data["queue"] == "backfill"
+    worker_name, jobs, options = mock_send_group.call_args[0]
+    assert [job["dma_id"] for job in jobs] == [501, 502]
+    assert options == {"queue": "backfill", "priority": 9}
+    mock_record_group.assert_awaited_once_with("group-1", ["t1", "t2"])
+
+
+@patch("zeam.api.api.scheduler._send_group")
+def test_run_worker_bulk_invalid_range(mock_send_group):
+    response = client.post(
+        "/api/scheduler/run/workers.curated_content_popularity/bulk",
+        json={"start_date": "2025-01-07", "end_date": "2025-01-01"},
+    )
+
+    assert response.status_code == 400
+    mock_send_group.assert_not_called()
+
+
+@patch("zeam.api.api.scheduler.get_task_states", new_callable=AsyncMock)
+def test_task_status(mock_states):
+    mock_states.return_value = [
+        {"task_id": "t1", "status": "SUCCESS"},
+        {"task_id": "t2", "status": "PENDING"},
+    ]
+
+    response = client.post("/api/scheduler/status", json={"task_ids": ["t1", "t2"]})
+
+    assert response.status_code == 200
+    assert response.json()["summary"] == {"SUCCESS": 1, "PENDING": 1}
+
+
+@patch("zeam.api.api.scheduler.get_task_states", new_callable=AsyncMock)
+@patch("zeam.api.api.scheduler.get_group_task_ids", new_callable=AsyncMock)
+def test_group_status(mock_task_ids, mock_states):
+    mock_task_ids.return_value = []
+    mock_states.return_value = []
+
+    assert client.get("/api/scheduler/groups/missing").status_code == 404
+
+    mock_task_ids.return_value = ["t1"]
+    mock_states.return_value = [{"task_id": "t1", "status": "STARTED"}]
+
+    response = client.get("/api/scheduler/groups/group-1")
+
+    assert response.status_code == 200
+    assert response.json()["summary"] == {"STARTED": 1}
+
+
+def test_revoke_task_interrupts_with_soft_time_limit(mock_celery):
+    response = client.post("/api/scheduler/revoke/task-1")
+
+    assert response.status_code == 200
+    mock_celery.control.revoke.assert_called_once_with("task-1", terminate=True, signal="SIGUSR1")
+
+
+@patch("zeam.api.api.scheduler.get_runs", new_callable=AsyncMock)
+def test_run_ledger(mock_runs):
+    mock_runs.return_value = [{"task": "workers.content_popularity", "status": "success", "duration_ms": 1200}]
+
+    response = client.get("/api/scheduler/runs?count=10&status=success")
+
+    assert response.status_code == 200
+    assert response.json()["runs"][0]["duration_ms"] == 1200
+    mock_runs.assert_awaited_once_with(10, None, "success")
+
+
+@patch("zeam.api.api.scheduler.create_backfill", new_callable=AsyncMock)
+def test_start_backfill_enqueues_first_slice(mock_create, mock_celery):
+    mock_create.return_value = {"backfill_id": "b1", "status": "queued", "total": 104}
+
+    response = client.post("/api/scheduler/backfills", json={"start_date": "2024-01-01", "end_date": "2024-12-31", "dma_ids": [501, 502]})
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 104
+    mock_create.assert_awaited_once_with("2024-01-01", "2024-12-31", [501, 502], 7, 10, None)
+    mock_celery.send_task.assert_called_once_with(
+        "workers.curated_content_backfill", kwargs={"backfill_id": "b1"}, queue="backfill", priority=9
+    )
+
+
+@patch("zeam.api.api.scheduler.create_backfill", new_callable=AsyncMock)
+def test_start_backfill_invalid_range(mock_create, mock_celery):
+    mock_create.side_effect = ValueError("end_date is before start_date")
+
+    response = client.post("/api/scheduler/backfills", json={"start_date": "2024-12-31", "end_date": "2024-01-01"})
+
+    assert response.status_code == 400
+    mock_celery.send_task.assert_not_called()
+
+
+@patch("zeam.api.api.scheduler.get_backfill", new_callable=AsyncMock)
+def test_backfill_status_not_found(mock_get):
+    mock_get.return_value = None
+
+    response = client.get("/api/scheduler/backfills/missing")
+
+    assert response.status_code == 404
+
+
+@patch("zeam.api.api.scheduler.prepare_resume", new_callable=AsyncMock)
+def test_resume_running_backfill_conflicts(mock_resume, mock_celery):
+    mock_resume.side_effect = ValueError("Backfill 'b1' is running in run-1")
+
+    response = client.post("/api/scheduler/backfills/b1/resume")
+
+    assert response.status_code == 409
+    mock_celery.send_task.assert_not_called()
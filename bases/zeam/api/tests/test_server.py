@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+from zeam.api import server
+
+
+def test_app_import_defers_heavy_modules():
+    """Importing the app must not pull in Celery or the Redshift driver."""
+    code = (
+        "import sys, zeam.api.main; "
+        "print(','.join(m for m in ('celery', 'kombu', 'redshift_connector', 'uvicorn') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+@patch.object(server, "settings")
+def test_detect_worker_count_uses_cgroup_limit(mock_settings, tmp_path):
+    mock_settings.SERVER_WORKERS = 0
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("150000 100000\n")
+
+    with patch.object(server, "CGROUP_V2_CPU_MAX", cpu_max), patch("os.sched_getaffinity", return_value=set(range(16))):
+        assert server.detect_worker_count() == 2
+
+    cpu_max.write_text("max 100000\n")
+    with patch.object(server, "CGROUP_V2_CPU_MAX", cpu_max), patch("os.sched_getaffinity", return_value=set(range(16))):
+        assert server.detect_worker_count() == 16
+
+
+@patch.object(server, "settings")
+def test_detect_worker_count_explicit(mock_settings):
+    mock_settings.SERVER_WORKERS = 3
+    assert server.detect_worker_count() == 3
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from zeam.api.main import app
+
+client = TestClient(app)
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_trending_reads_trending_key(mock_get_json):
+    items = [{"id": "7", "title": "Rising Show", "type": "show", "viewers": 400, "growth": 3.0, "score": 8.7}]
+
+    async def mock_get(key, known_version=None):
+        if key == "zeam-recommender:popularity:trending:{2025-01-06:2025-01-12}:501":
+            return "v1", items
+        return None, None
+
+    mock_get_json.side_effect = mock_get
+
+    response = client.post(
+        "/api/v1/recommend/trending",
+        json={"start_date": "2025-01-06 00:00:00", "end_date": "2025-01-12 23:59:59", "dma_id": 501},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["title"] == "Rising Show"
+    assert response.json()["items"][0]["viewers"] == 400
+
+
+@patch("zeam.api.api.v1.recommend.get_versioned_json")
+def test_trending_falls_back_to_global_list(mock_get_json):
+    async def mock_get(key, known_version=None):
+        if key.endswith(":global"):
+            return "v1", [{"id": "8", "title": "Global Riser", "type": "show"}]
+        return None, None
+
+    mock_get_json.side_effect = mock_get
+
+    response = client.post(
+        "/api/v1/recommend/trending",
+        json={"start_date": "2025-01-06 00:00:00", "end_date": "2025-01-12 23:59:59", "dma_id": 501},
+    )
+
+    assert response.json()["items"][0]["id"] == "8"
+    assert response.headers["X-Served-From"] == "global"
@@ -2,15 +2,20 @@
 Celery Beat Application
 """
 from celery import Celery
-from zeam.redis_client.config import settings as redis_settings
+from celery.signals import before_task_publish
+from zeam.redis_client.config import RedisRole, settings as redis_settings
+from zeam.worker_registry.queues import get_celery_queue_config, stamp_enqueued_at
 
 app = Celery(
     "zeam.beat",
-    broker=f"redis://{redis_settings.REDIS_HOST}:{redis_settings.REDIS_PORT}/{redis_settings.REDIS_DB}",
-    backend=f"redis://{redis_settings.REDIS_HOST}:{redis_settings.REDIS_PORT}/{redis_settings.REDIS_DB}",
+    broker=redis_settings.url_for(RedisRole.BROKER),
+    backend=redis_settings.url_for(RedisRole.RESULTS),
 )
 
 app.conf.update(
     timezone="UTC",
     enable_utc=True,
+    **get_celery_queue_config()
 )
+
+before_task_publish.connect(stamp_enqueued_at, weak=False)
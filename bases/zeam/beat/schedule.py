@@ -3,15 +3,66 @@ Celery Beat schedule configuration.
 Define all periodic tasks here.
 """
 import os
-from celery.schedules import crontab, schedule
+from datetime import timedelta, timezone
+from celery.schedules import crontab, schedstate, schedule
 from zeam.worker_registry.core import WorkerNames
+from zeam.worker_registry.windows import seconds_until_next_refresh
 
 # Get worker interval from environment (default 60 minutes to match old behavior)
 WORKER_INTERVAL_MINUTES = int(os.getenv("WORKER_INTERVAL_MINUTES", "60"))
 
+
+class aligned_schedule(schedule):
+    """
+    Runs every `interval_minutes`, at the refresh times aligned to midnight UTC
+    that Cache-Control max-age counts down to (see seconds_until_next_refresh),
+    rather than every interval from when beat started.
+    """
+
+    def __init__(self, interval_minutes: int, nowfun=None, app=None):
+        self.interval_minutes = interval_minutes
+        super().__init__(timedelta(minutes=interval_minutes), nowfun=nowfun, app=app)
+
+    def _until_next(self, moment) -> timedelta:
+        return timedelta(seconds=seconds_until_next_refresh(moment.astimezone(timezone.utc), self.interval_minutes))
+
+    def remaining_estimate(self, last_run_at) -> timedelta:
+        last_run_at = self.maybe_make_aware(last_run_at)
+        return last_run_at + self._until_next(last_run_at) - self.now()
+
+    def is_due(self, last_run_at) -> schedstate:
+        remaining = self.remaining_estimate(last_run_at).total_seconds()
+        if remaining <= 0:
+            return schedstate(True, self._until_next(self.now()).total_seconds())
+        return schedstate(False, remaining)
+
+    def __reduce__(self):
+        return self.__class__, (self.interval_minutes, self.nowfun)
+
+    def __repr__(self) -> str:
+        return f"<aligned every {self.interval_minutes} minutes>"
+
 # Schedule configuration
 # Format: task_name: {task, schedule, options}
+# Tasks are routed to their default queue (see zeam.worker_registry.queues);
+# set options={"queue": QueueNames.BACKFILL, ...} to override.
 CELERY_BEAT_SCHEDULE = {
+    # Keep the current week of every aliased segment fresh
+    "refresh-current-week": {
+        "task": WorkerNames.REFRESH_CURRENT_WEEK,
+        "schedule": aligned_schedule(WORKER_INTERVAL_MINUTES),
+    },
+    # Re-rank trending shows from the curated lists published so far
+    "trending": {
+        "task": WorkerNames.TRENDING,
+        "schedule": aligned_schedule(WORKER_INTERVAL_MINUTES),
+    },
+    # Start the new week right at the boundary; until a segment's new week is
+    # published, its alias keeps serving the previous one
+    "week-rollover": {
+        "task": WorkerNames.REFRESH_CURRENT_WEEK,
+        "schedule": crontab(minute=0, hour=0, day_of_week="mon"),
+    },
 }
 
 
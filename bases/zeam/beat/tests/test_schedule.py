@@ -0,0 +1,32 @@
+import pickle
+from datetime import datetime, timezone
+
+from zeam.beat.schedule import aligned_schedule
+from zeam.worker_registry.windows import seconds_until_next_refresh
+
+
+def at(hour, minute, second=0):
+    return datetime(2025, 1, 6, hour, minute, second, tzinfo=timezone.utc)
+
+
+def test_runs_at_refresh_times_aligned_to_midnight():
+    now = at(12, 59, 50)
+    interval = aligned_schedule(60, nowfun=lambda: now)
+
+    # Beat started at 12:20: the next run is at 13:00, not 13:20
+    assert interval.is_due(at(12, 20)) == (False, 10.0)
+    now = at(13, 0, 1)
+    assert interval.is_due(at(12, 20)) == (True, 3599.0)
+    assert interval.is_due(at(13, 0, 1)) == (False, 3599.0)
+
+
+def test_next_run_matches_cache_max_age():
+    now = at(7, 10)
+    interval = aligned_schedule(45, nowfun=lambda: now)
+
+    _, next_run = interval.is_due(now)
+    assert next_run == seconds_until_next_refresh(now, 45)
+
+
+def test_survives_the_beat_schedule_store():
+    assert pickle.loads(pickle.dumps(aligned_schedule(30))).interval_minutes == 30
@@ -1,8 +1,19 @@
 from zeam.worker.main import app
+from zeam.config.core import settings
+from zeam.worker_registry.queues import get_worker_concurrency
 import sys
 
 def main():
-    sys.argv.append("worker")
+    # Consume the configured queues with a pool sized for them, e.g.
+    # WORKER_QUEUES=interactive for a dedicated interactive pool
+    queues = [queue.strip() for queue in settings.WORKER_QUEUES.split(",") if queue.strip()]
+
+    sys.argv.extend([
+        "worker",
+        f"--queues={','.join(queues)}",
+        f"--concurrency={get_worker_concurrency(queues)}",
+        f"--hostname={'-'.join(queues)}@%h",
+    ])
     app.start()
 
 if __name__ == "__main__":
@@ -0,0 +1,14 @@
+import logging
+import socket
+
+from zeam.worker_registry.live_popularity import consume_events
+
+
+def main():
+    # Consumers are named after the host, so a restarted consumer picks up
+    # the events it had read but not yet acknowledged
+    logging.basicConfig(level=logging.INFO)
+    consume_events(socket.gethostname())
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,24 @@
 Celery Worker Application
 """
 from celery import Celery
-from zeam.redis_client.config import settings as redis_settings
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_process_shutdown
+from zeam.config.core import settings
+from zeam.profiling import finish_task_profile, start_task_profile, task_profiling_enabled
+from zeam.redis_client.config import RedisRole, settings as redis_settings
+from zeam.redshift import close_idle_connections
+from zeam.worker_registry.ledger import mark_run_started, record_finished_run
+from zeam.worker_registry.queues import get_celery_queue_config, record_wait_time, stamp_enqueued_at
+
+
+def close_warehouse_sessions(**kwargs):
+    # Idle warehouse sessions are kept between tasks; close them with the process
+    close_idle_connections()
+
 
 app = Celery(
     "zeam.worker",
-    broker=f"redis://{redis_settings.REDIS_HOST}:{redis_settings.REDIS_PORT}/{redis_settings.REDIS_DB}",
-    backend=f"redis://{redis_settings.REDIS_HOST}:{redis_settings.REDIS_PORT}/{redis_settings.REDIS_DB}",
+    broker=redis_settings.url_for(RedisRole.BROKER),
+    backend=redis_settings.url_for(RedisRole.RESULTS),
     include=["zeam.worker.tasks"]
 )
 
@@ -18,14 +30,29 @@ app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
+    # The soft limit raises SoftTimeLimitExceeded in the task, which cancels
+    # its running warehouse statement before the hard limit kills the process
+    task_soft_time_limit=3300,
     task_time_limit=3600,
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
     result_backend_transport_options={
         "global_keyprefix": "zeam-recommender:"
     },
-    result_extended=True
+    task_ignore_result=not settings.WORKER_STORE_RESULTS,
+    result_extended=settings.WORKER_RESULT_EXTENDED,
+    result_expires=settings.WORKER_RESULT_EXPIRES_SECONDS,
+    **get_celery_queue_config()
 )
 
+before_task_publish.connect(stamp_enqueued_at, weak=False)
+task_prerun.connect(record_wait_time, weak=False)
+task_prerun.connect(mark_run_started, weak=False)
+task_postrun.connect(record_finished_run, weak=False)
+worker_process_shutdown.connect(close_warehouse_sessions, weak=False)
+if task_profiling_enabled():
+    task_prerun.connect(start_task_profile, weak=False)
+    task_postrun.connect(finish_task_profile, weak=False)
+
 if __name__ == "__main__":
     app.start()
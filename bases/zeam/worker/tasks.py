@@ -2,17 +2,23 @@
 Worker tasks implementation
 """
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from celery import shared_task
+from zeam.worker_registry.aliases import get_refresh_jobs
+from zeam.worker_registry.backfill import run_backfill_slice
 from zeam.worker_registry.core import WorkerNames
-from zeam.worker_registry.curated_content import run_curated_content_task
+from zeam.worker_registry.curated_content import run_curated_content_batch, run_curated_content_task
+from zeam.worker_registry.dedup import RunInFlight
+from zeam.worker_registry.content_popularity import run_content_popularity_cube_task, run_content_popularity_task
+from zeam.worker_registry.queues import get_send_options
+from zeam.worker_registry.trending import run_trending_task
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, name=WorkerNames.CURATED_CONTENT_POPULARITY)
-def curated_content_popularity(self, start_date: str, end_date: str, dma_id: Optional[int] = None, item_count: int = 10) -> Dict[str, Any]:
+def curated_content_popularity(self, start_date: str, end_date: str, dma_id: Optional[int] = None, item_count: int = 10, dedup_policy: Optional[str] = None, statement_timeout_ms: Optional[int] = None) -> Dict[str, Any]:
     """
     Calculate curated content popularity for a given period and optionally filter by DMA.
     
@@ -21,14 +27,158 @@ def curated_content_popularity(self, start_date: str, end_date: str, dma_id: Opt
         end_date: End date string (YYYY-MM-DD HH:MM:SS)
         dma_id: Optional DMA ID to filter by
         item_count: Number of items to return (default 10)
+        dedup_policy: "skip", "join" or "force" for duplicate runs (default TASK_DEDUP_POLICY)
+        statement_timeout_ms: Server-side query timeout (default REDSHIFT_STATEMENT_TIMEOUT_MS)
     """
     run_id = self.request.id
     task_name = WorkerNames.CURATED_CONTENT_POPULARITY
 
     try:
         logger.info(f"Starting {task_name} - Run ID: {run_id}")
-        return run_curated_content_task(start_date, end_date, dma_id, item_count, run_id)
+        return run_curated_content_task(start_date, end_date, dma_id, item_count, run_id, dedup_policy, statement_timeout_ms)
+
+    except RunInFlight as e:
+        # Joining: come back once the identical run in flight may have finished
+        if self.request.retries < e.max_retries:
+            logger.info(f"{task_name} joins run {e.run_id}, retrying in {e.countdown}s - Run ID: {run_id}")
+            raise self.retry(countdown=e.countdown, max_retries=e.max_retries)
+        return e.result
+
+    except Exception as e:
+        logger.error(f"Failed {task_name}: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(bind=True, name=WorkerNames.CONTENT_POPULARITY)
+def content_popularity(self, start_date: Optional[str] = None, end_date: Optional[str] = None, dma_id: Optional[int] = None, client_platform_id: Optional[int] = None, item_count: int = 30, statement_timeout_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Calculate popularity for every content type from a single log scan.
+    
+    Args:
+        start_date: Start date string (YYYY-MM-DD HH:MM:SS), defaults to the current week start
+        end_date: End date string (YYYY-MM-DD HH:MM:SS), defaults to the current week end
+        dma_id: Optional DMA ID to filter by
+        client_platform_id: Optional client platform ID to filter by
+        item_count: Number of items to keep per content type (default 30)
+        statement_timeout_ms: Server-side query timeout (default REDSHIFT_STATEMENT_TIMEOUT_MS)
+    """
+    run_id = self.request.id
+    task_name = WorkerNames.CONTENT_POPULARITY
+
+    try:
+        logger.info(f"Starting {task_name} - Run ID: {run_id}")
+        return run_content_popularity_task(start_date, end_date, dma_id, client_platform_id, item_count, run_id, statement_timeout_ms)
 
     except Exception as e:
         logger.error(f"Failed {task_name}: {str(e)}", exc_info=True)
         raise
+
+
+@shared_task(bind=True, name=WorkerNames.CONTENT_POPULARITY_CUBE)
+def content_popularity_cube(self, start_date: Optional[str] = None, end_date: Optional[str] = None, item_count: int = 30, min_viewers: Optional[int] = None, statement_timeout_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Calculate popularity for every content type in every DMA × client platform segment
+    and their DMA, platform and global rollups from a single log scan.
+    
+    Args:
+        start_date: Start date string (YYYY-MM-DD HH:MM:SS), defaults to the current week start
+        end_date: End date string (YYYY-MM-DD HH:MM:SS), defaults to the current week end
+        item_count: Number of items to keep per content type and segment (default 30)
+        min_viewers: Fewest viewers of an item ranked below the global segment (default SEGMENT_CUBE_MIN_VIEWERS)
+        statement_timeout_ms: Server-side query timeout (default REDSHIFT_STATEMENT_TIMEOUT_MS)
+    """
+    run_id = self.request.id
+    task_name = WorkerNames.CONTENT_POPULARITY_CUBE
+
+    try:
+        logger.info(f"Starting {task_name} - Run ID: {run_id}")
+        return run_content_popularity_cube_task(start_date, end_date, item_count, min_viewers, run_id, statement_timeout_ms)
+
+    except Exception as e:
+        logger.error(f"Failed {task_name}: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(bind=True, name=WorkerNames.CURATED_CONTENT_POPULARITY_BATCH)
+def curated_content_popularity_batch(self, jobs: List[Dict[str, Any]], max_concurrency: Optional[int] = None, statement_timeout_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Calculate curated content popularity for many periods/DMAs concurrently in this worker process.
+    
+    Args:
+        jobs: List of curated_content_popularity keyword arguments
+        max_concurrency: Number of concurrent warehouse queries (default REDSHIFT_MAX_CONCURRENT_SESSIONS)
+        statement_timeout_ms: Server-side timeout of each query (default REDSHIFT_STATEMENT_TIMEOUT_MS)
+    """
+    run_id = self.request.id
+    task_name = WorkerNames.CURATED_CONTENT_POPULARITY_BATCH
+
+    try:
+        logger.info(f"Starting {task_name} with {len(jobs)} jobs - Run ID: {run_id}")
+        return run_curated_content_batch(jobs, max_concurrency, run_id, statement_timeout_ms)
+
+    except Exception as e:
+        logger.error(f"Failed {task_name}: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(bind=True, name=WorkerNames.TRENDING)
+def trending(self, start_date: Optional[str] = None, end_date: Optional[str] = None, dma_ids: Optional[List[Optional[int]]] = None, item_count: int = 10) -> Dict[str, Any]:
+    """
+    Rank trending shows from the published curated content of a window and the one before it.
+    
+    Args:
+        start_date: Start date string (YYYY-MM-DD HH:MM:SS), defaults to the current week start
+        end_date: End date string (YYYY-MM-DD HH:MM:SS), defaults to the current week end
+        dma_ids: DMAs to rank (null entry = global), defaults to every DMA published for the window
+        item_count: Number of shows to keep per DMA (default 10)
+    """
+    run_id = self.request.id
+    task_name = WorkerNames.TRENDING
+
+    try:
+        logger.info(f"Starting {task_name} - Run ID: {run_id}")
+        return run_trending_task(start_date, end_date, dma_ids, item_count, run_id)
+
+    except Exception as e:
+        logger.error(f"Failed {task_name}: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(bind=True, name=WorkerNames.REFRESH_CURRENT_WEEK)
+def refresh_current_week(self) -> Dict[str, Any]:
+    """
+    Recompute the current week of every segment served through a current week alias.
+    Each segment's alias moves to the new week as soon as its run publishes it.
+    """
+    run_id = self.request.id
+    jobs = get_refresh_jobs()
+    logger.info(f"Refreshing the current week of {len(jobs)} aliased segments - Run ID: {run_id}")
+
+    for task_name, kwargs in jobs:
+        self.app.send_task(task_name, kwargs=kwargs, **get_send_options(task_name))
+
+    return {"status": "success", "run_id": run_id, "jobs": len(jobs)}
+
+
+@shared_task(bind=True, name=WorkerNames.CURATED_CONTENT_BACKFILL)
+def curated_content_backfill(self, backfill_id: str, statement_timeout_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run one slice of a backfill and enqueue the next one until it is done or stopped.
+    
+    Args:
+        backfill_id: Backfill created through the scheduler API
+        statement_timeout_ms: Server-side timeout of each query (default REDSHIFT_STATEMENT_TIMEOUT_MS)
+    """
+    run_id = self.request.id
+    task_name = WorkerNames.CURATED_CONTENT_BACKFILL
+
+    try:
+        logger.info(f"Starting {task_name} for backfill {backfill_id} - Run ID: {run_id}")
+        result = run_backfill_slice(backfill_id, run_id, statement_timeout_ms)
+    except Exception as e:
+        logger.error(f"Failed {task_name}: {str(e)}", exc_info=True)
+        raise
+
+    if result["continue"]:
+        self.apply_async(kwargs={"backfill_id": backfill_id, "statement_timeout_ms": statement_timeout_ms}, **get_send_options(task_name))
+    return result
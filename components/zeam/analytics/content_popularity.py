@@ -0,0 +1,106 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from zeam.analytics.queries import get_query
+from zeam.redshift import execute_query
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE_QUERY = "content_type_popularity"
+CUBE_QUERY = "content_type_popularity_cube"
+
+
+def get_content_popularity_query(
+    start_date: str,
+    end_date: str,
+    dma_id: Optional[int] = None,
+    client_platform_id: Optional[int] = None,
+    limit: int = 10,
+) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Returns the compiled per-content-type popularity query and its bound parameters.
+    """
+    template = get_query(CONTENT_TYPE_QUERY)
+    params = template.bind(
+        start_date=start_date,
+        end_date=end_date,
+        dma_id=dma_id or None,
+        client_platform_id=client_platform_id or None,
+        limit=int(limit),
+    )
+    return template.sql, params
+
+
+def get_results(
+    start_date: str,
+    end_date: str,
+    dma_id: Optional[int] = None,
+    client_platform_id: Optional[int] = None,
+    limit: int = 10,
+    statement_timeout_ms: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Executes the content type popularity query and returns the top `limit` rows
+    of every content type from a single scan of the playback log.
+
+    Args:
+        start_date: Start date string
+        end_date: End date string
+        dma_id: Optional DMA ID
+        client_platform_id: Optional client platform ID
+        limit: Number of items per content type
+        statement_timeout_ms: Optional server-side statement timeout
+
+    Returns:
+        List of result rows ordered by content type and rank.
+    """
+    query, params = get_content_popularity_query(start_date, end_date, dma_id, client_platform_id, limit)
+
+    return execute_query(query, params=params, statement_timeout_ms=statement_timeout_ms)
+
+
+def get_cube_query(
+    start_date: str,
+    end_date: str,
+    limit: int = 10,
+    min_viewers: int = 1,
+) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Returns the compiled segment cube query and its bound parameters.
+    """
+    template = get_query(CUBE_QUERY)
+    params = template.bind(
+        start_date=start_date,
+        end_date=end_date,
+        limit=int(limit),
+        min_viewers=int(min_viewers),
+    )
+    return template.sql, params
+
+
+def get_cube_results(
+    start_date: str,
+    end_date: str,
+    limit: int = 10,
+    min_viewers: int = 1,
+    statement_timeout_ms: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Executes the segment cube query: the top `limit` rows of every content type
+    for every DMA × client platform segment, every DMA, every platform and
+    globally, from a single scan of the playback log (GROUPING SETS).
+
+    Args:
+        start_date: Start date string
+        end_date: End date string
+        limit: Number of items per content type and segment
+        min_viewers: Fewest viewers of an item ranked in a DMA or platform segment
+        statement_timeout_ms: Optional server-side statement timeout
+
+    Returns:
+        List of result rows; dma_id and client_platform_id are None where the
+        segment rolls them up.
+    """
+    query, params = get_cube_query(start_date, end_date, limit, min_viewers)
+
+    return execute_query(query, params=params, statement_timeout_ms=statement_timeout_ms)
@@ -1,38 +1,30 @@
 import logging
-from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
+from zeam.analytics.queries import get_query
 from zeam.redshift import execute_query
 
 logger = logging.getLogger(__name__)
 
-def get_curated_content_sql(start_date: str, end_date: str, dma_id: Optional[int] = None, limit: int = 10) -> str:
-    """
-    Generates the SQL query for curated content popularity.
-    """
-    query_path = Path(__file__).parent / "sql" / "curated_content_popularity.sql"
-    
-    try:
-        query_content = query_path.read_text()
-    except FileNotFoundError:
-        logger.error(f"Query file not found at {query_path}")
-        raise
+CURATED_CONTENT_QUERY = "curated_content_popularity"
 
-    dma_filter = ""
-    if dma_id:
-        dma_filter = f"AND log.dmaid = {dma_id}"
 
-    formatted_query = query_content.format(
+def get_curated_content_query(start_date: str, end_date: str, dma_id: Optional[int] = None, limit: int = 10) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Returns the compiled curated content popularity query and its bound parameters.
+    The query text is identical for every DMA and window so the warehouse can reuse its plan.
+    """
+    template = get_query(CURATED_CONTENT_QUERY)
+    params = template.bind(
         start_date=start_date,
         end_date=end_date,
-        limit=limit,
-        dma_filter=dma_filter,
+        dma_id=dma_id or None,
+        limit=int(limit),
     )
-    
-    return formatted_query
+    return template.sql, params
 
 
-def get_results(start_date: str, end_date: str, dma_id: Optional[int] = None, limit: int = 10) -> List[Dict[str, Any]]:
+def get_results(start_date: str, end_date: str, dma_id: Optional[int] = None, limit: int = 10, statement_timeout_ms: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Executes the curated content popularity query and returns the results.
     
@@ -41,10 +33,11 @@ def get_results(start_date: str, end_date: str, dma_id: Optional[int] = None, li
         end_date: End date string
         dma_id: Optional DMA ID
         limit: Number of items limit
+        statement_timeout_ms: Optional server-side statement timeout
         
     Returns:
         List of result rows.
     """
-    query = get_curated_content_sql(start_date, end_date, dma_id, limit)
+    query, params = get_curated_content_query(start_date, end_date, dma_id, limit)
     
-    return execute_query(query)
+    return execute_query(query, params=params, statement_timeout_ms=statement_timeout_ms)
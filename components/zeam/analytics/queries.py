@@ -0,0 +1,81 @@
+"""
+Query registry for analytics SQL templates.
+
+Templates live in the ``sql`` directory and use ``%(name)s`` placeholders.
+Each template is read from disk and compiled once, on first use, into the
+positional form expected by ``zeam.redshift.execute_query`` so that values are
+bound as real parameters and the query text stays identical across calls.
+"""
+import hashlib
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+SQL_DIR = Path(__file__).parent / "sql"
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+
+class QueryTemplate:
+    """A compiled SQL template with its parameter order and fingerprint."""
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+        self.param_names: Tuple[str, ...] = tuple(_PLACEHOLDER.findall(text))
+        self.sql = _PLACEHOLDER.sub("%s", text)
+        # Whitespace-insensitive hash of the template, stable across deploys
+        # unless the SQL itself changes. Used to tag query metrics.
+        normalized = " ".join(text.split())
+        self.fingerprint = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+    def bind(self, **values: Any) -> Tuple[Any, ...]:
+        """
+        Build the positional parameter tuple for this template.
+
+        Raises:
+            KeyError: If a placeholder in the template has no value.
+        """
+        missing = set(self.param_names) - values.keys()
+        if missing:
+            raise KeyError(f"Missing parameters for query '{self.name}': {sorted(missing)}")
+        return tuple(values[name] for name in self.param_names)
+
+    def __repr__(self) -> str:
+        return f"QueryTemplate(name={self.name!r}, fingerprint={self.fingerprint!r})"
+
+
+_registry: Dict[str, QueryTemplate] = {}
+_lock = threading.Lock()
+
+
+def get_query(name: str) -> QueryTemplate:
+    """
+    Return the compiled template for ``sql/<name>.sql``, loading it on first use.
+    """
+    template = _registry.get(name)
+    if template is not None:
+        return template
+
+    with _lock:
+        template = _registry.get(name)
+        if template is None:
+            query_path = SQL_DIR / f"{name}.sql"
+            try:
+                text = query_path.read_text()
+            except FileNotFoundError:
+                logger.error(f"Query file not found at {query_path}")
+                raise
+            template = QueryTemplate(name, text)
+            _registry[name] = template
+            logger.info(f"Compiled query '{name}' (fingerprint {template.fingerprint})")
+    return template
+
+
+def query_fingerprints() -> Dict[str, str]:
+    """Return the fingerprint of every template loaded so far, keyed by name."""
+    return {name: template.fingerprint for name, template in _registry.items()}
@@ -0,0 +1,40 @@
+WITH content_views AS (
+    SELECT
+        content.content_type,
+        content.content_id,
+        max(content.title) as title,
+        count(distinct log.DeviceIdentifier) as viewers,
+        count(distinct log.contentViewEventIdentifier) as sessions,
+        round(sum(cast(log.playbackDuration as float))/60.0, 1) as duration_minutes
+    FROM
+        prod.log
+        INNER JOIN prod.content ON log.contentid = content.content_id
+    WHERE
+        log.eventtypeid = 1000
+        AND log.playbackstart BETWEEN %(start_date)s AND %(end_date)s
+        AND NOT EXISTS (SELECT * from public.internal_traffic WHERE public.internal_traffic.ip_address = log.deviceip)
+        AND (CAST(%(dma_id)s AS INTEGER) IS NULL OR log.dmaid = %(dma_id)s)
+        AND (CAST(%(client_platform_id)s AS INTEGER) IS NULL OR log.clientplatformid = %(client_platform_id)s)
+    GROUP BY
+        content.content_type,
+        content.content_id
+)
+SELECT
+    content_type,
+    content_id,
+    title,
+    viewers,
+    sessions,
+    duration_minutes,
+    popularity_rank
+FROM (
+    SELECT
+        content_views.*,
+        row_number() OVER (PARTITION BY content_type ORDER BY viewers DESC) as popularity_rank
+    FROM content_views
+) ranked
+WHERE
+    popularity_rank <= %(limit)s
+ORDER BY
+    content_type,
+    popularity_rank;
@@ -0,0 +1,63 @@
+WITH segment_views AS (
+    SELECT
+        GROUPING(log.dmaid) as dma_rollup,
+        GROUPING(log.clientplatformid) as platform_rollup,
+        log.dmaid as dma_id,
+        log.clientplatformid as client_platform_id,
+        content.content_type,
+        content.content_id,
+        max(content.title) as title,
+        count(distinct log.DeviceIdentifier) as viewers,
+        count(distinct log.contentViewEventIdentifier) as sessions,
+        round(sum(cast(log.playbackDuration as float))/60.0, 1) as duration_minutes
+    FROM
+        prod.log
+        INNER JOIN prod.content ON log.contentid = content.content_id
+    WHERE
+        log.eventtypeid = 1000
+        AND log.playbackstart BETWEEN %(start_date)s AND %(end_date)s
+        AND NOT EXISTS (SELECT * from public.internal_traffic WHERE public.internal_traffic.ip_address = log.deviceip)
+    GROUP BY GROUPING SETS (
+        (content.content_type, content.content_id, log.dmaid, log.clientplatformid),
+        (content.content_type, content.content_id, log.dmaid),
+        (content.content_type, content.content_id, log.clientplatformid),
+        (content.content_type, content.content_id)
+    )
+)
+SELECT
+    dma_rollup,
+    platform_rollup,
+    dma_id,
+    client_platform_id,
+    content_type,
+    content_id,
+    title,
+    viewers,
+    sessions,
+    duration_minutes,
+    popularity_rank
+FROM (
+    SELECT
+        segment_views.*,
+        row_number() OVER (
+            PARTITION BY dma_rollup, platform_rollup, dma_id, client_platform_id, content_type
+            ORDER BY viewers DESC
+        ) as popularity_rank
+    FROM segment_views
+    -- Views without a DMA or platform (NULL, or 0, which keys read as "any")
+    -- only count towards the rollups
+    WHERE
+        (dma_rollup = 1 OR COALESCE(dma_id, 0) <> 0)
+        AND (platform_rollup = 1 OR COALESCE(client_platform_id, 0) <> 0)
+) ranked
+WHERE
+    popularity_rank <= %(limit)s
+    -- Items of too small an audience are left to the coarser segments
+    AND (viewers >= %(min_viewers)s OR (dma_rollup = 1 AND platform_rollup = 1))
+ORDER BY
+    dma_rollup,
+    platform_rollup,
+    dma_id,
+    client_platform_id,
+    content_type,
+    popularity_rank;
@@ -9,12 +9,12 @@ FROM
     INNER JOIN prod.show_content ON log.contentid = show_content.content_id
 WHERE
     log.eventtypeid = 1000
-    AND log.playbackstart BETWEEN '{start_date}' AND '{end_date}'
+    AND log.playbackstart BETWEEN %(start_date)s AND %(end_date)s
     AND NOT EXISTS (SELECT * from public.internal_traffic WHERE public.internal_traffic.ip_address = log.deviceip)
-    {dma_filter}
+    AND (CAST(%(dma_id)s AS INTEGER) IS NULL OR log.dmaid = %(dma_id)s)
 GROUP BY
     show_content.show_title,
     show_content.show_id
 ORDER BY
     viewers DESC
-LIMIT {limit};
+LIMIT %(limit)s;
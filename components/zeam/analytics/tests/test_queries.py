@@ -0,0 +1,49 @@
+import pytest
+
+from zeam.analytics.queries import QueryTemplate, get_query, query_fingerprints
+
+
+def test_template_compiles_named_placeholders():
+    template = QueryTemplate("sample", "SELECT * FROM t WHERE a = %(a)s AND (%(b)s IS NULL OR b = %(b)s)")
+
+    assert template.sql == "SELECT * FROM t WHERE a = %s AND (%s IS NULL OR b = %s)"
+    assert template.param_names == ("a", "b", "b")
+    assert template.bind(a=1, b=2) == (1, 2, 2)
+
+
+def test_template_bind_missing_parameter():
+    template = QueryTemplate("sample", "SELECT %(a)s")
+
+    with pytest.raises(KeyError):
+        template.bind()
+
+
+def test_fingerprint_ignores_whitespace():
+    a = QueryTemplate("a", "SELECT 1\nFROM t")
+    b = QueryTemplate("b", "SELECT  1 FROM   t")
+    c = QueryTemplate("c", "SELECT 2 FROM t")
+
+    assert a.fingerprint == b.fingerprint
+    assert a.fingerprint != c.fingerprint
+
+
+def test_get_query_is_cached():
+    first = get_query("curated_content_popularity")
+    second = get_query("curated_content_popularity")
+
+    assert first is second
+    assert query_fingerprints()["curated_content_popularity"] == first.fingerprint
+
+
+def test_get_query_unknown():
+    with pytest.raises(FileNotFoundError):
+        get_query("does_not_exist")
+
+
+def test_cube_query_binds_window_once():
+    from zeam.analytics.content_popularity import get_cube_query
+
+    sql, params = get_cube_query("2025-01-06 00:00:00", "2025-01-12 23:59:59", 30, 5)
+
+    assert "GROUPING SETS" in sql
+    assert params == ("2025-01-06 00:00:00", "2025-01-12 23:59:59", 30, 5)
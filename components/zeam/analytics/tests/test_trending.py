@@ -0,0 +1,61 @@
+import pytest
+
+from zeam.analytics.trending import rank_trending
+
+
+def rows(*viewers_by_show):
+    return [{"show_id": show_id, "show_title": f"Show {show_id}", "viewers": viewers} for show_id, viewers in viewers_by_show]
+
+
+def test_ranks_growth_per_segment():
+    current = {
+        "501": rows((1, 700), (2, 400), (3, 100)),
+        "global": rows((1, 7000), (4, 3000)),
+    }
+    previous = {
+        "501": rows((1, 700), (2, 100), (3, 200)),
+        "global": rows((1, 5000), (4, 3500)),
+    }
+
+    ranked = rank_trending(current, previous, 7, 7, min_viewers=20)
+
+    # Show 1 is flat and show 3 declining in 501
+    assert [item["id"] for item in ranked["501"]] == ["2"]
+    assert ranked["501"][0] == {"id": "2", "title": "Show 2", "type": "show", "viewers": 400, "growth": 3.0, "score": pytest.approx(8.697, abs=0.001)}
+    assert [item["id"] for item in ranked["global"]] == ["1"]
+
+
+def test_partial_window_is_compared_as_a_daily_rate():
+    current = {"501": rows((1, 300))}
+    previous = {"501": rows((1, 700))}
+
+    # 300 viewers in 2 days beat 700 in 7
+    ranked = rank_trending(current, previous, 2, 7)
+
+    assert ranked["501"][0]["growth"] == 0.5
+
+
+def test_new_entrant_counts_as_last_listed_show():
+    current = {"501": rows((1, 500), (9, 400))}
+    previous = {"501": rows((1, 500), (2, 50))}
+
+    ranked = rank_trending(current, previous, 7, 7)
+
+    assert ranked["501"][0]["id"] == "9"
+    assert ranked["501"][0]["growth"] == 7.0
+
+
+def test_segments_without_previous_list_and_small_audiences_are_left_out():
+    current = {"501": rows((1, 500)), "502": rows((1, 10))}
+    previous = {"501": None, "502": rows((1, 1))}
+
+    assert rank_trending(current, previous, 7, 7, min_viewers=20) == {}
+
+
+def test_limit_per_segment():
+    current = {"501": rows(*[(show_id, 100 + show_id) for show_id in range(20)])}
+    previous = {"501": rows((99, 10))}
+
+    ranked = rank_trending(current, previous, 7, 7, limit=5)
+
+    assert [item["id"] for item in ranked["501"]] == ["19", "18", "17", "16", "15"]
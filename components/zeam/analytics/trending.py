@@ -0,0 +1,88 @@
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+TRENDING_COLUMNS = ["segment", "window", "show_id", "show_title", "viewers"]
+
+
+def rank_trending(
+    current: Dict[str, List[Dict[str, Any]]],
+    previous: Dict[str, List[Dict[str, Any]]],
+    current_days: float,
+    previous_days: float,
+    limit: int = 10,
+    min_viewers: int = 20,
+    prior_viewers: float = 10.0,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Ranks shows by viewer growth between two windows of curated popularity
+    rows, for every segment at once.
+
+    Viewers are compared as daily rates, so a window still in progress can
+    be compared with a complete one. A show's score is its rate increase
+    over the square root of its previous rate plus `prior_viewers` a day:
+    large absolute gains rank first, and small audiences need a larger
+    relative jump. A show missing from a segment's previous list had at
+    most as many viewers as the last show listed there, which is used as
+    its previous count. Segments without a previous list are left out.
+
+    Args:
+        current: Curated rows (show_id, show_title, viewers) per segment for the current window
+        previous: Curated rows per segment for the previous window
+        current_days: Days of data in the current window
+        previous_days: Days of data in the previous window
+        limit: Shows kept per segment
+        min_viewers: Fewest current viewers of a ranked show
+        prior_viewers: Daily viewers added to every previous rate
+
+    Returns:
+        Items (id, title, type, viewers, growth, score) per segment, best first.
+    """
+    import numpy as np
+    import pandas as pd
+
+    records = [
+        (segment, window, str(row["show_id"]), row["show_title"], row["viewers"])
+        for window, lists in (("current", current), ("previous", previous))
+        for segment, rows in lists.items()
+        for row in rows or []
+    ]
+    frame = pd.DataFrame.from_records(records, columns=TRENDING_COLUMNS)
+    is_current = frame["window"] == "current"
+    shows = frame[is_current].drop(columns="window")
+    before = frame[~is_current]
+    if shows.empty or before.empty:
+        return {}
+
+    # Upper bound of the viewers of shows that were not in the previous list
+    floors = before.groupby("segment")["viewers"].min()
+    shows = shows[shows["segment"].isin(floors.index)].merge(
+        before[["segment", "show_id", "viewers"]].rename(columns={"viewers": "previous_viewers"}),
+        on=["segment", "show_id"],
+        how="left",
+    )
+    shows["previous_viewers"] = shows["previous_viewers"].fillna(shows["segment"].map(floors))
+
+    current_rate = shows["viewers"] / current_days
+    previous_rate = shows["previous_viewers"] / previous_days
+    shows["score"] = (current_rate - previous_rate) / np.sqrt(previous_rate + prior_viewers)
+    shows["growth"] = current_rate / previous_rate.replace(0, np.nan) - 1
+    shows = shows[(shows["viewers"] >= min_viewers) & (shows["score"] > 0)]
+    top = shows.sort_values("score", ascending=False, kind="stable").groupby("segment", sort=False).head(limit)
+
+    ranked: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for segment, show_id, title, viewers, growth, score in zip(
+        top["segment"], top["show_id"], top["show_title"], top["viewers"], top["growth"], top["score"]
+    ):
+        ranked[segment].append({
+            "id": show_id,
+            "title": title,
+            "type": "show",
+            "viewers": int(viewers),
+            "growth": None if np.isnan(growth) else round(float(growth), 4),
+            "score": round(float(score), 4),
+        })
+    logger.info(f"Ranked trending shows of {len(ranked)} segments from {len(frame)} rows")
+    return dict(ranked)
@@ -9,9 +9,110 @@ class ZeamBaseSettings(BaseSettings):
 
 class Settings(ZeamBaseSettings):
     PROJECT_NAME: str = "Popularity Recommender"
+    SERVER_HOST: str = "0.0.0.0"
     SERVER_PORT: int = 8000
+    # Production server worker processes; 0 autodetects from the CPU limit
+    SERVER_WORKERS: int = 0
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_ACCESS_LOG: bool = False
+
+    # Serving latency budget: Redis reads of one request share SERVING_BUDGET_MS,
+    # each read is cut off after SERVING_REDIS_TIMEOUT_MS
+    SERVING_BUDGET_MS: int = 250
+    SERVING_REDIS_TIMEOUT_MS: int = 100
+    # Consecutive Redis failures that open the circuit breaker, and how long it stays open
+    SERVING_BREAKER_FAILURES: int = 5
+    SERVING_BREAKER_RESET_SECONDS: float = 10.0
+    # Published keys kept in process as the last-known-good copy
+    SERVING_LAST_GOOD_MAX_KEYS: int = 10000
+    # Cache lifetime of responses served by a fallback tier
+    SERVING_DEGRADED_MAX_AGE_SECONDS: int = 30
+
+    # Admission control of the API, per process: requests in flight per route
+    # class (0 for no limit), and how long a request waits for a slot before it
+    # is shed with a degraded response from memory or 503 + Retry-After. Admin
+    # routes are shed while recommend requests use ADMISSION_ADMIN_YIELD_FRACTION of their slots
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_RECOMMEND_CONCURRENCY: int = 256
+    ADMISSION_EVENTS_CONCURRENCY: int = 64
+    ADMISSION_ADMIN_CONCURRENCY: int = 4
+    ADMISSION_QUEUE_MS: int = 50
+    ADMISSION_ADMIN_YIELD_FRACTION: float = 0.5
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # How long the API keeps its copy of the current week aliases
+    ALIAS_CACHE_SECONDS: float = 5.0
+
+    # Background dependency probes of the API; health endpoints serve their cached results
+    HEALTH_REDIS_PROBE_INTERVAL_SECONDS: float = 5.0
+    HEALTH_REDSHIFT_PROBE_INTERVAL_SECONDS: float = 60.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 10.0
+    # Recent probes kept per dependency for latency and error rate
+    HEALTH_PROBE_WINDOW: int = 60
     
     # Worker Schedule
     WORKER_INTERVAL_MINUTES: int = 60
-    
+
+    # Worker queues: comma-separated queues a worker process consumes, and the
+    # pool size each queue contributes to it
+    WORKER_QUEUES: str = "interactive,scheduled,backfill"
+    WORKER_CONCURRENCY_INTERACTIVE: int = 2
+    WORKER_CONCURRENCY_SCHEDULED: int = 4
+    WORKER_CONCURRENCY_BACKFILL: int = 2
+
+    # Task deduplication: "skip", "join" or "force" for duplicate runs
+    TASK_DEDUP_POLICY: str = "skip"
+    # The result of an identical run younger than this is reused instead of recomputed
+    TASK_DEDUP_FRESH_SECONDS: int = 600
+    # Joining duplicates are re-enqueued every TASK_DEDUP_JOIN_RETRY_SECONDS
+    # until the run in flight finishes, for at most TASK_DEDUP_JOIN_TIMEOUT_SECONDS
+    TASK_DEDUP_JOIN_RETRY_SECONDS: int = 30
+    TASK_DEDUP_JOIN_TIMEOUT_SECONDS: int = 600
+    TASK_INFLIGHT_TTL_SECONDS: int = 3600
+    TASK_RESULT_TTL_SECONDS: int = 86400
+
+    # Full Celery results are optional and short-lived; the run ledger keeps
+    # a compact record of every run
+    WORKER_STORE_RESULTS: bool = True
+    WORKER_RESULT_EXTENDED: bool = False
+    WORKER_RESULT_EXPIRES_SECONDS: int = 3600
+    RUN_LEDGER_MAX_ENTRIES: int = 10000
+
+    # Backfills run their chunks BACKFILL_MAX_CONCURRENCY at a time, in task
+    # slices of BACKFILL_SLICE_SECONDS, and back off while warehouse queries
+    # wait longer than BACKFILL_MAX_QUEUE_SECONDS in the WLM queue
+    BACKFILL_MAX_CONCURRENCY: int = 4
+    BACKFILL_MAX_CHUNKS: int = 50000
+    BACKFILL_SLICE_SECONDS: int = 600
+    BACKFILL_MAX_QUEUE_SECONDS: float = 30.0
+    BACKFILL_THROTTLE_SECONDS: float = 60.0
+    BACKFILL_RETENTION_SECONDS: int = 2592000
+
+    # Trending shows: ranked shows need TRENDING_MIN_VIEWERS viewers in the
+    # current window; TRENDING_PRIOR_VIEWERS (a day) damps small audiences
+    TRENDING_MIN_VIEWERS: int = 20
+    TRENDING_PRIOR_VIEWERS: float = 10.0
+
+    # Segment cube: an item ranks in a DMA or platform segment with at least
+    # SEGMENT_CUBE_MIN_VIEWERS viewers; smaller audiences fall back to coarser segments
+    SEGMENT_CUBE_MIN_VIEWERS: int = 5
+
+    # Live popularity from playback events: a view's weight halves every
+    # LIVE_HALF_LIFE_SECONDS; score keys start over every LIVE_GENERATION_SECONDS
+    LIVE_HALF_LIFE_SECONDS: int = 3600
+    LIVE_GENERATION_SECONDS: int = 86400
+    # Events accepted per ingest request and read per stream batch
+    LIVE_MAX_BATCH: int = 1000
+    LIVE_STREAM_MAX_ENTRIES: int = 100000
+    LIVE_STREAM_BLOCK_MS: int = 5000
+    # Largest weight of one view (e.g. minutes watched in a day); heavier views count as this
+    LIVE_MAX_EVENT_WEIGHT: float = 1440.0
+
+    # Per-device "already watched" Bloom filters, SEEN_FILTER_BITS / 8 bytes per
+    # device and period; the current and previous periods are checked
+    SEEN_FILTER_ENABLED: bool = True
+    SEEN_FILTER_BITS: int = 4096
+    SEEN_FILTER_HASHES: int = 4
+    SEEN_PERIOD_SECONDS: int = 604800
+
 settings = Settings()
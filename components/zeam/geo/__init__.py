@@ -0,0 +1,3 @@
+from zeam.geo.index import DmaIndex, get_dma_index, resolve_dma
+
+__all__ = ["DmaIndex", "get_dma_index", "resolve_dma"]
@@ -0,0 +1,13 @@
+from zeam.config.core import ZeamBaseSettings
+
+class GeoSettings(ZeamBaseSettings):
+    # GeoJSON FeatureCollection of DMA boundaries; resolution is disabled when unset
+    DMA_BOUNDARY_FILE: str | None = None
+    # Feature property holding the DMA id
+    DMA_ID_PROPERTY: str = "dma_id"
+    # Grid cell size of the spatial index, in degrees
+    DMA_INDEX_CELL_DEGREES: float = 0.5
+    # Horizontal edge strips per grid cell; more strips means fewer edges tested per lookup
+    DMA_INDEX_STRIPS_PER_CELL: int = 32
+
+settings = GeoSettings()
@@ -0,0 +1,177 @@
+"""
+In-memory spatial index resolving coordinates to DMA ids.
+
+Boundaries are read once from a GeoJSON FeatureCollection. Polygons are
+bucketed into a regular lon/lat grid, and each polygon keeps its edges split
+into thin horizontal strips, so a lookup only tests the few candidate polygons
+of one cell against the handful of edges crossing the point's strip.
+"""
+import json
+import logging
+import math
+import sys
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from zeam.geo.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cell keys pack (ix, iy) into one int; iy < 2**16 for any cell size >= 0.003 degrees
+_ROW_BITS = 16
+
+
+def _row(y: float, height: float) -> int:
+    return int(math.floor((y + 90.0) / height))
+
+
+def _column(x: float, width: float) -> int:
+    return int(math.floor((x + 180.0) / width))
+
+
+class _Polygon:
+    """One polygon (with its holes) of a DMA, stored as per-strip edge arrays."""
+
+    __slots__ = ("dma_id", "min_x", "min_y", "max_x", "max_y", "strips")
+
+    def __init__(self, dma_id: int, rings: Sequence[Sequence[Sequence[float]]], strip_degrees: float):
+        self.dma_id = dma_id
+        xs = [point[0] for ring in rings for point in ring]
+        ys = [point[1] for ring in rings for point in ring]
+        self.min_x, self.max_x = min(xs), max(xs)
+        self.min_y, self.max_y = min(ys), max(ys)
+
+        # Edges of every ring, holes included: the even-odd rule subtracts holes for free
+        self.strips: Dict[int, array] = {}
+        for ring in rings:
+            for i in range(len(ring)):
+                x1, y1 = ring[i - 1][0], ring[i - 1][1]
+                x2, y2 = ring[i][0], ring[i][1]
+                if y1 == y2:
+                    continue
+                edge = (x1, y1, x2, y2)
+                for strip in range(_row(min(y1, y2), strip_degrees), _row(max(y1, y2), strip_degrees) + 1):
+                    edges = self.strips.get(strip)
+                    if edges is None:
+                        edges = self.strips[strip] = array("d")
+                    edges.extend(edge)
+
+    def contains(self, x: float, y: float, strip: int) -> bool:
+        if x < self.min_x or x > self.max_x or y < self.min_y or y > self.max_y:
+            return False
+        edges = self.strips.get(strip)
+        if edges is None:
+            return False
+
+        inside = False
+        for i in range(0, len(edges), 4):
+            x1, y1, x2, y2 = edges[i], edges[i + 1], edges[i + 2], edges[i + 3]
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                inside = not inside
+        return inside
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self.strips) + sum(sys.getsizeof(edges) for edges in self.strips.values())
+
+class DmaIndex:
+    """Grid index over DMA boundary polygons."""
+
+    def __init__(self, polygons: Iterable[_Polygon], cell_degrees: float, strip_degrees: float):
+        self.cell_degrees = cell_degrees
+        self.strip_degrees = strip_degrees
+        self._polygons: List[_Polygon] = list(polygons)
+        self._grid: Dict[int, tuple] = {}
+
+        cells: Dict[int, List[_Polygon]] = {}
+        for polygon in self._polygons:
+            for ix in range(_column(polygon.min_x, cell_degrees), _column(polygon.max_x, cell_degrees) + 1):
+                for iy in range(_row(polygon.min_y, cell_degrees), _row(polygon.max_y, cell_degrees) + 1):
+                    cells.setdefault((ix << _ROW_BITS) | iy, []).append(polygon)
+        self._grid = {key: tuple(candidates) for key, candidates in cells.items()}
+
+    @classmethod
+    def from_geojson(
+        cls,
+        data: Dict[str, Any],
+        id_property: Optional[str] = None,
+        cell_degrees: Optional[float] = None,
+        strips_per_cell: Optional[int] = None,
+    ) -> "DmaIndex":
+        """
+        Build an index from a GeoJSON FeatureCollection of Polygon/MultiPolygon features.
+        """
+        id_property = id_property or settings.DMA_ID_PROPERTY
+        cell_degrees = cell_degrees or settings.DMA_INDEX_CELL_DEGREES
+        strip_degrees = cell_degrees / (strips_per_cell or settings.DMA_INDEX_STRIPS_PER_CELL)
+
+        polygons = []
+        for feature in data.get("features", []):
+            geometry = feature.get("geometry") or {}
+            dma_id = int(feature["properties"][id_property])
+            if geometry.get("type") == "Polygon":
+                polygons.append(_Polygon(dma_id, geometry["coordinates"], strip_degrees))
+            elif geometry.get("type") == "MultiPolygon":
+                for rings in geometry["coordinates"]:
+                    polygons.append(_Polygon(dma_id, rings, strip_degrees))
+            else:
+                logger.warning(f"Skipping DMA {dma_id} with unsupported geometry: {geometry.get('type')}")
+        return cls(polygons, cell_degrees, strip_degrees)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> "DmaIndex":
+        """Build an index from a GeoJSON file on disk."""
+        with Path(path).open() as f:
+            return cls.from_geojson(json.load(f), **kwargs)
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[int]:
+        """Return the DMA id containing the point, or None when it is outside every DMA (or not a point)."""
+        if not (math.isfinite(latitude) and math.isfinite(longitude)):
+            return None
+        cell = (_column(longitude, self.cell_degrees) << _ROW_BITS) | _row(latitude, self.cell_degrees)
+        candidates = self._grid.get(cell)
+        if not candidates:
+            return None
+        strip = _row(latitude, self.strip_degrees)
+        for polygon in candidates:
+            if polygon.contains(longitude, latitude, strip):
+                return polygon.dma_id
+        return None
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the index structures, in bytes."""
+        grid_bytes = sys.getsizeof(self._grid) + sum(sys.getsizeof(cell) for cell in self._grid.values())
+        polygon_bytes = sum(sys.getsizeof(polygon) + polygon.memory_bytes() for polygon in self._polygons)
+        return grid_bytes + polygon_bytes
+
+    def __len__(self) -> int:
+        return len(self._polygons)
+
+
+@lru_cache(maxsize=1)
+def get_dma_index() -> Optional[DmaIndex]:
+    """
+    Return the process-wide DMA index, building it from DMA_BOUNDARY_FILE on first use.
+    Returns None when no boundary file is configured or it can't be loaded; the
+    outcome is cached either way, so a bad file is read (and logged) only once.
+    """
+    if not settings.DMA_BOUNDARY_FILE:
+        return None
+
+    try:
+        index = DmaIndex.from_file(settings.DMA_BOUNDARY_FILE)
+    except Exception as e:
+        # Coordinates then resolve to no DMA and requests are served the global segment
+        logger.error(f"Could not load DMA boundaries from {settings.DMA_BOUNDARY_FILE}, DMA lookup disabled: {e}")
+        return None
+    logger.info(f"Loaded {len(index)} DMA polygons from {settings.DMA_BOUNDARY_FILE} ({index.memory_bytes() / (1024 * 1024):.1f} MiB)")
+    return index
+
+
+def resolve_dma(latitude: float, longitude: float) -> Optional[int]:
+    """Resolve coordinates to a DMA id using the process-wide index."""
+    index = get_dma_index()
+    if index is None:
+        return None
+    return index.lookup(latitude, longitude)
@@ -0,0 +1,94 @@
+import math
+from unittest.mock import patch
+
+from zeam.geo.index import DmaIndex, get_dma_index, resolve_dma
+
+
+def _square(min_x, min_y, max_x, max_y):
+    return [[min_x, min_y], [max_x, min_y], [max_x, max_y], [min_x, max_y], [min_x, min_y]]
+
+
+BOUNDARIES = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {"dma_id": 501},
+            # Square with a hole in the middle
+            "geometry": {"type": "Polygon", "coordinates": [_square(-75, 40, -73, 42), _square(-74.2, 40.8, -73.8, 41.2)]},
+        },
+        {
+            "type": "Feature",
+            "properties": {"dma_id": 803},
+            "geometry": {"type": "MultiPolygon", "coordinates": [[_square(-119, 33, -117, 35)], [_square(-120, 37, -119.5, 37.5)]]},
+        },
+        {
+            "type": "Feature",
+            "properties": {"dma_id": 999},
+            # Triangle sharing no cell edges with the grid
+            "geometry": {"type": "Polygon", "coordinates": [[[-100.3, 30.1], [-99.1, 30.1], [-99.7, 31.9], [-100.3, 30.1]]]},
+        },
+    ],
+}
+
+
+def test_lookup_resolves_points():
+    index = DmaIndex.from_geojson(BOUNDARIES, cell_degrees=0.5)
+
+    assert index.lookup(41.5, -74.5) == 501
+    assert index.lookup(34.0, -118.0) == 803
+    assert index.lookup(37.25, -119.75) == 803
+    assert index.lookup(30.5, -99.7) == 999
+
+
+def test_lookup_outside_and_in_holes():
+    index = DmaIndex.from_geojson(BOUNDARIES, cell_degrees=0.5)
+
+    assert index.lookup(41.0, -74.0) is None  # inside the hole
+    assert index.lookup(31.8, -100.2) is None  # inside the triangle's bounding box only
+    assert index.lookup(0.0, 0.0) is None
+
+
+def test_lookup_of_non_finite_points():
+    index = DmaIndex.from_geojson(BOUNDARIES)
+    assert index.lookup(math.nan, -74.5) is None
+    assert index.lookup(41.5, math.inf) is None
+    assert index.lookup(-math.inf, -math.inf) is None
+
+
+def test_lookup_is_independent_of_cell_size():
+    coarse = DmaIndex.from_geojson(BOUNDARIES, cell_degrees=5.0)
+    fine = DmaIndex.from_geojson(BOUNDARIES, cell_degrees=0.1)
+
+    for lat in [30.2, 30.9, 31.5, 34.0, 40.5, 41.0, 41.9]:
+        for lon in [-119.9, -118.0, -100.0, -99.5, -74.9, -74.0, -73.1]:
+            assert coarse.lookup(lat, lon) == fine.lookup(lat, lon)
+    assert len(fine) == 4
+    assert fine.memory_bytes() > 0
+
+
+@patch("zeam.geo.index.settings")
+def test_resolve_dma_without_boundary_file(mock_settings):
+    mock_settings.DMA_BOUNDARY_FILE = None
+    get_dma_index.cache_clear()
+    try:
+        assert resolve_dma(41.5, -74.5) is None
+    finally:
+        get_dma_index.cache_clear()
+
+
+@patch("zeam.geo.index.DmaIndex.from_file", wraps=DmaIndex.from_file)
+@patch("zeam.geo.index.settings")
+def test_unreadable_boundary_file_disables_lookup(mock_settings, mock_from_file, tmp_path):
+    for path in (tmp_path / "missing.geojson", tmp_path / "malformed.geojson"):
+        (tmp_path / "malformed.geojson").write_text("{not json")
+        mock_settings.DMA_BOUNDARY_FILE = str(path)
+        mock_from_file.reset_mock()
+        get_dma_index.cache_clear()
+        try:
+            assert resolve_dma(41.5, -74.5) is None
+            assert resolve_dma(41.5, -74.5) is None
+            # The failure is cached: the file is not re-read on every lookup
+            assert mock_from_file.call_count == 1
+        finally:
+            get_dma_index.cache_clear()
@@ -0,0 +1,27 @@
+from zeam.profiling.hooks import (
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    PROFILE_QUERY_PARAMETER,
+    finish_task_profile,
+    is_profile_token,
+    request_profiling_enabled,
+    start_task_profile,
+    task_profiling_enabled,
+)
+from zeam.profiling.sampler import SamplingProfiler
+from zeam.profiling.store import get_profile, list_profiles, save_profile
+
+__all__ = [
+    "PROFILE_HEADER",
+    "PROFILE_ID_HEADER",
+    "PROFILE_QUERY_PARAMETER",
+    "SamplingProfiler",
+    "finish_task_profile",
+    "get_profile",
+    "is_profile_token",
+    "list_profiles",
+    "request_profiling_enabled",
+    "save_profile",
+    "start_task_profile",
+    "task_profiling_enabled",
+]
@@ -0,0 +1,19 @@
+from zeam.config.core import ZeamBaseSettings
+
+class ProfilingSettings(ZeamBaseSettings):
+    # API requests are profiled on demand only when enabled, and only when they
+    # carry PROFILING_TOKEN in the X-Profile header or the `profile` query parameter
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str | None = None
+    # Fraction of Celery tasks profiled (0 disables the task hooks)
+    PROFILING_TASK_SAMPLE_RATE: float = 0.0
+    # Time between two stack samples
+    PROFILING_INTERVAL_MS: float = 5.0
+    # "local" (PROFILING_LOCAL_DIR) or "redis" (results endpoint)
+    PROFILING_STORAGE: str = "local"
+    PROFILING_LOCAL_DIR: str = "/tmp/zeam-profiles"
+    # Profiles kept: at most PROFILING_MAX_PROFILES, none older than PROFILING_RETENTION_SECONDS
+    PROFILING_MAX_PROFILES: int = 200
+    PROFILING_RETENTION_SECONDS: int = 86400
+
+settings = ProfilingSettings()
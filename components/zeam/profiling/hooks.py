@@ -0,0 +1,59 @@
+"""
+Entry points deciding what gets profiled: API requests carrying the
+configured token, and a sampled fraction of Celery tasks.
+"""
+import hmac
+import logging
+import random
+import threading
+from typing import Any, Dict, Optional
+
+from zeam.profiling.config import settings
+from zeam.profiling.sampler import SamplingProfiler
+from zeam.profiling.store import save_profile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAMETER = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Profilers of the tasks running in this process, by task id
+_task_profilers: Dict[str, SamplingProfiler] = {}
+_task_profilers_lock = threading.Lock()
+
+
+def request_profiling_enabled() -> bool:
+    return settings.PROFILING_ENABLED and bool(settings.PROFILING_TOKEN)
+
+
+def is_profile_token(token: Optional[str]) -> bool:
+    """Whether a request's profiling flag carries the configured token."""
+    if not token or not request_profiling_enabled():
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), settings.PROFILING_TOKEN.encode("utf-8"))
+
+
+def task_profiling_enabled() -> bool:
+    return settings.PROFILING_TASK_SAMPLE_RATE > 0
+
+
+def start_task_profile(task_id: Optional[str] = None, **kwargs: Any) -> None:
+    """`task_prerun` handler profiling PROFILING_TASK_SAMPLE_RATE of the tasks."""
+    if task_id is None or random.random() >= settings.PROFILING_TASK_SAMPLE_RATE:
+        return
+    with _task_profilers_lock:
+        _task_profilers[task_id] = SamplingProfiler().start()
+
+
+def finish_task_profile(task_id: Optional[str] = None, task: Any = None, state: Optional[str] = None, **kwargs: Any) -> None:
+    """`task_postrun` handler storing the profile of a sampled task."""
+    with _task_profilers_lock:
+        profiler = _task_profilers.pop(task_id, None)
+    if profiler is None:
+        return
+    profiler.stop()
+    try:
+        save_profile(getattr(task, "name", "task"), profiler, task_id=task_id, state=state)
+    except Exception as e:
+        logger.warning(f"Could not save the profile of task {task_id}: {e}")
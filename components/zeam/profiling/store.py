@@ -0,0 +1,109 @@
+"""
+Storage of collected profiles, on local disk or in Redis.
+
+Both keep at most PROFILING_MAX_PROFILES profiles, none older than
+PROFILING_RETENTION_SECONDS, pruning when a profile is saved.
+"""
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from zeam.profiling.config import settings
+from zeam.profiling.sampler import SamplingProfiler
+from zeam.redis_client import RedisRole, sync_client_context
+
+logger = logging.getLogger(__name__)
+
+PROFILES_KEY = "zeam-recommender:profiles"
+PROFILE_SUFFIX = ".folded"
+META_SUFFIX = ".json"
+
+
+def get_profile_key(profile_id: str) -> str:
+    return f"{PROFILES_KEY}:{profile_id}"
+
+
+def _new_profile_id(name: str) -> str:
+    # Sorts by creation time; the name is kept readable in file names
+    return f"{int(time.time() * 1000)}-{re.sub(r'[^A-Za-z0-9._-]+', '_', name)[:64]}-{uuid.uuid4().hex[:8]}"
+
+
+def save_profile(name: str, profiler: SamplingProfiler, **meta: Any) -> str:
+    """Store a finished profile under a new id and return the id."""
+    profile_id = _new_profile_id(name)
+    meta = {
+        "id": profile_id,
+        "name": name,
+        "created_at": time.time(),
+        "duration_ms": round(profiler.duration_seconds * 1000, 1),
+        "samples": profiler.samples,
+        **meta,
+    }
+    if settings.PROFILING_STORAGE == "redis":
+        _save_redis(profile_id, meta, profiler.collapsed())
+    else:
+        _save_local(profile_id, meta, profiler.collapsed())
+    logger.info(f"Saved profile {profile_id} ({meta['samples']} samples over {meta['duration_ms']} ms)")
+    return profile_id
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Metadata of the stored profiles, most recent first."""
+    if settings.PROFILING_STORAGE == "redis":
+        with sync_client_context(RedisRole.RESULTS) as client:
+            profile_ids = client.zrevrange(PROFILES_KEY, 0, -1)
+            pipe = client.pipeline(transaction=False)
+            for profile_id in profile_ids:
+                pipe.hget(get_profile_key(profile_id), "meta")
+            metas = pipe.execute()
+        return [json.loads(meta) for meta in metas if meta]
+
+    directory = Path(settings.PROFILING_LOCAL_DIR)
+    if not directory.is_dir():
+        return []
+    return [json.loads(path.read_text()) for path in sorted(directory.glob(f"*{META_SUFFIX}"), reverse=True)]
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    """Collapsed stacks of a stored profile, None when unknown or expired."""
+    if settings.PROFILING_STORAGE == "redis":
+        with sync_client_context(RedisRole.RESULTS) as client:
+            return client.hget(get_profile_key(profile_id), "stacks")
+
+    path = Path(settings.PROFILING_LOCAL_DIR) / f"{os.path.basename(profile_id)}{PROFILE_SUFFIX}"
+    return path.read_text() if path.is_file() else None
+
+
+def _save_redis(profile_id: str, meta: Dict[str, Any], stacks: str) -> None:
+    oldest = meta["created_at"] - settings.PROFILING_RETENTION_SECONDS
+    with sync_client_context(RedisRole.RESULTS) as client:
+        pipe = client.pipeline(transaction=False)
+        pipe.hset(get_profile_key(profile_id), mapping={"meta": json.dumps(meta), "stacks": stacks})
+        pipe.expire(get_profile_key(profile_id), settings.PROFILING_RETENTION_SECONDS)
+        pipe.zadd(PROFILES_KEY, {profile_id: meta["created_at"]})
+        pipe.zremrangebyscore(PROFILES_KEY, 0, oldest)
+        # Drop the oldest profiles past the cap, with their index entries
+        pipe.zrange(PROFILES_KEY, 0, -settings.PROFILING_MAX_PROFILES - 1)
+        pipe.zremrangebyrank(PROFILES_KEY, 0, -settings.PROFILING_MAX_PROFILES - 1)
+        excess = pipe.execute()[4]
+        if excess:
+            client.delete(*[get_profile_key(old_id) for old_id in excess])
+
+
+def _save_local(profile_id: str, meta: Dict[str, Any], stacks: str) -> None:
+    directory = Path(settings.PROFILING_LOCAL_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{profile_id}{PROFILE_SUFFIX}").write_text(stacks)
+    (directory / f"{profile_id}{META_SUFFIX}").write_text(json.dumps(meta))
+
+    oldest = meta["created_at"] - settings.PROFILING_RETENTION_SECONDS
+    metas = sorted(directory.glob(f"*{META_SUFFIX}"), reverse=True)
+    for index, path in enumerate(metas):
+        if index >= settings.PROFILING_MAX_PROFILES or path.stat().st_mtime < oldest:
+            path.unlink(missing_ok=True)
+            path.with_suffix(PROFILE_SUFFIX).unlink(missing_ok=True)
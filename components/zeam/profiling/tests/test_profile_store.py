@@ -0,0 +1,100 @@
+import json
+import os
+import time
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from zeam.profiling import hooks, store
+from zeam.profiling.sampler import SamplingProfiler
+
+
+def finished_profiler(stacks):
+    profiler = SamplingProfiler()
+    profiler.stacks = Counter(stacks)
+    profiler.duration_seconds = 0.05
+    return profiler
+
+
+@pytest.fixture
+def local_store(tmp_path):
+    with patch.multiple(store.settings, PROFILING_STORAGE="local", PROFILING_LOCAL_DIR=str(tmp_path), PROFILING_MAX_PROFILES=3):
+        yield tmp_path
+
+
+def test_local_profiles_are_listed_and_read_back(local_store):
+    profile_id = store.save_profile("POST /api/v1/recommend", finished_profiler({"main;handler": 3, "main;json": 1}), status_code=200)
+
+    [meta] = store.list_profiles()
+    assert meta["id"] == profile_id
+    assert meta["name"] == "POST /api/v1/recommend"
+    assert meta["samples"] == 4
+    assert meta["status_code"] == 200
+    assert "/" not in profile_id and " " not in profile_id
+    assert store.get_profile(profile_id) == "main;handler 3\nmain;json 1"
+    assert store.get_profile("missing") is None
+
+
+def test_local_profiles_are_capped(local_store):
+    profile_ids = [store.save_profile(f"task-{i}", finished_profiler({"main": 1})) for i in range(5)]
+
+    assert [meta["id"] for meta in store.list_profiles()] == profile_ids[:1:-1]
+    assert len(list(local_store.iterdir())) == 6
+
+
+def test_old_local_profiles_expire(local_store):
+    old_id = store.save_profile("old", finished_profiler({"main": 1}))
+    stale = time.time() - store.settings.PROFILING_RETENTION_SECONDS - 60
+    for path in local_store.iterdir():
+        os.utime(path, (stale, stale))
+
+    store.save_profile("new", finished_profiler({"main": 1}))
+
+    assert [meta["name"] for meta in store.list_profiles()] == ["new"]
+    assert store.get_profile(old_id) is None
+
+
+@patch("zeam.profiling.store.sync_client_context")
+def test_redis_profiles_expire_and_are_capped(mock_context):
+    client = MagicMock()
+    mock_context.return_value.__enter__.return_value = client
+    pipe = client.pipeline.return_value
+    pipe.execute.return_value = [1, True, 1, 0, ["1-old-a"], 1]
+
+    with patch.multiple(store.settings, PROFILING_STORAGE="redis", PROFILING_MAX_PROFILES=200):
+        profile_id = store.save_profile("workers.content_popularity", finished_profiler({"main": 2}))
+
+    key = store.get_profile_key(profile_id)
+    assert json.loads(pipe.hset.call_args[1]["mapping"]["meta"])["samples"] == 2
+    pipe.expire.assert_called_once_with(key, store.settings.PROFILING_RETENTION_SECONDS)
+    pipe.zremrangebyrank.assert_called_once_with(store.PROFILES_KEY, 0, -201)
+    client.delete.assert_called_once_with(store.get_profile_key("1-old-a"))
+
+
+def test_request_token_requires_profiling_enabled():
+    with patch.multiple(hooks.settings, PROFILING_ENABLED=True, PROFILING_TOKEN="secret"):
+        assert hooks.is_profile_token("secret")
+        assert not hooks.is_profile_token("guess")
+        assert not hooks.is_profile_token(None)
+    with patch.multiple(hooks.settings, PROFILING_ENABLED=False, PROFILING_TOKEN="secret"):
+        assert not hooks.is_profile_token("secret")
+    with patch.multiple(hooks.settings, PROFILING_ENABLED=True, PROFILING_TOKEN=None):
+        assert not hooks.is_profile_token("")
+
+
+@patch("zeam.profiling.hooks.save_profile")
+def test_sampled_task_is_profiled_and_saved(mock_save):
+    task = MagicMock()
+    task.name = "workers.curated_content_popularity"
+
+    with patch.object(hooks.settings, "PROFILING_TASK_SAMPLE_RATE", 1.0):
+        hooks.start_task_profile(task_id="t1", task=task)
+        hooks.finish_task_profile(task_id="t1", task=task, state="SUCCESS")
+    with patch.object(hooks.settings, "PROFILING_TASK_SAMPLE_RATE", 0.0):
+        hooks.start_task_profile(task_id="t2", task=task)
+        hooks.finish_task_profile(task_id="t2", task=task, state="SUCCESS")
+
+    mock_save.assert_called_once()
+    assert mock_save.call_args[0][0] == "workers.curated_content_popularity"
+    assert mock_save.call_args[1] == {"task_id": "t1", "state": "SUCCESS"}
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from zeam.profiling.sampler import SamplingProfiler, collapse
+
+
+def busy_leaf(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def busy_caller(seconds):
+    busy_leaf(seconds)
+
+
+def test_collapsed_stack_runs_from_outermost_call():
+    def inner():
+        import sys
+        return collapse(sys._getframe())
+
+    stack = inner().split(";")
+
+    assert stack[-1].startswith("test_collapsed_stack_runs_from_outermost_call.<locals>.inner (test_sampler.py:")
+    assert stack[-2].startswith("test_collapsed_stack_runs_from_outermost_call (test_sampler.py:")
+
+
+def test_profiler_samples_the_calling_thread():
+    with SamplingProfiler(interval_ms=1) as profiler:
+        busy_caller(0.2)
+
+    assert profiler.samples > 20
+    assert profiler.duration_seconds >= 0.2
+    top_stack, count = profiler.stacks.most_common(1)[0]
+    assert "busy_caller" in top_stack and "busy_leaf" in top_stack
+    assert top_stack.index("busy_caller") < top_stack.index("busy_leaf")
+    line = profiler.collapsed().splitlines()[0]
+    assert line == f"{top_stack} {count}"
+
+
+def test_profiler_samples_another_thread():
+    worker = threading.Thread(target=busy_caller, args=(0.2,))
+    worker.start()
+    with SamplingProfiler(thread_id=worker.ident, interval_ms=1) as profiler:
+        worker.join()
+
+    assert any("busy_leaf" in stack for stack in profiler.stacks)
+    assert not any("test_profiler_samples_another_thread" in stack for stack in profiler.stacks)
@@ -1,3 +1,52 @@
-from zeam.redis_client.client import get_value, get_json, ping, set_json, async_client_context
+from zeam.redis_client.client import (
+    get_value,
+    get_json,
+    get_many_json,
+    get_versioned_json,
+    get_many_versioned_json,
+    read_many_json,
+    ping,
+    set_json,
+    publish_json,
+    encode_payload,
+    decode_payload,
+    acquire_marker,
+    release_marker,
+    renew_marker,
+    advance_field,
+    advance_fields,
+    async_client_context,
+    sync_client_context,
+    warm_up,
+    close_pool,
+)
+from zeam.redis_client.bloom import BloomFilter
+from zeam.redis_client.config import RedisRole
+from zeam.redis_client.publisher import BatchPublisher, publish_many
 
-__all__ = ["get_value", "get_json", "ping", "set_json", "async_client_context"]
+__all__ = [
+    "get_value",
+    "get_json",
+    "get_many_json",
+    "get_versioned_json",
+    "get_many_versioned_json",
+    "read_many_json",
+    "ping",
+    "set_json",
+    "publish_json",
+    "publish_many",
+    "encode_payload",
+    "decode_payload",
+    "acquire_marker",
+    "release_marker",
+    "renew_marker",
+    "advance_field",
+    "advance_fields",
+    "async_client_context",
+    "sync_client_context",
+    "warm_up",
+    "close_pool",
+    "BatchPublisher",
+    "BloomFilter",
+    "RedisRole",
+]
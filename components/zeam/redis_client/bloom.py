@@ -0,0 +1,60 @@
+"""
+Fixed-size Bloom filters stored as Redis bitmaps.
+
+Items are added with one BITFIELD command per filter. A whole filter is read
+back with one BITFIELD_RO as 64-bit words, so any number of items can be
+tested locally after a single read.
+"""
+import hashlib
+from functools import lru_cache
+from typing import Any, Iterable, List, Tuple
+
+WORD_BITS = 64
+_WORD_MASK = (1 << WORD_BITS) - 1
+
+
+# Candidates come from a shared catalog, so the same items are tested on every request
+@lru_cache(maxsize=65536)
+def _positions(item: str, bits: int, hashes: int) -> Tuple[int, ...]:
+    # Double hashing (Kirsch-Mitzenmacher) from the two halves of one 64-bit digest
+    digest = int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+    first, second = digest >> 32, (digest & 0xFFFFFFFF) | 1
+    return tuple((first + i * second) % bits for i in range(hashes))
+
+
+class BloomFilter:
+    """A Bloom filter of `bits` bits (a multiple of 64) setting `hashes` bits per item."""
+
+    def __init__(self, bits: int, hashes: int):
+        if bits <= 0 or bits % WORD_BITS:
+            raise ValueError(f"Bloom filter size must be a positive multiple of {WORD_BITS} bits, got {bits}")
+        self.bits = bits
+        self.hashes = hashes
+
+    def positions(self, item: str) -> Tuple[int, ...]:
+        return _positions(item, self.bits, self.hashes)
+
+    def queue_add(self, pipe: Any, key: str, items: Iterable[str]) -> None:
+        """Queue setting the bits of `items` in the filter at `key`."""
+        offsets = sorted({offset for item in items for offset in self.positions(item)})
+        if offsets:
+            pipe.execute_command("BITFIELD", key, *[arg for offset in offsets for arg in ("SET", "u1", offset, 1)])
+
+    def queue_read(self, pipe: Any, key: str) -> None:
+        """Queue reading the filter at `key` as words; pass the reply to `decode`."""
+        words = self.bits // WORD_BITS
+        pipe.execute_command("BITFIELD_RO", key, *[arg for word in range(words) for arg in ("GET", "i64", f"#{word}")])
+
+    def decode(self, words: List[int]) -> bytes:
+        """Bitmap of a filter read by `queue_read`; a missing key decodes as all zeros."""
+        return b"".join((word & _WORD_MASK).to_bytes(WORD_BITS // 8, "big") for word in words)
+
+    def union(self, *bitmaps: bytes) -> bytes:
+        merged = 0
+        for bitmap in bitmaps:
+            merged |= int.from_bytes(bitmap, "big")
+        return merged.to_bytes(self.bits // 8, "big")
+
+    def contains(self, bitmap: bytes, item: str) -> bool:
+        # Bit 0 is the most significant bit of the first byte, as in SETBIT
+        return all(bitmap[offset >> 3] & (0x80 >> (offset & 7)) for offset in self.positions(item))
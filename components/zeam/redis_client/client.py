@@ -1,76 +1,331 @@
+import asyncio
+import base64
+import binascii
+import hashlib
 import json
 import logging
-from typing import Any
+import time
+import zlib
+from typing import Any, Dict
 import redis
 import redis.asyncio as aredis
-from zeam.redis_client.config import settings
+from redis.crc import key_slot
+from zeam.redis_client.config import RedisRole, settings
+from zeam.redis_client.scripts import ADVANCE_FIELD, ADVANCE_FIELDS, PUBLISH_VERSION, READ_VERSIONS, RELEASE_MARKER, RENEW_MARKER, UNPUBLISH
 
 logger = logging.getLogger(__name__)
 
-from typing import Any, Optional
-from contextlib import asynccontextmanager
+from typing import Any, List, Optional, Tuple
+from contextlib import asynccontextmanager, contextmanager
 
-async def _get_redis_client() -> aredis.Redis:
-    return aredis.Redis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        db=settings.REDIS_DB,
-        password=settings.REDIS_PASSWORD,
-        decode_responses=True
-    )
+# Connection pools shared by the async clients of this process, one per Redis
+# endpoint, bound to the event loop they were created on. Roles configured
+# with the same URL share a pool. In cluster mode the cache and its replicas
+# are served by one shared cluster client instead, which keeps a pool per node.
+_async_pools: Dict[str, aredis.BlockingConnectionPool] = {}
+_async_clusters: Dict[str, aredis.RedisCluster] = {}
+_async_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_clusters: Dict[str, redis.RedisCluster] = {}
+
+def _is_cluster_role(role: str) -> bool:
+    return settings.REDIS_CLUSTER_MODE and role in (RedisRole.CACHE, RedisRole.REPLICA)
+
+def _get_async_pool(role: str = RedisRole.CACHE) -> aredis.BlockingConnectionPool:
+    global _async_pool_loop
+    loop = asyncio.get_running_loop()
+    if _async_pool_loop is not loop:
+        _async_pools.clear()
+        _async_clusters.clear()
+        _async_pool_loop = loop
+    url = settings.url_for(role)
+    if url not in _async_pools:
+        _async_pools[url] = aredis.BlockingConnectionPool.from_url(
+            url,
+            password=settings.REDIS_PASSWORD,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+            decode_responses=True
+        )
+    return _async_pools[url]
+
+def _get_async_cluster() -> aredis.RedisCluster:
+    # Creating the pools resets them when the event loop changed
+    _get_async_pool(RedisRole.CACHE)
+    url = settings.url_for(RedisRole.CACHE)
+    if url not in _async_clusters:
+        _async_clusters[url] = aredis.RedisCluster.from_url(
+            url,
+            password=settings.REDIS_PASSWORD,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            read_from_replicas=settings.REDIS_CLUSTER_READ_FROM_REPLICAS,
+            decode_responses=True
+        )
+    return _async_clusters[url]
+
+async def _get_redis_client(role: str = RedisRole.CACHE) -> Any:
+    if _is_cluster_role(role):
+        return _get_async_cluster()
+    # Clients borrow connections from the shared pool; closing a client
+    # returns its connection without closing the pool.
+    return aredis.Redis(connection_pool=_get_async_pool(role))
+
+async def warm_up(connections: int = 1) -> None:
+    """Open `connections` pooled connections to the serving endpoints ahead of the first request."""
+    # The replica is the cache itself unless configured separately
+    roles = {settings.url_for(role): role for role in (RedisRole.REPLICA, RedisRole.CACHE)}.values()
+    if settings.REDIS_CLUSTER_MODE:
+        # Discovers the slot map; node connections open on first use
+        await _get_async_cluster().initialize()
+        return
+    clients = [await _get_redis_client(role) for role in roles for _ in range(connections)]
+    try:
+        await asyncio.gather(*(client.ping() for client in clients))
+    finally:
+        for client in clients:
+            await client.aclose()
+
+async def close_pool() -> None:
+    """Disconnect the shared pools, e.g. on application shutdown."""
+    global _async_pool_loop
+    pools = list(_async_pools.values())
+    clusters = list(_async_clusters.values())
+    _async_pools.clear()
+    _async_clusters.clear()
+    _async_pool_loop = None
+    for cluster in clusters:
+        await cluster.aclose()
+    for pool in pools:
+        await pool.aclose()
 
 @asynccontextmanager
-async def async_client_context():
-    client = await _get_redis_client()
+async def async_client_context(role: str = RedisRole.CACHE):
+    client = await _get_redis_client(role)
     try:
         yield client
     finally:
-        await client.aclose()
+        # The shared cluster client stays open until close_pool()
+        if not _is_cluster_role(role):
+            await client.aclose()
 
-def _get_sync_redis_client() -> redis.Redis:
-    return redis.Redis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        db=settings.REDIS_DB,
+def _get_sync_redis_client(role: str = RedisRole.CACHE) -> Any:
+    url = settings.url_for(role)
+    if _is_cluster_role(role):
+        if url not in _sync_clusters:
+            _sync_clusters[url] = redis.RedisCluster.from_url(
+                url,
+                password=settings.REDIS_PASSWORD,
+                decode_responses=True
+            )
+        return _sync_clusters[url]
+    return redis.Redis.from_url(
+        url,
         password=settings.REDIS_PASSWORD,
         decode_responses=True
     )
 
-async def get_value(key: str) -> Optional[str]:
-    client = await _get_redis_client()
+def _release_sync(client: Any) -> None:
+    # The shared cluster client is kept for the lifetime of the process
+    if not isinstance(client, redis.RedisCluster):
+        client.close()
+
+@contextmanager
+def sync_client_context(role: str = RedisRole.CACHE):
+    client = _get_sync_redis_client(role)
     try:
-        return await client.get(key)
+        yield client
     finally:
-        await client.aclose()
+        _release_sync(client)
+
+async def get_value(key: str) -> Optional[str]:
+    async with async_client_context() as client:
+        return await client.get(key)
+
+def content_version(payload: str) -> str:
+    """Content hash used as the version of a published payload."""
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+# Prefix of compressed payloads; JSON text never starts with it
+COMPRESSED_PREFIX = "z:"
+
+def encode_payload(payload: str, compress: bool = False) -> str:
+    """
+    Stored form of a JSON payload: zlib-compressed and base64-encoded (so it
+    stays text for decode_responses clients) when `compress` and the payload
+    is at least REDIS_COMPRESS_MIN_BYTES long.
+    """
+    if not compress or len(payload) < settings.REDIS_COMPRESS_MIN_BYTES:
+        return payload
+    compressed = zlib.compress(payload.encode("utf-8"), settings.REDIS_COMPRESS_LEVEL)
+    return COMPRESSED_PREFIX + base64.b64encode(compressed).decode("ascii")
+
+def decode_payload(value: str) -> str:
+    """JSON text of a stored payload, compressed or not."""
+    if value.startswith(COMPRESSED_PREFIX):
+        return zlib.decompress(base64.b64decode(value[len(COMPRESSED_PREFIX):])).decode("utf-8")
+    return value
+
+def _decode(key: str, val: Optional[str]) -> Any:
+    if not val:
+        return None
+    try:
+        return json.loads(decode_payload(val))
+    except (json.JSONDecodeError, zlib.error, binascii.Error):
+        logger.error(f"Failed to decode JSON from key: {key}")
+        return None
+
+def _versioned_results(keys: List[str], flat: List[Any]) -> List[Tuple[Optional[str], Any]]:
+    results = []
+    for i, key in enumerate(keys):
+        version, payload = flat[2 * i], flat[2 * i + 1]
+        if version == "" and payload:
+            # Plain key written in place: derive the version from its content
+            version = content_version(payload)
+        results.append((version or None, _decode(key, payload)))
+    return results
+
+def _group_by_slot(keys: List[str]) -> List[List[int]]:
+    """Indices of `keys` grouped by cluster slot, in first-seen order."""
+    groups: Dict[int, List[int]] = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(key_slot(key.encode("utf-8")), []).append(i)
+    return list(groups.values())
+
+async def get_many_versioned_json(keys: List[str]) -> List[Tuple[Optional[str], Any]]:
+    """
+    Fetch several published keys in a single round trip, from the replica when configured.
+    In cluster mode, one round trip per slot, run concurrently; keys sharing a
+    hash tag always take a single one.
+    Returns (version, data) per key, in the order requested; (None, None) when missing.
+    """
+    if not keys:
+        return []
+
+    async with async_client_context(RedisRole.REPLICA) as client:
+        if not _is_cluster_role(RedisRole.REPLICA):
+            flat = await READ_VERSIONS.run(client, keys)
+            return _versioned_results(keys, flat)
+
+        groups = _group_by_slot(keys)
+        flats = await asyncio.gather(*(READ_VERSIONS.run(client, [keys[i] for i in group]) for group in groups))
+
+    results: List[Tuple[Optional[str], Any]] = [(None, None)] * len(keys)
+    for group, flat in zip(groups, flats):
+        for i, result in zip(group, _versioned_results([keys[i] for i in group], flat)):
+            results[i] = result
+    return results
+
+async def get_versioned_json(key: str, known_version: Optional[str] = None) -> Tuple[Optional[str], Any]:
+    """
+    Fetch a published key with its version, from the replica when configured.
+    When `known_version` is still current, the payload is not transferred and data is None.
+    """
+    async with async_client_context(RedisRole.REPLICA) as client:
+        flat = await READ_VERSIONS.run(client, [key], [known_version or ""])
+    return _versioned_results([key], flat)[0]
 
 async def get_json(key: str) -> Any:
-    val = await get_value(key)
-    if val:
-        try:
-            return json.loads(val)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to decode JSON from key: {key}")
-            return None
-    return None
+    _, data = await get_versioned_json(key)
+    return data
+
+async def get_many_json(keys: List[str]) -> List[Any]:
+    """
+    Fetch and decode several JSON keys in a single round trip.
+    Missing or undecodable keys come back as None, in the order requested.
+    """
+    return [data for _, data in await get_many_versioned_json(keys)]
+
+def read_many_json(keys: List[str], role: str = RedisRole.CACHE) -> List[Any]:
+    """
+    Blocking counterpart of get_many_json for workers, reading `role` (the
+    primary by default): one round trip, or one per slot in cluster mode.
+    """
+    results: List[Any] = [None] * len(keys)
+    if not keys:
+        return results
+
+    with sync_client_context(role) as client:
+        groups = _group_by_slot(keys) if _is_cluster_role(role) else [list(range(len(keys)))]
+        for group in groups:
+            group_keys = [keys[i] for i in group]
+            flat = READ_VERSIONS.run_sync(client, group_keys)
+            for i, (_, data) in zip(group, _versioned_results(group_keys, flat)):
+                results[i] = data
+    return results
 
 async def ping() -> bool:
-    client = await _get_redis_client()
-    try:
+    async with async_client_context() as client:
         return await client.ping()
-    finally:
-        await client.aclose()
 
 def set_json(key: str, data: Any) -> None:
-    if not data:
-        logger.info("No data provided, skipping Redis write.")
-        return
-
-    client = _get_sync_redis_client()
-    try:
+    """Store `data` under `key`; without data the key is deleted, so it never serves an old value."""
+    with sync_client_context() as client:
+        if not data:
+            client.delete(key)
+            logger.info(f"No data provided, deleted {key} from Redis")
+            return
         client.set(key, json.dumps(data))
         logger.info(f"Stored data in Redis: {key}")
-    finally:
-        client.close()
+
+def publish_json(key: str, data: Any) -> Optional[str]:
+    """
+    Publish data under a content-hash version and atomically flip `key` to it.
+    The replaced version expires after REDIS_VERSION_GRACE_SECONDS.
+    Without data the key is unpublished instead, so that readers fall back
+    rather than keep serving the last list. Returns the published version,
+    or None when there was nothing to publish.
+    """
+    if not data:
+        with sync_client_context() as client:
+            if UNPUBLISH.run_sync(client, [key], [settings.REDIS_VERSION_GRACE_SECONDS]):
+                logger.info(f"No data provided, unpublished {key} from Redis")
+        return None
+
+    payload = json.dumps(data)
+    version = content_version(payload)
+
+    with sync_client_context() as client:
+        previous = PUBLISH_VERSION.run_sync(
+            client,
+            [key],
+            [version, payload, int(time.time()), settings.REDIS_VERSION_GRACE_SECONDS],
+        )
+        if previous == version:
+            logger.info(f"Republished unchanged data in Redis: {key} (version {version})")
+        else:
+            logger.info(f"Published data in Redis: {key} (version {version})")
+    return version
+
+def acquire_marker(key: str, holder: str, ttl_seconds: int, role: str = RedisRole.CACHE) -> Optional[str]:
+    """
+    Set `key` to `holder` unless it is already held.
+    Returns None when acquired, otherwise the current holder.
+    """
+    with sync_client_context(role) as client:
+        if client.set(key, holder, nx=True, ex=ttl_seconds):
+            return None
+        return client.get(key) or ""
+
+def release_marker(key: str, holder: str, role: str = RedisRole.CACHE) -> bool:
+    """Delete `key` if it is still held by `holder`."""
+    with sync_client_context(role) as client:
+        return bool(RELEASE_MARKER.run_sync(client, [key], [holder]))
+
+def renew_marker(key: str, holder: str, ttl_seconds: int, role: str = RedisRole.CACHE) -> bool:
+    """Reset the TTL of `key` if it is still held by `holder`."""
+    with sync_client_context(role) as client:
+        return bool(RENEW_MARKER.run_sync(client, [key], [holder, ttl_seconds]))
+
+def advance_field(key: str, field: str, value: str, role: str = RedisRole.CACHE) -> bool:
+    """Set `field` of the hash at `key` to `value` unless it already holds a later value."""
+    with sync_client_context(role) as client:
+        return bool(ADVANCE_FIELD.run_sync(client, [key], [field, value]))
+
+def advance_fields(key: str, fields: List[str], value: str, role: str = RedisRole.CACHE) -> int:
+    """`advance_field` for many fields of one hash in one call; returns how many moved."""
+    if not fields:
+        return 0
+    with sync_client_context(role) as client:
+        return int(ADVANCE_FIELDS.run_sync(client, [key], [value, *fields]))
 
 # Alias for backward compatibility if needed, or just remove if I update consumers
 store_json_data = set_json
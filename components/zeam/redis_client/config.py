@@ -1,10 +1,65 @@
+from urllib.parse import quote
+
 from zeam.config.core import ZeamBaseSettings
 
+class RedisRole:
+    # Recommendation payloads read by the API and published by the workers
+    CACHE = "cache"
+    # Read replica of the cache, used for serving reads when configured
+    REPLICA = "replica"
+    # Celery broker queues
+    BROKER = "broker"
+    # Celery results, run ledger and task bookkeeping
+    RESULTS = "results"
+
 class RedisSettings(ZeamBaseSettings):
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: str | None = None
+    # Per-role endpoints (redis://[:password@]host:port/db); each defaults to
+    # REDIS_HOST:REDIS_PORT/REDIS_DB
+    REDIS_CACHE_URL: str | None = None
+    REDIS_BROKER_URL: str | None = None
+    REDIS_RESULTS_URL: str | None = None
+    # Optional read replica of the cache for serving reads
+    REDIS_REPLICA_URL: str | None = None
+    # The cache endpoint is a Redis Cluster (any node's URL); replicas are then
+    # discovered from the cluster instead of REDIS_REPLICA_URL
+    REDIS_CLUSTER_MODE: bool = False
+    REDIS_CLUSTER_READ_FROM_REPLICAS: bool = False
+    # Upper bound of the per-process async connection pool
+    REDIS_MAX_CONNECTIONS: int = 64
+    # How long a request waits for a free pooled connection
+    REDIS_POOL_TIMEOUT_SECONDS: float = 5.0
+    # Keys sent per pipeline round trip by BatchPublisher and publish_many;
+    # a chunk is also sent once it holds REDIS_PUBLISH_MAX_BYTES
+    REDIS_PUBLISH_BATCH_SIZE: int = 100
+    REDIS_PUBLISH_MAX_BYTES: int = 1048576
+    # Compression of published payloads (zlib, level 1 to stay ahead of the
+    # network); payloads under REDIS_COMPRESS_MIN_BYTES are stored as they are
+    REDIS_PUBLISH_COMPRESS: bool = False
+    REDIS_COMPRESS_MIN_BYTES: int = 1024
+    REDIS_COMPRESS_LEVEL: int = 1
+    # How long a replaced published version stays readable
+    REDIS_VERSION_GRACE_SECONDS: int = 3600
+
+    @property
+    def default_url(self) -> str:
+        auth = f":{quote(self.REDIS_PASSWORD, safe='')}@" if self.REDIS_PASSWORD else ""
+        return f"redis://{auth}{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+
+    def url_for(self, role: str) -> str:
+        """Endpoint of a RedisRole; the replica falls back to the cache."""
+        urls = {
+            RedisRole.CACHE: self.REDIS_CACHE_URL,
+            RedisRole.REPLICA: self.REDIS_REPLICA_URL or self.REDIS_CACHE_URL,
+            RedisRole.BROKER: self.REDIS_BROKER_URL,
+            RedisRole.RESULTS: self.REDIS_RESULTS_URL,
+        }
+        if role not in urls:
+            raise ValueError(f"Unknown Redis role '{role}'")
+        return urls[role] or self.default_url
 
 settings = RedisSettings()
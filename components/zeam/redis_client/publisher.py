@@ -0,0 +1,211 @@
+"""
+Batched versioned publishing of JSON results (see `publish_json`): shared
+between threads (`BatchPublisher`), or from one iterable of items in bulk
+(`publish_many`). Both send pipelined chunks bounded by keys and bytes.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from redis.crc import key_slot
+from redis.exceptions import NoScriptError
+
+from zeam.redis_client.client import (
+    _get_sync_redis_client,
+    _is_cluster_role,
+    _release_sync,
+    content_version,
+    encode_payload,
+    sync_client_context,
+)
+from zeam.redis_client.config import RedisRole, settings
+from zeam.redis_client.scripts import PUBLISH_VERSION, UNPUBLISH, LuaScript
+
+logger = logging.getLogger(__name__)
+
+
+class BatchPublisher:
+    """
+    Queues versioned publishes (see `publish_json`) and unpublishes on one
+    shared pipeline and sends them in a single round trip every `flush_every`
+    keys or `flush_bytes` payload bytes (one per node in cluster mode).
+    Payloads are compressed when `compress` (default REDIS_PUBLISH_COMPRESS);
+    versions are those of the uncompressed JSON.
+    Safe to share between threads; use as a context manager to flush and
+    close at the end.
+    """
+
+    def __init__(self, flush_every: Optional[int] = None, compress: Optional[bool] = None, flush_bytes: Optional[int] = None):
+        self.flush_every = flush_every or settings.REDIS_PUBLISH_BATCH_SIZE
+        self.flush_bytes = flush_bytes or settings.REDIS_PUBLISH_MAX_BYTES
+        self.compress = settings.REDIS_PUBLISH_COMPRESS if compress is None else compress
+        self.keys_published = 0
+        self.keys_unpublished = 0
+        self.bytes_published = 0
+        self._client = _get_sync_redis_client()
+        self._pipe = self._client.pipeline(transaction=False)
+        self._pending = []
+        self._pending_bytes = 0
+        self._lock = threading.Lock()
+
+    def publish(self, key: str, data: Any) -> Optional[str]:
+        """Queue `data` for publishing under `key`; returns its version. Without data, `key` is unpublished."""
+        if not data:
+            self.unpublish(key)
+            return None
+
+        payload = json.dumps(data)
+        version = content_version(payload)
+        payload = encode_payload(payload, self.compress)
+        args = [version, payload, int(time.time()), settings.REDIS_VERSION_GRACE_SECONDS]
+        with self._lock:
+            self._queue(PUBLISH_VERSION, key, args)
+            self.bytes_published += len(payload)
+            self._pending_bytes += len(payload)
+            if len(self._pending) >= self.flush_every or self._pending_bytes >= self.flush_bytes:
+                self._flush_locked()
+        return version
+
+    def unpublish(self, key: str) -> None:
+        """
+        Queue the removal of a published key, so that readers fall back; its
+        current version expires after REDIS_VERSION_GRACE_SECONDS.
+        """
+        with self._lock:
+            self._queue(UNPUBLISH, key, [settings.REDIS_VERSION_GRACE_SECONDS])
+            if len(self._pending) >= self.flush_every:
+                self._flush_locked()
+
+    def _queue(self, script: LuaScript, key: str, args: List[Any]) -> None:
+        self._pending.append((script, key, args))
+        self._pipe.evalsha(script.sha, 1, key, *args)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        try:
+            self._pipe.execute()
+        except NoScriptError:
+            # Script cache was empty (e.g. Redis restarted): load the scripts and resend the batch
+            self._pipe.reset()
+            for script in {script for script, _, _ in self._pending}:
+                self._client.script_load(script.source)
+            for script, key, args in self._pending:
+                self._pipe.evalsha(script.sha, 1, key, *args)
+            self._pipe.execute()
+        unpublished = sum(1 for script, _, _ in self._pending if script is UNPUBLISH)
+        logger.info(f"Published {len(self._pending) - unpublished} and unpublished {unpublished} keys in Redis")
+        self.keys_published += len(self._pending) - unpublished
+        self.keys_unpublished += unpublished
+        self._pending = []
+        self._pending_bytes = 0
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            _release_sync(self._client)
+
+    def __enter__(self) -> "BatchPublisher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def publish_many(
+    items: Iterable[Tuple[str, Any, Optional[int]]],
+    chunk_keys: Optional[int] = None,
+    chunk_bytes: Optional[int] = None,
+    compress: Optional[bool] = None,
+    transaction: bool = False,
+    role: str = RedisRole.CACHE,
+) -> Dict[str, Any]:
+    """
+    Publish (key, data, ttl seconds or None) items as versioned keys (see
+    `publish_json`) over one connection, one pipelined round trip per chunk.
+    A chunk is sent once it holds `chunk_keys` keys (default
+    REDIS_PUBLISH_BATCH_SIZE) or `chunk_bytes` payload bytes (default
+    REDIS_PUBLISH_MAX_BYTES), so items may come from a generator of any
+    length. A ttl expires both the key and its current version. Keys of
+    items without data are unpublished (see `BatchPublisher.unpublish`).
+
+    Args:
+        items: (key, data, ttl) to publish
+        chunk_keys: Most keys per round trip
+        chunk_bytes: Payload bytes after which a chunk is sent
+        compress: Compress large payloads (default REDIS_PUBLISH_COMPRESS); readers decode both forms
+        transaction: Send each chunk as MULTI/EXEC, so it applies all at once
+            (in cluster mode chunks are then split by slot)
+        role: Redis endpoint to write to
+
+    Returns keys and bytes written (stored and uncompressed), keys
+    unpublished, round trips, duration and keys/bytes per second.
+    """
+    chunk_keys = chunk_keys or settings.REDIS_PUBLISH_BATCH_SIZE
+    chunk_bytes = chunk_bytes or settings.REDIS_PUBLISH_MAX_BYTES
+    compress = settings.REDIS_PUBLISH_COMPRESS if compress is None else compress
+    by_slot = transaction and _is_cluster_role(role)
+    stats = {"keys": 0, "keys_unpublished": 0, "bytes": 0, "raw_bytes": 0, "chunks": 0}
+    # Pending chunk per cluster slot, or a single one; removals have no version
+    chunks: Dict[Optional[int], List[Tuple[str, Optional[str], Optional[str], Optional[int]]]] = {}
+    chunk_sizes: Dict[Optional[int], int] = {}
+    started = time.perf_counter()
+
+    with sync_client_context(role) as client:
+        # Pipelined EVALSHA can't fall back to EVAL, so make sure the scripts are cached
+        client.script_load(PUBLISH_VERSION.source)
+        client.script_load(UNPUBLISH.source)
+
+        def send(slot: Optional[int]) -> None:
+            pipe = client.pipeline(transaction=transaction)
+            published_at = int(time.time())
+            for key, version, value, ttl in chunks.pop(slot):
+                if version is None:
+                    pipe.evalsha(UNPUBLISH.sha, 1, key, settings.REDIS_VERSION_GRACE_SECONDS)
+                    continue
+                pipe.evalsha(PUBLISH_VERSION.sha, 1, key, version, value, published_at, settings.REDIS_VERSION_GRACE_SECONDS)
+                if ttl:
+                    pipe.expire(key, ttl)
+                    pipe.expire(f"{key}:v:{version}", ttl)
+            pipe.execute()
+            del chunk_sizes[slot]
+            stats["chunks"] += 1
+
+        for key, data, ttl in items:
+            slot = key_slot(key.encode("utf-8")) if by_slot else None
+            if not data:
+                chunks.setdefault(slot, []).append((key, None, None, None))
+                chunk_sizes.setdefault(slot, 0)
+                stats["keys_unpublished"] += 1
+                if len(chunks[slot]) >= chunk_keys:
+                    send(slot)
+                continue
+            payload = json.dumps(data)
+            value = encode_payload(payload, compress)
+            chunks.setdefault(slot, []).append((key, content_version(payload), value, ttl))
+            chunk_sizes[slot] = chunk_sizes.get(slot, 0) + len(value)
+            stats["keys"] += 1
+            stats["bytes"] += len(value)
+            stats["raw_bytes"] += len(payload)
+            if len(chunks[slot]) >= chunk_keys or chunk_sizes[slot] >= chunk_bytes:
+                send(slot)
+        for slot in list(chunks):
+            send(slot)
+
+    seconds = time.perf_counter() - started
+    stats["seconds"] = round(seconds, 3)
+    stats["keys_per_second"] = round(stats["keys"] / seconds) if seconds else None
+    stats["bytes_per_second"] = round(stats["bytes"] / seconds) if seconds else None
+    logger.info(
+        f"Published {stats['keys']} keys ({stats['bytes']} bytes) and unpublished {stats['keys_unpublished']} "
+        f"in {stats['chunks']} round trips, "
+        f"{stats['keys_per_second']} keys/s"
+    )
+    return stats
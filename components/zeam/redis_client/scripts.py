@@ -0,0 +1,145 @@
+"""
+Lua scripts used by the Redis client.
+
+Published keys are small hashes pointing at an immutable, content-addressed
+version key (`{key}:v:{version}`). Versions keep the hash tag of their key,
+so a script touching both always stays on one cluster slot.
+"""
+import hashlib
+from typing import Any, Sequence
+
+from redis.exceptions import NoScriptError
+
+
+class LuaScript:
+    """A Lua script run through EVALSHA, falling back to EVAL when not cached."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    async def run(self, client: Any, keys: Sequence[str], args: Sequence[Any] = ()) -> Any:
+        try:
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            return await client.eval(self.source, len(keys), *keys, *args)
+
+    def run_sync(self, client: Any, keys: Sequence[str], args: Sequence[Any] = ()) -> Any:
+        try:
+            return client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            return client.eval(self.source, len(keys), *keys, *args)
+
+
+# KEYS: pointer key
+# ARGV: version, payload, published_at, grace seconds for the replaced version
+# Stores the payload under its version key, flips the pointer and lets the
+# previous version expire. Returns the previous version, if any.
+PUBLISH_VERSION = LuaScript("""
+local pointer = KEYS[1]
+local previous = false
+local kind = redis.call('TYPE', pointer).ok
+if kind == 'hash' then
+    previous = redis.call('HGET', pointer, 'version')
+elseif kind ~= 'none' then
+    redis.call('DEL', pointer)
+end
+redis.call('SET', pointer .. ':v:' .. ARGV[1], ARGV[2])
+redis.call('HSET', pointer, 'version', ARGV[1], 'published_at', ARGV[3])
+if previous and previous ~= ARGV[1] then
+    redis.call('EXPIRE', pointer .. ':v:' .. previous, ARGV[4])
+end
+return previous
+""")
+
+# KEYS: pointer key
+# ARGV: grace seconds for the current version
+# Removes a published key, letting its current version expire so that
+# readers that just read the pointer can still fetch it. Returns 1 when removed.
+UNPUBLISH = LuaScript("""
+local pointer = KEYS[1]
+local kind = redis.call('TYPE', pointer).ok
+if kind == 'none' then
+    return 0
+end
+if kind == 'hash' then
+    local version = redis.call('HGET', pointer, 'version')
+    if version then
+        redis.call('EXPIRE', pointer .. ':v:' .. version, ARGV[1])
+    end
+end
+redis.call('DEL', pointer)
+return 1
+""")
+
+# KEYS: one or more keys
+# ARGV[1]: optional version the caller already holds (single key reads only)
+# Returns a flat list of version, payload per key. Plain string keys come back
+# with an empty version; missing keys with false for both. The payload is false
+# when it matches the version held by the caller.
+READ_VERSIONS = LuaScript("""
+local result = {}
+for i, key in ipairs(KEYS) do
+    local kind = redis.call('TYPE', key).ok
+    local version, payload = false, false
+    if kind == 'string' then
+        version, payload = '', redis.call('GET', key)
+    elseif kind == 'hash' then
+        version = redis.call('HGET', key, 'version')
+        if version and version ~= ARGV[1] then
+            payload = redis.call('GET', key .. ':v:' .. version)
+        end
+    end
+    result[2 * i - 1] = version
+    result[2 * i] = payload
+end
+return result
+""")
+
+# KEYS: marker key
+# ARGV: expected holder
+# Deletes the marker only while it is still held by the caller.
+RELEASE_MARKER = LuaScript("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""")
+
+# KEYS: marker key
+# ARGV: expected holder, ttl in seconds
+# Extends the marker's TTL only while it is still held by the caller.
+RENEW_MARKER = LuaScript("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+""")
+
+# KEYS: hash
+# ARGV: field, value
+# Sets the field unless it already holds a value sorting at or after `value`,
+# so that a late or replayed write never moves it backwards. Returns 1 when set.
+ADVANCE_FIELD = LuaScript("""
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if current and current >= ARGV[2] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+return 1
+""")
+
+# KEYS: hash
+# ARGV: value, fields
+# ADVANCE_FIELD for many fields of one hash at once. Returns the number set.
+ADVANCE_FIELDS = LuaScript("""
+local advanced = 0
+for i = 2, #ARGV do
+    local current = redis.call('HGET', KEYS[1], ARGV[i])
+    if not current or current < ARGV[1] then
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[1])
+        advanced = advanced + 1
+    end
+end
+return advanced
+""")
@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from zeam.redis_client.bloom import BloomFilter
+
+
+def redis_words(bits: int, offsets) -> list:
+    """What BITFIELD_RO GET i64 #n returns for a bitmap with `offsets` set (bit 0 is the first byte's MSB)."""
+    bitmap = bytearray(bits // 8)
+    for offset in offsets:
+        bitmap[offset // 8] |= 0x80 >> (offset % 8)
+    return [int.from_bytes(bitmap[i:i + 8], "big", signed=True) for i in range(0, len(bitmap), 8)]
+
+
+def test_size_must_be_whole_words():
+    with pytest.raises(ValueError):
+        BloomFilter(100, 3)
+
+
+def test_positions_are_stable_and_in_range():
+    bloom = BloomFilter(1024, 5)
+
+    positions = bloom.positions("show:42")
+
+    assert positions == bloom.positions("show:42")
+    assert len(positions) == 5
+    assert all(0 <= position < 1024 for position in positions)
+
+
+def test_items_are_added_with_one_bitfield():
+    bloom = BloomFilter(1024, 3)
+    pipe = MagicMock()
+
+    bloom.queue_add(pipe, "seen", ["show:1", "show:1", "vod:2"])
+
+    args = pipe.execute_command.call_args.args
+    assert pipe.execute_command.call_count == 1
+    assert args[:2] == ("BITFIELD", "seen")
+    offsets = args[4::4]
+    assert set(offsets) == set(bloom.positions("show:1") + bloom.positions("vod:2"))
+    assert set(args[2::4]) == {"SET"}
+
+
+def test_nothing_to_add():
+    pipe = MagicMock()
+    BloomFilter(1024, 3).queue_add(pipe, "seen", [])
+    pipe.execute_command.assert_not_called()
+
+
+def test_whole_filter_is_read_as_words():
+    bloom = BloomFilter(1024, 3)
+    pipe = MagicMock()
+
+    bloom.queue_read(pipe, "seen")
+
+    args = pipe.execute_command.call_args.args
+    assert args[:2] == ("BITFIELD_RO", "seen")
+    assert args[2:8] == ("GET", "i64", "#0", "GET", "i64", "#1")
+    assert len(args) == 2 + 3 * 16
+
+
+def test_membership_from_decoded_words():
+    bloom = BloomFilter(1024, 3)
+    added = ["show:1", "vod:2", "clip:3"]
+    words = redis_words(1024, [offset for item in added for offset in bloom.positions(item)])
+
+    bitmap = bloom.decode(words)
+
+    assert all(bloom.contains(bitmap, item) for item in added)
+    assert not bloom.contains(bitmap, "show:4")
+    assert bloom.decode([0] * 16) == bytes(128)
+
+
+def test_union():
+    bloom = BloomFilter(128, 2)
+    first = redis_words(128, bloom.positions("show:1"))
+    second = redis_words(128, bloom.positions("vod:2"))
+
+    bitmap = bloom.union(bloom.decode(first), bloom.decode(second))
+
+    assert bloom.contains(bitmap, "show:1") and bloom.contains(bitmap, "vod:2")
@@ -0,0 +1,49 @@
+import asyncio
+from unittest.mock import patch
+
+from redis.crc import key_slot
+
+from zeam.redis_client import client
+from zeam.redis_client.client import _group_by_slot, get_many_versioned_json
+
+
+class FakeCluster:
+    """Answers READ_VERSIONS per call and refuses keys spread over several slots."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def evalsha(self, sha, numkeys, *keys_and_args):
+        keys = list(keys_and_args[:numkeys])
+        assert len({key_slot(key.encode()) for key in keys}) == 1, "CROSSSLOT"
+        self.calls.append(keys)
+        flat = []
+        for key in keys:
+            flat += ["v1", f'"{key}"'] if not key.endswith("missing") else [None, None]
+        return flat
+
+
+def test_window_keys_share_one_slot():
+    keys = [
+        "zeam-recommender:popularity:show:{2025-01-01:2025-01-07}:501",
+        "zeam-recommender:popularity:vod:{2025-01-01:2025-01-07}:global",
+        "zeam-recommender:popularity:show:{2025-01-08:2025-01-14}:501",
+    ]
+
+    assert _group_by_slot(keys) == [[0, 1], [2]]
+
+
+def test_cluster_reads_run_one_script_per_slot_in_request_order():
+    keys = [
+        "zeam-recommender:popularity:show:{2025-01-01:2025-01-07}:501",
+        "zeam-recommender:popularity:show:{2025-01-08:2025-01-14}:501",
+        "zeam-recommender:popularity:vod:{2025-01-01:2025-01-07}:missing",
+    ]
+    cluster = FakeCluster()
+
+    with patch.object(client.settings, "REDIS_CLUSTER_MODE", True), \
+            patch("zeam.redis_client.client._get_async_cluster", return_value=cluster):
+        results = asyncio.run(get_many_versioned_json(keys))
+
+    assert len(cluster.calls) == 2
+    assert results == [("v1", keys[0]), ("v1", keys[1]), (None, None)]
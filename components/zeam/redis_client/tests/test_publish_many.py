@@ -0,0 +1,151 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from redis.crc import key_slot
+
+from zeam.redis_client.client import COMPRESSED_PREFIX, _decode, content_version, decode_payload, encode_payload
+from zeam.redis_client.publisher import BatchPublisher, publish_many
+from zeam.redis_client.scripts import UNPUBLISH
+
+ROWS = [{"show_id": i, "title": f"Show {i}", "views": 1000 - i} for i in range(50)]
+
+
+class FakeClient:
+    """Records the versioned publishes (key, payload, ttl) and unpublished keys of every pipeline executed."""
+
+    def __init__(self):
+        self.chunks = []
+        self.unpublished = []
+        self.script_load = MagicMock()
+
+    def pipeline(self, transaction=True):
+        client = self
+        pipe = MagicMock()
+        pipe.transaction = transaction
+        sets = []
+        expires = {}
+
+        def evalsha(sha, numkeys, key, *args):
+            if sha == UNPUBLISH.sha:
+                client.unpublished.append(key)
+                return
+            version, value, published_at, grace = args
+            assert version == content_version(decode_payload(value))
+            sets.append((key, value))
+
+        pipe.evalsha.side_effect = evalsha
+        pipe.expire.side_effect = lambda key, ttl: expires.setdefault(key, ttl)
+        pipe.execute.side_effect = lambda: client.chunks.append(
+            (transaction, [(key, value, expires.get(key)) for key, value in sets])
+        )
+        return pipe
+
+
+def publish(items, **kwargs):
+    fake = FakeClient()
+    with patch("zeam.redis_client.publisher.sync_client_context") as mock_context:
+        mock_context.return_value.__enter__.return_value = fake
+        stats = publish_many(items, **kwargs)
+    assert fake.script_load.call_count == 2
+    return fake.chunks, stats
+
+
+def test_chunks_are_bounded_by_keys():
+    chunks, stats = publish(((f"key:{i}", {"i": i}, 60) for i in range(25)), chunk_keys=10)
+
+    assert [len(sets) for _, sets in chunks] == [10, 10, 5]
+    assert chunks[0][1][0] == ("key:0", '{"i": 0}', 60)
+    assert stats["keys"] == 25
+    assert stats["chunks"] == 3
+    assert stats["keys_per_second"] > 0
+
+
+def test_chunks_are_bounded_by_bytes():
+    chunks, stats = publish([(f"key:{i}", "x" * 98, None) for i in range(10)], chunk_keys=100, chunk_bytes=300)
+
+    # 100-byte payloads: a chunk is sent once it reaches 300 bytes
+    assert [len(sets) for _, sets in chunks] == [3, 3, 3, 1]
+    assert stats["bytes"] == 1000
+    assert all(ex is None for _, sets in chunks for _, _, ex in sets)
+
+
+def test_empty_items_are_unpublished():
+    fake = FakeClient()
+    with patch("zeam.redis_client.publisher.sync_client_context") as mock_context:
+        mock_context.return_value.__enter__.return_value = fake
+        stats = publish_many([("key:1", [], 60), ("key:2", ROWS, 60)])
+
+    assert [key for _, sets in fake.chunks for key, _, _ in sets] == ["key:2"]
+    # An emptied list stops serving its last version instead of being skipped
+    assert fake.unpublished == ["key:1"]
+    assert (stats["keys"], stats["keys_unpublished"]) == (1, 1)
+
+
+def test_compressed_payloads_decode_like_plain_ones():
+    chunks, stats = publish([("key:rows", ROWS, 60)], compress=True)
+
+    value = chunks[0][1][0][1]
+    assert value.startswith(COMPRESSED_PREFIX)
+    assert stats["bytes"] < stats["raw_bytes"]
+    assert _decode("key:rows", value) == ROWS
+
+
+def test_small_payloads_stay_uncompressed():
+    assert encode_payload('{"i": 1}', compress=True) == '{"i": 1}'
+    assert decode_payload('{"i": 1}') == '{"i": 1}'
+
+
+def test_transactional_chunks():
+    chunks, _ = publish([("key:1", {"i": 1}, 60)], transaction=True)
+
+    assert chunks[0][0] is True
+
+
+@patch("zeam.redis_client.publisher._is_cluster_role", return_value=True)
+def test_transactional_chunks_split_by_slot_in_cluster_mode(mock_cluster):
+    keys = [f"zeam-recommender:popularity:show:{{2025-01-0{week}:2025-01-07}}:{dma}" for week in (1, 2) for dma in (501, 502)]
+
+    chunks, stats = publish([(key, {"k": key}, 60) for key in keys], transaction=True)
+
+    assert stats["chunks"] == 2
+    for _, sets in chunks:
+        assert len({key_slot(key.encode()) for key, _, _ in sets}) == 1
+
+
+@patch("zeam.redis_client.publisher._get_sync_redis_client")
+def test_batch_publisher_versions_uncompressed_payload(mock_get_client):
+    pipe = mock_get_client.return_value.pipeline.return_value
+
+    with BatchPublisher(compress=True) as publisher:
+        version = publisher.publish("key:rows", ROWS)
+
+    assert version == content_version(json.dumps(ROWS))
+    args = pipe.evalsha.call_args[0]
+    assert args[4].startswith(COMPRESSED_PREFIX)
+
+
+@patch("zeam.redis_client.publisher._get_sync_redis_client")
+def test_batch_publisher_flushes_by_bytes(mock_get_client):
+    pipe = mock_get_client.return_value.pipeline.return_value
+
+    with BatchPublisher(flush_every=100, flush_bytes=300) as publisher:
+        for i in range(10):
+            publisher.publish(f"key:{i}", "x" * 98)
+        assert pipe.execute.call_count == 3
+
+    assert pipe.execute.call_count == 4
+    assert publisher.keys_published == 10
+
+
+@patch("zeam.redis_client.publisher._get_sync_redis_client")
+def test_batch_publisher_unpublishes_on_the_same_pipeline(mock_get_client):
+    pipe = mock_get_client.return_value.pipeline.return_value
+
+    with BatchPublisher() as publisher:
+        publisher.publish("key:rows", ROWS)
+        publisher.unpublish("key:empty")
+        assert publisher.publish("key:emptied", []) is None
+
+    assert [call[0][:3] for call in pipe.evalsha.call_args_list[1:]] == [(UNPUBLISH.sha, 1, "key:empty"), (UNPUBLISH.sha, 1, "key:emptied")]
+    assert pipe.execute.call_count == 1
+    assert (publisher.keys_published, publisher.keys_unpublished) == (1, 2)
@@ -0,0 +1,32 @@
+import pytest
+
+from zeam.redis_client.config import RedisRole, RedisSettings
+
+
+def test_roles_default_to_single_endpoint():
+    settings = RedisSettings(REDIS_HOST="redis", REDIS_PORT=6380, REDIS_DB=2, REDIS_PASSWORD="p@ss")
+
+    for role in (RedisRole.CACHE, RedisRole.REPLICA, RedisRole.BROKER, RedisRole.RESULTS):
+        assert settings.url_for(role) == "redis://:p%40ss@redis:6380/2"
+
+
+def test_roles_use_their_own_endpoints():
+    settings = RedisSettings(
+        REDIS_CACHE_URL="redis://cache:6379/0",
+        REDIS_BROKER_URL="redis://broker:6379/0",
+        REDIS_RESULTS_URL="redis://results:6379/1",
+    )
+
+    assert settings.url_for(RedisRole.CACHE) == "redis://cache:6379/0"
+    assert settings.url_for(RedisRole.BROKER) == "redis://broker:6379/0"
+    assert settings.url_for(RedisRole.RESULTS) == "redis://results:6379/1"
+    # Without a replica, serving reads go to the cache
+    assert settings.url_for(RedisRole.REPLICA) == "redis://cache:6379/0"
+
+    settings = RedisSettings(REDIS_CACHE_URL="redis://cache:6379/0", REDIS_REPLICA_URL="redis://replica:6379/0")
+    assert settings.url_for(RedisRole.REPLICA) == "redis://replica:6379/0"
+
+
+def test_unknown_role():
+    with pytest.raises(ValueError):
+        RedisSettings().url_for("sessions")
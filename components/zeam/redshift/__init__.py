@@ -1,3 +1,3 @@
-from zeam.redshift.database import execute_query, execute_command, health_check
+from zeam.redshift.database import cancel_running_queries, close_idle_connections, execute_query, execute_command, get_queue_wait_seconds, health_check
 
-__all__ = ["execute_query", "execute_command", "health_check"]
+__all__ = ["execute_query", "execute_command", "health_check", "cancel_running_queries", "close_idle_connections", "get_queue_wait_seconds"]
@@ -8,5 +8,11 @@ class RedshiftSettings(ZeamBaseSettings):
     REDSHIFT_USER: str | None = None
     REDSHIFT_PASSWORD: str | None = None
     REDSHIFT_SCHEMA: str = "public"  # Default schema
+    # Warehouse sessions a single process may hold open at once
+    REDSHIFT_MAX_CONCURRENT_SESSIONS: int = 8
+    # Server-side limit of a single statement, 0 to disable
+    REDSHIFT_STATEMENT_TIMEOUT_MS: int = 1800000
+    # Idle sessions are reused by later queries for up to this long, then closed
+    REDSHIFT_POOL_IDLE_SECONDS: int = 300
 
 settings = RedshiftSettings()
@@ -1,10 +1,35 @@
 """Redshift database connection and query utilities."""
 
-from typing import Any, Dict, List, Optional
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-import redshift_connector
 from zeam.redshift.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Caps the warehouse sessions opened concurrently by this process, whatever
+# number of threads run queries.
+_session_slots = threading.BoundedSemaphore(settings.REDSHIFT_MAX_CONCURRENT_SESSIONS)
+
+# Connections currently executing a statement, so that an interrupted task can
+# cancel statements running on other threads.
+_running: Set["RedshiftConnection"] = set()
+_running_lock = threading.Lock()
+
+# Sessions left open by finished queries, with the time they were returned, so
+# that later queries skip the connection handshake and session setup.
+_idle: List[Tuple["RedshiftConnection", float]] = []
+_idle_lock = threading.Lock()
+
+
+def _is_driver_error(error: BaseException) -> bool:
+    import redshift_connector
+
+    return isinstance(error, redshift_connector.Error)
+
 
 class RedshiftConnection:
     """Manages connections to Redshift database."""
@@ -16,6 +41,7 @@ class RedshiftConnection:
         database: Optional[str] = None,
         user: Optional[str] = None,
         password: Optional[str] = None,
+        timeout: Optional[int] = None,
     ):
         """Initialize Redshift connection with settings or explicit params.
 
@@ -25,13 +51,17 @@ class RedshiftConnection:
             database: Database name (default: settings.REDSHIFT_DB)
             user: Database user (default: settings.REDSHIFT_USER)
             password: Database password (default: settings.REDSHIFT_PASSWORD)
+            timeout: Socket timeout of the connection and every read, in seconds (default: none)
         """
         self.host = host or settings.REDSHIFT_HOST
         self.port = int(port or settings.REDSHIFT_PORT)
         self.database = database or settings.REDSHIFT_DB
         self.user = user or settings.REDSHIFT_USER
         self.password = password or settings.REDSHIFT_PASSWORD
+        self.timeout = timeout
         self._connection = None
+        self._backend_pid: Optional[int] = None
+        self._statement_timeout_ms: Optional[int] = None
 
         if not all([self.host, self.database, self.user, self.password]):
             # It's possible some might be None if not set in env or passed
@@ -68,37 +98,102 @@ class RedshiftConnection:
                     "are set in environment variables or settings."
                 )
 
+            # Imported on first connect: the driver is slow to import and most
+            # API processes never open a warehouse connection.
+            import redshift_connector
+
             self._connection = redshift_connector.connect(
                 host=self.host,
                 port=self.port,
                 database=self.database,
                 user=self.user,
                 password=self.password,
+                timeout=self.timeout,
             )
+            # Each statement commits on its own: no BEGIN round trip, and a reused
+            # session never holds an old snapshot or locks between queries
+            self._connection.autocommit = True
+            self._backend_pid = None
+            self._statement_timeout_ms = None
         return self._connection
 
     def close(self):
         """Close the database connection."""
         if self._connection and not self._is_connection_closed():
             self._connection.close()
+        self._connection = None
+        self._backend_pid = None
+        self._statement_timeout_ms = None
+
+    def cancel(self) -> bool:
+        """Cancel the statement running on this connection from a separate session.
+
+        Returns:
+            True if the warehouse accepted the cancel request
+        """
+        if self._backend_pid is None:
+            return False
+
+        side = RedshiftConnection(self.host, self.port, self.database, self.user, self.password)
+        try:
+            cursor = side.connect().cursor()
+            cursor.execute("SELECT pg_cancel_backend(%s)", (self._backend_pid,))
+            cancelled = bool(cursor.fetchone()[0])
+            cursor.close()
+            logger.info(f"Cancelled statement of Redshift backend {self._backend_pid}: {cancelled}")
+            return cancelled
+        except Exception as e:
+            logger.warning(f"Failed to cancel statement of Redshift backend {self._backend_pid}: {e}")
+            return False
+        finally:
+            side.close()
+
+    def _discard(self):
+        """Drop a connection whose state is unknown after an interrupted statement."""
+        try:
+            self.close()
+        except Exception:
             self._connection = None
+            self._backend_pid = None
+            self._statement_timeout_ms = None
+
+    def _prepare_session(self, cursor, statement_timeout_ms: int):
+        # Session state outlives the statement: read the pid once per connection,
+        # and set the timeout again only when a query asks for another one
+        if self._backend_pid is None:
+            cursor.execute("SELECT pg_backend_pid()")
+            self._backend_pid = cursor.fetchone()[0]
+        if self._statement_timeout_ms != int(statement_timeout_ms):
+            cursor.execute(f"SET statement_timeout TO {int(statement_timeout_ms)}")
+            self._statement_timeout_ms = int(statement_timeout_ms)
 
-    def execute_query(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+    def execute_query(self, query: str, params: Optional[tuple] = None, statement_timeout_ms: Optional[int] = None) -> List[Dict[str, Any]]:
         """Execute a query and return results as list of dictionaries.
         Supports multiple statements separated by semicolons by executing them sequentially.
         If multiple statements are provided, returns the results of the last statement.
 
+        If the calling task is interrupted (soft time limit, revoke) while a statement runs,
+        the statement is cancelled server-side and the connection is closed.
+
         Args:
             query: SQL query (or queries) to execute
             params: Optional query parameters for parameterized queries (only applied to the last statement)
+            statement_timeout_ms: Server-side statement timeout (default: settings.REDSHIFT_STATEMENT_TIMEOUT_MS, 0 disables)
 
         Returns:
             List of dictionaries representing query results from the last statement
         """
+        if statement_timeout_ms is None:
+            statement_timeout_ms = settings.REDSHIFT_STATEMENT_TIMEOUT_MS
+
         conn = self.connect()
         cursor = conn.cursor()
-        
+        with _running_lock:
+            _running.add(self)
+
         try:
+            self._prepare_session(cursor, statement_timeout_ms)
+
             # Split query into individual statements
             # This is a basic split that handles multiple statements separated by semicolons
             # It might fail if semicolons are inside strings, but for standard usage it's usually fine
@@ -128,10 +223,17 @@ class RedshiftConnection:
                         results = []
             
             return results
-        except Exception as e:
+        except BaseException as e:
+            if not _is_driver_error(e):
+                # Interrupted client-side: stop the statement on the warehouse too
+                self.cancel()
+                self._discard()
             raise
         finally:
-            cursor.close()
+            with _running_lock:
+                _running.discard(self)
+            if self._connection is not None:
+                cursor.close()
 
     def __enter__(self):
         """Context manager entry."""
@@ -142,18 +244,74 @@ class RedshiftConnection:
         """Context manager exit."""
         self.close()
 
-def execute_query(query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+def _checkout() -> RedshiftConnection:
+    """The most recently used idle session still within REDSHIFT_POOL_IDLE_SECONDS, or a new one."""
+    expired = []
+    conn = None
+    with _idle_lock:
+        while _idle and conn is None:
+            candidate, idle_since = _idle.pop()
+            if time.monotonic() - idle_since < settings.REDSHIFT_POOL_IDLE_SECONDS:
+                conn = candidate
+            else:
+                expired.append(candidate)
+    for stale in expired:
+        stale._discard()
+    return conn or RedshiftConnection()
+
+
+def _checkin(conn: RedshiftConnection) -> None:
+    """Keep a session for the next query, unless it was closed (e.g. after an interrupted statement)."""
+    if conn._is_connection_closed():
+        conn._discard()
+        return
+    with _idle_lock:
+        _idle.append((conn, time.monotonic()))
+
+
+def close_idle_connections() -> int:
+    """Close every idle session of this process, e.g. at shutdown. Returns how many were closed."""
+    with _idle_lock:
+        connections = [conn for conn, _ in _idle]
+        _idle.clear()
+    for conn in connections:
+        conn._discard()
+    return len(connections)
+
+
+def _run_pooled(query: str, params: Optional[tuple] = None, statement_timeout_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+    with _session_slots:
+        conn = _checkout()
+        try:
+            return conn.execute_query(query, params, statement_timeout_ms)
+        finally:
+            _checkin(conn)
+
+
+def cancel_running_queries() -> int:
+    """Cancel every statement this process is running, e.g. when a task is interrupted.
+
+    Returns:
+        Number of statements the warehouse accepted to cancel
+    """
+    with _running_lock:
+        connections = list(_running)
+    return sum(1 for conn in connections if conn.cancel())
+
+
+def execute_query(query: str, params: Optional[tuple] = None, statement_timeout_ms: Optional[int] = None) -> List[Dict[str, Any]]:
     """Execute a query and return results as list of dictionaries.
+    Runs on an idle session of this process when there is one.
     
     Args:
         query: SQL query to execute
         params: Optional query parameters
+        statement_timeout_ms: Server-side statement timeout (default: settings.REDSHIFT_STATEMENT_TIMEOUT_MS)
         
     Returns:
         List of dictionaries representing query results
     """
-    with RedshiftConnection() as conn:
-        return conn.execute_query(query, params)
+    return _run_pooled(query, params, statement_timeout_ms)
 
 
 def execute_command(command: str, params: Optional[tuple] = None) -> None:
@@ -163,8 +321,7 @@ def execute_command(command: str, params: Optional[tuple] = None) -> None:
         command: SQL command to execute
         params: Optional command parameters
     """
-    with RedshiftConnection() as conn:
-        conn.execute_query(command, params)
+    _run_pooled(command, params)
 
 
 def get_db():
@@ -178,6 +335,20 @@ def get_db():
     finally:
         conn.close()
 
-def health_check():
-    execute_query("SELECT 1")
+def get_queue_wait_seconds() -> float:
+    """Longest time any query currently waiting in a WLM queue has waited, in seconds."""
+    rows = execute_query(
+        "SELECT COALESCE(MAX(queue_time), 0) / 1000000.0 AS queue_seconds "
+        "FROM stv_wlm_query_state WHERE state LIKE 'Queued%%'"
+    )
+    return float(rows[0]["queue_seconds"]) if rows else 0.0
+
+
+def health_check(timeout_seconds: Optional[float] = None):
+    """Connect and run SELECT 1 on a fresh session, failing after `timeout_seconds` at
+    the socket instead of hanging with the warehouse. Takes no session slot, so that
+    busy queries never hold a probe back."""
+    timeout = max(1, math.ceil(timeout_seconds)) if timeout_seconds else None
+    with RedshiftConnection(timeout=timeout) as conn:
+        conn.execute_query("SELECT 1", statement_timeout_ms=timeout * 1000 if timeout else None)
     return True
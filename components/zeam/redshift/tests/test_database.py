@@ -0,0 +1,154 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from zeam.redshift import database
+from zeam.redshift.database import RedshiftConnection, cancel_running_queries
+
+
+class Interrupted(Exception):
+    """Stands in for Celery's SoftTimeLimitExceeded."""
+
+
+def make_connection(cursors):
+    driver_connection = MagicMock()
+    driver_connection.closed = False
+    driver_connection.cursor.side_effect = cursors
+    conn = RedshiftConnection("host", 5439, "db", "user", "password")
+    conn._connection = driver_connection
+    return conn
+
+
+def test_sets_statement_timeout_before_query():
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (1234,)
+    cursor.description = [("id",)]
+    cursor.fetchall.return_value = [(1,)]
+    conn = make_connection([cursor])
+
+    assert conn.execute_query("SELECT id FROM t WHERE x = %s", (1,), statement_timeout_ms=5000) == [{"id": 1}]
+
+    statements = [call[0][0] for call in cursor.execute.call_args_list]
+    assert statements == ["SELECT pg_backend_pid()", "SET statement_timeout TO 5000", "SELECT id FROM t WHERE x = %s"]
+    assert conn._backend_pid == 1234
+
+
+def test_session_setup_runs_once_per_connection():
+    cursors = [MagicMock() for _ in range(3)]
+    for cursor in cursors:
+        cursor.fetchone.return_value = (1234,)
+        cursor.description = None
+    conn = make_connection(cursors)
+
+    conn.execute_query("SELECT 1", statement_timeout_ms=5000)
+    conn.execute_query("SELECT 2", statement_timeout_ms=5000)
+    conn.execute_query("SELECT 3", statement_timeout_ms=0)
+
+    statements = [[call[0][0] for call in cursor.execute.call_args_list] for cursor in cursors]
+    assert statements[1] == ["SELECT 2"]
+    # A different timeout is set again on the same session
+    assert statements[2] == ["SET statement_timeout TO 0", "SELECT 3"]
+
+
+def test_idle_sessions_are_reused():
+    opened = []
+
+    def connect(self):
+        if self._connection is None:
+            self._connection = MagicMock(closed=False)
+            opened.append(self)
+        return self._connection
+
+    with patch.object(RedshiftConnection, "connect", connect), \
+            patch.object(RedshiftConnection, "_prepare_session"), \
+            patch.object(database, "_idle", []):
+        database.execute_query("SELECT 1")
+        database.execute_query("SELECT 2")
+        assert len(opened) == 1
+
+        with patch.object(database.settings, "REDSHIFT_POOL_IDLE_SECONDS", 0):
+            database.execute_query("SELECT 3")
+        assert len(opened) == 2
+        assert opened[0]._connection is None
+        assert database.close_idle_connections() == 1
+
+
+def test_interrupted_statement_is_cancelled_server_side():
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (1234,)
+
+    def execute(statement, params=None):
+        if statement.startswith("SELECT id"):
+            raise Interrupted()
+
+    cursor.execute.side_effect = execute
+    conn = make_connection([cursor])
+
+    with patch.object(RedshiftConnection, "cancel", return_value=True) as mock_cancel:
+        with pytest.raises(Interrupted):
+            conn.execute_query("SELECT id FROM t")
+
+    mock_cancel.assert_called_once()
+    assert conn._connection is None
+    assert not database._running
+
+
+def test_driver_error_does_not_cancel():
+    import redshift_connector
+
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (1234,)
+
+    def execute(statement, params=None):
+        if statement.startswith("SELECT id"):
+            raise redshift_connector.ProgrammingError("canceling statement due to statement timeout")
+
+    cursor.execute.side_effect = execute
+    conn = make_connection([cursor])
+
+    with patch.object(RedshiftConnection, "cancel") as mock_cancel:
+        with pytest.raises(redshift_connector.ProgrammingError):
+            conn.execute_query("SELECT id FROM t")
+
+    mock_cancel.assert_not_called()
+
+
+def test_cancel_uses_a_side_connection():
+    conn = RedshiftConnection("host", 5439, "db", "user", "password")
+    conn._backend_pid = 1234
+    side_cursor = MagicMock()
+    side_cursor.fetchone.return_value = (True,)
+
+    with patch.object(RedshiftConnection, "connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value = side_cursor
+        assert conn.cancel() is True
+
+    side_cursor.execute.assert_called_once_with("SELECT pg_cancel_backend(%s)", (1234,))
+
+
+def test_cancel_running_queries():
+    conn = RedshiftConnection("host", 5439, "db", "user", "password")
+    database._running.add(conn)
+    try:
+        with patch.object(RedshiftConnection, "cancel", return_value=True):
+            assert cancel_running_queries() == 1
+    finally:
+        database._running.discard(conn)
+
+
+def test_health_check_bounds_the_driver_socket():
+    with patch("redshift_connector.connect") as mock_connect:
+        mock_connect.return_value.closed = False
+        cursor = mock_connect.return_value.cursor.return_value
+        cursor.fetchone.return_value = (1234,)
+        cursor.description = None
+        with patch.object(database.settings, "REDSHIFT_HOST", "host"), \
+                patch.object(database.settings, "REDSHIFT_DB", "db"), \
+                patch.object(database.settings, "REDSHIFT_USER", "user"), \
+                patch.object(database.settings, "REDSHIFT_PASSWORD", "password"):
+            assert database.health_check(2.5) is True
+
+    assert mock_connect.call_args.kwargs["timeout"] == 3
+    statements = [call[0][0] for call in cursor.execute.call_args_list]
+    assert "SET statement_timeout TO 3000" in statements
+    mock_connect.return_value.close.assert_called_once()
@@ -0,0 +1,174 @@
+"""
+"Current week" aliases of the published windows.
+
+Requests without dates are served the window named by their segment's
+alias instead of the calendar week. A segment's alias only moves to a new
+week once that week's keys are published for it, so at the Monday rollover
+clients keep reading the previous week's keys instead of all missing at
+once. Workers advance an alias right after publishing; the beat refresh
+recomputes the current week of every aliased segment, starting at the
+boundary. Segments published by the segment cube are recomputed by one
+cube run instead of a run per segment.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from zeam.config.core import settings
+from zeam.redis_client import RedisRole, advance_field, advance_fields, async_client_context, sync_client_context
+from zeam.worker_registry.core import WorkerNames
+from zeam.worker_registry.windows import current_week_window, previous_week_window
+
+logger = logging.getLogger(__name__)
+
+CURRENT_WEEK_ALIAS_KEY = "zeam-recommender:alias:current-week"
+WINDOW_SEPARATOR = "|"
+
+Window = Tuple[str, str]
+
+
+class AliasKind:
+    POPULARITY = "popularity"
+    CURATED = "curated"
+    # One alias for the whole cube, next to the popularity aliases of its segments
+    POPULARITY_CUBE = "popularity-cube"
+
+
+# Task recomputing each kind of alias
+ALIAS_TASKS = {
+    AliasKind.POPULARITY: WorkerNames.CONTENT_POPULARITY,
+    AliasKind.CURATED: WorkerNames.CURATED_CONTENT_POPULARITY,
+    AliasKind.POPULARITY_CUBE: WorkerNames.CONTENT_POPULARITY_CUBE,
+}
+
+# Segment of the cube alias
+CUBE_SEGMENT = "all"
+
+
+def get_alias_field(kind: str, segment: str) -> str:
+    """Field of a kind and segment (see content_popularity.get_segment_suffix) in the alias hash."""
+    return f"{kind}:{segment}"
+
+
+def parse_segment(segment: str) -> Tuple[Optional[int], Optional[int]]:
+    """(dma_id, client_platform_id) of a segment suffix such as "501:p3" or "global"."""
+    dma, _, platform = segment.partition(":p")
+    return (None if dma == "global" else int(dma)), (int(platform) if platform else None)
+
+
+def as_calendar_week(start_date: str, end_date: str) -> Optional[Window]:
+    """Canonical window of the calendar week spanning start_date to end_date (by day), if they span one."""
+    window = current_week_window(datetime.fromisoformat(start_date.strip()))
+    if (start_date.strip()[:10], end_date.strip()[:10]) != (window[0][:10], window[1][:10]):
+        return None
+    return window
+
+
+def advance_current_week(kind: str, segment: str, start_date: str, end_date: str) -> bool:
+    """
+    Point the segment's alias at a just-published calendar week, unless it
+    already points at a later one. Other windows (e.g. backfills of arbitrary
+    ranges) leave the alias alone. Returns True when the alias moved.
+    """
+    window = as_calendar_week(start_date, end_date)
+    if window is None:
+        return False
+    try:
+        advanced = advance_field(CURRENT_WEEK_ALIAS_KEY, get_alias_field(kind, segment), WINDOW_SEPARATOR.join(window))
+    except Exception as e:
+        # The keys are published; the next refresh advances the alias
+        logger.warning(f"Could not advance the {kind} alias of {segment}: {e}")
+        return False
+    if advanced:
+        logger.info(f"{kind} alias of {segment} now points at {window[0]} - {window[1]}")
+    return advanced
+
+
+def advance_current_weeks(kind: str, segments: List[str], start_date: str, end_date: str) -> int:
+    """
+    `advance_current_week` for many segments of a kind in one Redis call.
+    Returns the number of aliases that moved.
+    """
+    window = as_calendar_week(start_date, end_date)
+    if window is None or not segments:
+        return 0
+    fields = [get_alias_field(kind, segment) for segment in segments]
+    try:
+        advanced = advance_fields(CURRENT_WEEK_ALIAS_KEY, fields, WINDOW_SEPARATOR.join(window))
+    except Exception as e:
+        logger.warning(f"Could not advance the {kind} aliases of {len(segments)} segments: {e}")
+        return 0
+    if advanced:
+        logger.info(f"{advanced} {kind} aliases now point at {window[0]} - {window[1]}")
+    return advanced
+
+
+def _parse_aliases(raw: Dict[str, str]) -> Dict[str, Window]:
+    return {field: tuple(value.split(WINDOW_SEPARATOR, 1)) for field, value in raw.items() if WINDOW_SEPARATOR in value}
+
+
+def get_refresh_jobs(now: Optional[datetime] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    (task name, kwargs) recomputing the current calendar week of every
+    aliased segment whose alias is at most a week old; segments nobody has
+    computed for longer are left to lapse. While the cube alias is recent,
+    one cube run replaces the popularity runs of single segments.
+    """
+    with sync_client_context() as client:
+        aliases = _parse_aliases(client.hgetall(CURRENT_WEEK_ALIAS_KEY))
+
+    start_date, end_date = current_week_window(now)
+    recent = {current_week_window(now), previous_week_window(now)}
+    cube = aliases.get(get_alias_field(AliasKind.POPULARITY_CUBE, CUBE_SEGMENT)) in recent
+    jobs = []
+    for field, window in sorted(aliases.items()):
+        kind, _, segment = field.partition(":")
+        if kind not in ALIAS_TASKS or window not in recent:
+            continue
+        if kind == AliasKind.POPULARITY_CUBE:
+            jobs.append((ALIAS_TASKS[kind], {"start_date": start_date, "end_date": end_date}))
+            continue
+        if kind == AliasKind.POPULARITY and cube:
+            continue
+        dma_id, client_platform_id = parse_segment(segment)
+        kwargs = {"start_date": start_date, "end_date": end_date, "dma_id": dma_id}
+        if kind == AliasKind.POPULARITY:
+            kwargs["client_platform_id"] = client_platform_id
+        jobs.append((ALIAS_TASKS[kind], kwargs))
+    return jobs
+
+
+class AliasCache:
+    """
+    In-process copy of the aliases for the API, re-read at most every
+    `ttl_seconds`. While one request refreshes it the others keep using the
+    current copy, and a failed read keeps it until the next attempt.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._aliases: Dict[str, Window] = {}
+        self._expires_at = 0.0
+
+    def peek(self) -> Dict[str, Window]:
+        """The current copy, without refreshing it."""
+        return self._aliases
+
+    async def get(self) -> Dict[str, Window]:
+        if time.monotonic() < self._expires_at:
+            return self._aliases
+        self._expires_at = time.monotonic() + self.ttl_seconds
+        try:
+            async with async_client_context(RedisRole.REPLICA) as client:
+                raw = await asyncio.wait_for(client.hgetall(CURRENT_WEEK_ALIAS_KEY), settings.SERVING_REDIS_TIMEOUT_MS / 1000)
+            self._aliases = _parse_aliases(raw)
+        except Exception as e:
+            logger.warning(f"Could not refresh the current week aliases ({type(e).__name__}), keeping {len(self._aliases)}")
+        return self._aliases
+
+
+def resolve_current_week(aliases: Dict[str, Window], kind: str, segment: str) -> Window:
+    """The segment's aliased window, or the calendar week when it has none."""
+    return aliases.get(get_alias_field(kind, segment)) or current_week_window()
@@ -0,0 +1,322 @@
+"""
+Resumable backfills of curated content popularity.
+
+A backfill expands a date range × DMAs into window chunks and runs them in
+waves through `run_curated_content_batch`. One task slice runs waves for
+up to BACKFILL_SLICE_SECONDS, checkpointing after each wave, then enqueues
+the next slice; a stopped or crashed backfill resumes from its checkpoint,
+so at most one wave is recomputed. The slice's lease is renewed as each
+chunk finishes, so a long wave never outlives it. Before each wave the warehouse WLM queue
+is checked: while queries wait longer than BACKFILL_MAX_QUEUE_SECONDS the
+concurrency is halved, otherwise it grows back by one.
+"""
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from zeam.config.core import settings
+from zeam.redis_client import RedisRole, acquire_marker, async_client_context, release_marker, renew_marker, sync_client_context
+from zeam.redshift import get_queue_wait_seconds
+from zeam.redshift.config import settings as redshift_settings
+from zeam.worker_registry.curated_content import run_curated_content_batch
+from zeam.worker_registry.dispatch import expand_job_args
+
+logger = logging.getLogger(__name__)
+
+BACKFILLS_KEY = "zeam-recommender:backfills"
+ERROR_MAX_LENGTH = 200
+# Chunks per wave for each concurrent query, so one slow chunk idles few others
+WAVE_FACTOR = 2
+
+
+class BackfillStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    STOPPED = "stopped"
+    FAILED = "failed"
+    COMPLETED = "completed"
+
+
+def get_backfill_key(backfill_id: str) -> str:
+    """State hash of a backfill; the id is hash-tagged so its errors and lease share a cluster slot."""
+    return f"zeam-recommender:backfill:{{{backfill_id}}}"
+
+
+def get_errors_key(backfill_id: str) -> str:
+    return f"{get_backfill_key(backfill_id)}:errors"
+
+
+def get_lease_key(backfill_id: str) -> str:
+    return f"{get_backfill_key(backfill_id)}:lease"
+
+
+def expand_chunks(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Chunks of a backfill, in the order they run; the same spec always expands to the same list."""
+    return expand_job_args(
+        {"item_count": spec["item_count"]},
+        spec["dma_ids"],
+        spec["start_date"],
+        spec["end_date"],
+        spec["window_days"],
+        max_tasks=settings.BACKFILL_MAX_CHUNKS,
+    )
+
+
+def next_concurrency(concurrency: int, queue_seconds: float, max_concurrency: int) -> int:
+    """Halve on a congested warehouse queue, otherwise add one (up to `max_concurrency`)."""
+    if queue_seconds > settings.BACKFILL_MAX_QUEUE_SECONDS:
+        return max(1, concurrency // 2)
+    return min(max_concurrency, concurrency + 1)
+
+
+def _queue_seconds() -> float:
+    try:
+        return get_queue_wait_seconds()
+    except Exception as e:
+        # Backfills keep running without the signal, at their current concurrency
+        logger.warning(f"Could not read the warehouse queue time: {e}")
+        return 0.0
+
+
+def _parse_state(backfill_id: str, state: Dict[str, str]) -> Dict[str, Any]:
+    total = int(state.get("total", 0))
+    done = int(state.get("cursor", 0))
+    active_seconds = float(state.get("active_seconds", 0))
+    rate = done / active_seconds if active_seconds and done else None
+    status = state.get("status")
+    unfinished = status in (BackfillStatus.QUEUED, BackfillStatus.RUNNING)
+    return {
+        "backfill_id": backfill_id,
+        "status": status,
+        "spec": json.loads(state.get("spec", "{}")),
+        "total": total,
+        "done": done,
+        "failed": int(state.get("failed", 0)),
+        "rows_count": int(state.get("rows", 0)),
+        "progress": round(done / total, 4) if total else 1.0,
+        "chunks_per_second": round(rate, 4) if rate else None,
+        "eta_seconds": round((total - done) / rate) if rate and unfinished else None,
+        "concurrency": int(state.get("concurrency", 0)),
+        "queue_seconds": float(state.get("queue_seconds", 0)),
+        "created_at": float(state.get("created_at", 0)),
+        "updated_at": float(state.get("updated_at", 0)),
+        "error": state.get("error"),
+    }
+
+
+async def create_backfill(
+    start_date: str,
+    end_date: str,
+    dma_ids: Optional[List[Optional[int]]] = None,
+    window_days: int = 7,
+    item_count: int = 10,
+    max_concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Record a queued backfill and return its status; the caller enqueues its first slice."""
+    spec = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "dma_ids": dma_ids if dma_ids is not None else [None],
+        "window_days": window_days,
+        "item_count": item_count,
+        "max_concurrency": min(max_concurrency or settings.BACKFILL_MAX_CONCURRENCY, settings.BACKFILL_MAX_CONCURRENCY),
+    }
+    chunks = expand_chunks(spec)
+    backfill_id = uuid.uuid4().hex
+    now = time.time()
+    state = {
+        "status": BackfillStatus.QUEUED,
+        "spec": json.dumps(spec),
+        "total": len(chunks),
+        "cursor": 0,
+        "failed": 0,
+        "rows": 0,
+        "active_seconds": 0,
+        "concurrency": spec["max_concurrency"],
+        "queue_seconds": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+    key = get_backfill_key(backfill_id)
+    async with async_client_context(RedisRole.RESULTS) as client:
+        pipe = client.pipeline(transaction=False)
+        pipe.hset(key, mapping=state)
+        pipe.expire(key, settings.BACKFILL_RETENTION_SECONDS)
+        pipe.zadd(BACKFILLS_KEY, {backfill_id: now})
+        pipe.zremrangebyscore(BACKFILLS_KEY, 0, now - settings.BACKFILL_RETENTION_SECONDS)
+        await pipe.execute()
+    logger.info(f"Created backfill {backfill_id} of {len(chunks)} chunks")
+    return _parse_state(backfill_id, {name: str(value) for name, value in state.items()})
+
+
+async def get_backfill(backfill_id: str) -> Optional[Dict[str, Any]]:
+    """Status, throughput and ETA of a backfill, with the errors of its failed chunks; None if unknown."""
+    async with async_client_context(RedisRole.RESULTS) as client:
+        pipe = client.pipeline(transaction=False)
+        pipe.hgetall(get_backfill_key(backfill_id))
+        pipe.hgetall(get_errors_key(backfill_id))
+        pipe.get(get_lease_key(backfill_id))
+        state, errors, holder = await pipe.execute()
+    if not state:
+        return None
+    backfill = _parse_state(backfill_id, state)
+    backfill["run_id"] = holder
+    backfill["errors"] = [json.loads(error) for _, error in sorted(errors.items(), key=lambda item: int(item[0]))]
+    return backfill
+
+
+async def list_backfills(count: int = 20) -> List[Dict[str, Any]]:
+    """Most recently created backfills first."""
+    async with async_client_context(RedisRole.RESULTS) as client:
+        backfill_ids = await client.zrevrange(BACKFILLS_KEY, 0, count - 1)
+        pipe = client.pipeline(transaction=False)
+        for backfill_id in backfill_ids:
+            pipe.hgetall(get_backfill_key(backfill_id))
+        states = await pipe.execute()
+    return [_parse_state(backfill_id, state) for backfill_id, state in zip(backfill_ids, states) if state]
+
+
+async def stop_backfill(backfill_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Ask a backfill to stop; a running slice stops after its current wave and
+    a queued one as soon as it starts. Returns the status, None if unknown.
+    """
+    key = get_backfill_key(backfill_id)
+    async with async_client_context(RedisRole.RESULTS) as client:
+        if not await client.exists(key):
+            return None
+        await client.hset(key, mapping={"stop_requested": 1, "updated_at": time.time()})
+    return await get_backfill(backfill_id)
+
+
+async def prepare_resume(backfill_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Queue a stopped, failed or abandoned backfill again from its checkpoint;
+    the caller enqueues its next slice. Returns the status, None if unknown.
+    Raises ValueError when it is completed or a slice still holds it.
+    """
+    backfill = await get_backfill(backfill_id)
+    if backfill is None:
+        return None
+    if backfill["status"] == BackfillStatus.COMPLETED:
+        raise ValueError(f"Backfill '{backfill_id}' is already completed")
+    if backfill["run_id"]:
+        raise ValueError(f"Backfill '{backfill_id}' is running in {backfill['run_id']}")
+    async with async_client_context(RedisRole.RESULTS) as client:
+        pipe = client.pipeline(transaction=False)
+        pipe.hset(get_backfill_key(backfill_id), mapping={"status": BackfillStatus.QUEUED, "updated_at": time.time()})
+        pipe.hdel(get_backfill_key(backfill_id), "stop_requested", "error")
+        await pipe.execute()
+    return await get_backfill(backfill_id)
+
+
+def _lease_seconds(statement_timeout_ms: Optional[int] = None) -> int:
+    # Renewed at every checkpoint and finished chunk, which comes at least once per
+    # statement timeout; lapses soon after a crashed slice so it can be resumed
+    if statement_timeout_ms is None:
+        statement_timeout_ms = redshift_settings.REDSHIFT_STATEMENT_TIMEOUT_MS
+    return max(2 * settings.BACKFILL_SLICE_SECONDS, 2 * statement_timeout_ms // 1000)
+
+
+def _checkpoint(client: Any, backfill_id: str, lease_seconds: int, fields: Dict[str, Any], errors: Optional[Dict[int, str]] = None) -> None:
+    pipe = client.pipeline(transaction=False)
+    pipe.expire(get_lease_key(backfill_id), lease_seconds)
+    pipe.hset(get_backfill_key(backfill_id), mapping={**fields, "updated_at": time.time()})
+    if errors:
+        pipe.hset(get_errors_key(backfill_id), mapping=errors)
+    for key in (get_backfill_key(backfill_id), get_errors_key(backfill_id)):
+        pipe.expire(key, settings.BACKFILL_RETENTION_SECONDS)
+    pipe.execute()
+
+
+def run_backfill_slice(backfill_id: str, run_id: str, statement_timeout_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run waves of a backfill for up to BACKFILL_SLICE_SECONDS. Returns its
+    status, with "continue" set when another slice should be enqueued.
+    """
+    lease_key = get_lease_key(backfill_id)
+    lease_seconds = _lease_seconds(statement_timeout_ms)
+    holder = acquire_marker(lease_key, run_id, lease_seconds, RedisRole.RESULTS)
+    if holder is not None:
+        logger.info(f"Backfill {backfill_id} is already running in {holder}")
+        return {"status": "skipped", "backfill_id": backfill_id, "run_id": run_id, "continue": False}
+
+    def renew_lease(job_result: Dict[str, Any]) -> None:
+        try:
+            if not renew_marker(lease_key, run_id, lease_seconds, RedisRole.RESULTS):
+                logger.warning(f"Backfill {backfill_id} lost its lease to another slice")
+        except Exception as e:
+            logger.warning(f"Could not renew the lease of backfill {backfill_id}: {e}")
+
+    deadline = time.monotonic() + settings.BACKFILL_SLICE_SECONDS
+    try:
+        with sync_client_context(RedisRole.RESULTS) as client:
+            state = client.hgetall(get_backfill_key(backfill_id))
+            if not state or state.get("status") == BackfillStatus.COMPLETED:
+                return {"status": "skipped", "backfill_id": backfill_id, "run_id": run_id, "continue": False}
+
+            spec = json.loads(state["spec"])
+            chunks = expand_chunks(spec)
+            cursor = int(state["cursor"])
+            failed = int(state["failed"])
+            rows = int(state["rows"])
+            active_seconds = float(state["active_seconds"])
+            concurrency = int(state["concurrency"])
+            _checkpoint(client, backfill_id, lease_seconds, {"status": BackfillStatus.RUNNING})
+
+            while cursor < len(chunks) and time.monotonic() < deadline:
+                if client.hget(get_backfill_key(backfill_id), "stop_requested"):
+                    _checkpoint(client, backfill_id, lease_seconds, {"status": BackfillStatus.STOPPED})
+                    logger.info(f"Backfill {backfill_id} stopped at chunk {cursor} of {len(chunks)}")
+                    return {"status": BackfillStatus.STOPPED, "backfill_id": backfill_id, "run_id": run_id, "continue": False}
+
+                queue_seconds = _queue_seconds()
+                congested = queue_seconds > settings.BACKFILL_MAX_QUEUE_SECONDS
+                concurrency = next_concurrency(concurrency, queue_seconds, spec["max_concurrency"])
+                if congested:
+                    _checkpoint(client, backfill_id, lease_seconds, {"concurrency": concurrency, "queue_seconds": queue_seconds})
+                    logger.info(f"Warehouse queue at {queue_seconds:.0f}s, backfill {backfill_id} down to concurrency {concurrency}")
+                    time.sleep(max(0.0, min(settings.BACKFILL_THROTTLE_SECONDS, deadline - time.monotonic())))
+                    continue
+
+                wave = chunks[cursor:cursor + WAVE_FACTOR * concurrency]
+                started = time.monotonic()
+                result = run_curated_content_batch(wave, concurrency, run_id, statement_timeout_ms, on_progress=renew_lease)
+                active_seconds += time.monotonic() - started
+
+                # Batch results come back in completion order; chunks are keyed by their index
+                positions = {json.dumps(chunk, sort_keys=True): cursor + index for index, chunk in enumerate(wave)}
+                errors = {
+                    positions.get(json.dumps(job["args"], sort_keys=True), cursor): json.dumps({"args": job["args"], "error": job["error"][:ERROR_MAX_LENGTH]})
+                    for job in result["results"] if job["status"] != "success"
+                }
+                cursor += len(wave)
+                failed += result["failed"]
+                rows += result["rows_count"]
+                _checkpoint(client, backfill_id, lease_seconds, {
+                    "cursor": cursor,
+                    "failed": failed,
+                    "rows": rows,
+                    "active_seconds": active_seconds,
+                    "concurrency": concurrency,
+                    "queue_seconds": queue_seconds,
+                }, errors)
+
+            finished = cursor >= len(chunks)
+            status = BackfillStatus.COMPLETED if finished else BackfillStatus.QUEUED
+            _checkpoint(client, backfill_id, lease_seconds, {"status": status})
+            logger.info(f"Backfill {backfill_id}: {cursor} of {len(chunks)} chunks done, {failed} failed")
+            return {"status": status, "backfill_id": backfill_id, "run_id": run_id, "done": cursor, "continue": not finished}
+
+    except BaseException as e:
+        # Interrupted or failed: the checkpoint stays at the last finished wave
+        try:
+            with sync_client_context(RedisRole.RESULTS) as client:
+                _checkpoint(client, backfill_id, lease_seconds, {"status": BackfillStatus.FAILED, "error": f"{type(e).__name__}: {e}"[:ERROR_MAX_LENGTH]})
+        except Exception:
+            logger.warning(f"Could not record the failure of backfill {backfill_id}")
+        raise
+    finally:
+        release_marker(lease_key, run_id, RedisRole.RESULTS)
@@ -0,0 +1,217 @@
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from zeam.analytics.content_popularity import get_cube_results, get_results
+from zeam.config.core import settings
+from zeam.redis_client import BatchPublisher, publish_json, sync_client_context
+from zeam.worker_registry.aliases import CUBE_SEGMENT, AliasKind, advance_current_week, advance_current_weeks
+from zeam.worker_registry.windows import current_week_window, window_hash_tag
+
+logger = logging.getLogger(__name__)
+
+# Must match the values of zeam.api.schemas.ContentType
+CONTENT_TYPES = ["channel", "show", "vod", "clip", "live_event"]
+
+
+def get_segment_suffix(dma_id: Optional[int] = None, client_platform_id: Optional[int] = None) -> str:
+    """
+    Returns the audience segment part of a popularity key: "global", "{dma}",
+    "global:p{platform}" or "{dma}:p{platform}".
+    """
+    dma_suffix = str(dma_id) if dma_id else "global"
+    if client_platform_id:
+        return f"{dma_suffix}:p{client_platform_id}"
+    return dma_suffix
+
+
+def get_segment_fallbacks(dma_id: Optional[int] = None, client_platform_id: Optional[int] = None) -> List[Tuple[Optional[int], Optional[int]]]:
+    """
+    Returns the (dma_id, client_platform_id) segments to try, most specific first,
+    ending with the global segment.
+    """
+    candidates = [
+        (dma_id, client_platform_id),
+        (dma_id, None),
+        (None, client_platform_id),
+        (None, None),
+    ]
+    segments = []
+    for dma, platform in candidates:
+        segment = (dma or None, platform or None)
+        if segment not in segments:
+            segments.append(segment)
+    return segments
+
+
+def get_content_popularity_redis_key(
+    content_type: str,
+    start_date: str,
+    end_date: str,
+    dma_id: Optional[int] = None,
+    client_platform_id: Optional[int] = None,
+) -> str:
+    """
+    Generates the Redis key for the popularity of one content type.
+    The window is hash-tagged so that every type and segment of one window lives on one cluster slot.
+    """
+    segment = get_segment_suffix(dma_id, client_platform_id)
+    return f"zeam-recommender:popularity:{content_type}:{window_hash_tag(start_date, end_date)}:{segment}"
+
+
+def group_rows_by_content_type(rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Groups query rows per content type, shaped like the API's ContentItem.
+    """
+    grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        content_type = row["content_type"]
+        grouped[content_type].append({
+            "id": str(row["content_id"]),
+            "title": row["title"],
+            "type": content_type,
+            "viewers": row["viewers"],
+            "sessions": row["sessions"],
+            "duration_minutes": row["duration_minutes"],
+        })
+    return grouped
+
+
+def run_content_popularity_task(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    dma_id: Optional[int] = None,
+    client_platform_id: Optional[int] = None,
+    item_count: int = 30,
+    run_id: Optional[str] = None,
+    statement_timeout_ms: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Computes popularity for every content type from a single log scan and saves one key per type to Redis.
+    Defaults to the current week when no dates are given. Lists keep more items than the API serves,
+    so that items a device already watched can be dropped.
+    """
+    if not start_date or not end_date:
+        default_start, default_end = current_week_window()
+        start_date = start_date or default_start
+        end_date = end_date or default_end
+
+    logger.info(f"Running content popularity task for period {start_date} to {end_date}, DMA: {dma_id}, Platform: {client_platform_id}, Limit: {item_count}. Run ID: {run_id}")
+
+    rows = get_results(start_date, end_date, dma_id, client_platform_id, item_count, statement_timeout_ms=statement_timeout_ms)
+    logger.info(f"Query returned {len(rows)} rows")
+
+    grouped = group_rows_by_content_type(rows)
+    redis_keys = {}
+    for content_type in CONTENT_TYPES:
+        redis_key = get_content_popularity_redis_key(content_type, start_date, end_date, dma_id, client_platform_id)
+        publish_json(redis_key, grouped.get(content_type, []))
+        redis_keys[content_type] = redis_key
+    if rows:
+        advance_current_week(AliasKind.POPULARITY, get_segment_suffix(dma_id, client_platform_id), start_date, end_date)
+
+    return {
+        "status": "success",
+        "args": {
+            "start_date": start_date,
+            "end_date": end_date,
+            "dma_id": dma_id,
+            "client_platform_id": client_platform_id,
+            "item_count": item_count
+        },
+        "run_id": run_id,
+        "rows_count": len(rows),
+        "rows_by_type": {content_type: len(grouped.get(content_type, [])) for content_type in CONTENT_TYPES},
+        "redis_keys": redis_keys,
+    }
+
+
+def group_rows_by_segment(rows: List[Dict[str, Any]]) -> Dict[Tuple[Optional[int], Optional[int]], List[Dict[str, Any]]]:
+    """
+    Groups segment cube rows per (dma_id, client_platform_id) segment, None
+    where the row's GROUPING() flag says the segment rolls the DMA or platform up.
+    """
+    grouped: Dict[Tuple[Optional[int], Optional[int]], List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        dma_id = None if row["dma_rollup"] else row["dma_id"]
+        client_platform_id = None if row["platform_rollup"] else row["client_platform_id"]
+        grouped[(dma_id, client_platform_id)].append(row)
+    return grouped
+
+
+def get_published_popularity_keys(start_date: str, end_date: str) -> Set[str]:
+    """Content type popularity keys of every segment published for a window."""
+    keys = set()
+    with sync_client_context() as client:
+        for content_type in CONTENT_TYPES:
+            prefix = get_content_popularity_redis_key(content_type, start_date, end_date).rsplit(":", 1)[0] + ":"
+            for key in client.scan_iter(match=f"{prefix}*", count=1000):
+                # Skip the version keys of published lists
+                if ":v:" not in key[len(prefix):]:
+                    keys.add(key)
+    return keys
+
+
+def run_content_popularity_cube_task(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    item_count: int = 30,
+    min_viewers: Optional[int] = None,
+    run_id: Optional[str] = None,
+    statement_timeout_ms: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Computes popularity for every content type in every DMA × client platform
+    segment, every DMA, every platform and globally from a single log scan,
+    and publishes the keys of all segments through one pipeline.
+    Keys of the window left without items (including those of earlier runs
+    and of segments that no longer qualify) are removed, so that the API
+    falls back to the next coarser segment for them.
+    Defaults to the current week when no dates are given.
+    """
+    if not start_date or not end_date:
+        default_start, default_end = current_week_window()
+        start_date = start_date or default_start
+        end_date = end_date or default_end
+    min_viewers = settings.SEGMENT_CUBE_MIN_VIEWERS if min_viewers is None else min_viewers
+
+    logger.info(f"Running content popularity cube task for period {start_date} to {end_date}, Limit: {item_count}, Min viewers: {min_viewers}. Run ID: {run_id}")
+    started = time.monotonic()
+
+    rows = get_cube_results(start_date, end_date, item_count, min_viewers, statement_timeout_ms=statement_timeout_ms)
+    logger.info(f"Cube query returned {len(rows)} rows")
+
+    segments = group_rows_by_segment(rows)
+    stale = get_published_popularity_keys(start_date, end_date)
+    with BatchPublisher() as publisher:
+        for (dma_id, client_platform_id), segment_rows in segments.items():
+            for content_type, items in group_rows_by_content_type(segment_rows).items():
+                redis_key = get_content_popularity_redis_key(content_type, start_date, end_date, dma_id, client_platform_id)
+                publisher.publish(redis_key, items)
+                stale.discard(redis_key)
+        for redis_key in sorted(stale):
+            publisher.unpublish(redis_key)
+
+    # Aliases move only once the publisher has flushed the keys they point at
+    suffixes = [get_segment_suffix(dma_id, client_platform_id) for dma_id, client_platform_id in segments]
+    aliases_advanced = advance_current_weeks(AliasKind.POPULARITY, suffixes, start_date, end_date)
+    if segments:
+        advance_current_week(AliasKind.POPULARITY_CUBE, CUBE_SEGMENT, start_date, end_date)
+
+    return {
+        "status": "success",
+        "args": {
+            "start_date": start_date,
+            "end_date": end_date,
+            "item_count": item_count,
+            "min_viewers": min_viewers,
+        },
+        "run_id": run_id,
+        "rows_count": len(rows),
+        "segments": len(segments),
+        "keys_published": publisher.keys_published,
+        "keys_unpublished": publisher.keys_unpublished,
+        "aliases_advanced": aliases_advanced,
+        "duration_seconds": round(time.monotonic() - started, 3),
+    }
@@ -9,8 +9,20 @@ class WorkerNames:
     Both the Scheduler and Worker must reference these constants.
     """
     CURATED_CONTENT_POPULARITY = "workers.curated_content_popularity"
+    CONTENT_POPULARITY = "workers.content_popularity"
+    CURATED_CONTENT_POPULARITY_BATCH = "workers.curated_content_popularity_batch"
+    REFRESH_CURRENT_WEEK = "workers.refresh_current_week"
+    CURATED_CONTENT_BACKFILL = "workers.curated_content_backfill"
+    TRENDING = "workers.trending"
+    CONTENT_POPULARITY_CUBE = "workers.content_popularity_cube"
 
 
 WORKER_NAMES = [
     WorkerNames.CURATED_CONTENT_POPULARITY,
+    WorkerNames.CONTENT_POPULARITY,
+    WorkerNames.CURATED_CONTENT_POPULARITY_BATCH,
+    WorkerNames.REFRESH_CURRENT_WEEK,
+    WorkerNames.CURATED_CONTENT_BACKFILL,
+    WorkerNames.TRENDING,
+    WorkerNames.CONTENT_POPULARITY_CUBE,
 ]
\ No newline at end of file
@@ -1,45 +1,131 @@
 import logging
-from typing import Dict, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Any, List, Optional
 from zeam.analytics.curated_content import get_results
-from zeam.redis_client import set_json
+from zeam.redis_client import BatchPublisher, publish_json
+from zeam.redshift import cancel_running_queries
+from zeam.redshift.config import settings as redshift_settings
+from zeam.worker_registry.aliases import AliasKind, advance_current_week
+from zeam.worker_registry.core import WorkerNames
+from zeam.worker_registry.dedup import normalize_datetime, run_deduplicated
+from zeam.worker_registry.windows import window_hash_tag
 
 logger = logging.getLogger(__name__)
 
+def _segment(dma_id: Optional[int] = None) -> str:
+    return str(dma_id) if dma_id else "global"
+
 def get_curated_content_redis_key(start_date: str, end_date: str, dma_id: Optional[int] = None) -> str:
     """
     Generates the Redis key for curated content popularity.
+    The window is hash-tagged so that every DMA of one window lives on one cluster slot.
     """
-    # Extract only YYYY-MM-DD
-    # Assumes start_date and end_date are strings like "YYYY-MM-DD HH:MM:SS" or just "YYYY-MM-DD"
-    start_date_key = start_date.split(' ')[0]
-    end_date_key = end_date.split(' ')[0]
-
-    dma_suffix = str(dma_id) if dma_id else "global"
-    return f"zeam-recommender:popularity:curated:{start_date_key}:{end_date_key}:{dma_suffix}"
+    # Only YYYY-MM-DD of start_date and end_date ("YYYY-MM-DD HH:MM:SS" or just "YYYY-MM-DD") is used
+    return f"zeam-recommender:popularity:curated:{window_hash_tag(start_date, end_date)}:{_segment(dma_id)}"
 
-def run_curated_content_task(start_date: str, end_date: str, dma_id: Optional[int] = None, item_count: int = 10, run_id: Optional[str] = None) -> Dict[str, Any]:
+def run_curated_content_task(start_date: str, end_date: str, dma_id: Optional[int] = None, item_count: int = 10, run_id: Optional[str] = None, dedup_policy: Optional[str] = None, statement_timeout_ms: Optional[int] = None) -> Dict[str, Any]:
     """
     Executes the curated content popularity logic: queries analytics and saves to Redis.
+    Identical runs are deduplicated according to `dedup_policy` (default TASK_DEDUP_POLICY).
     """
     logger.info(f"Running curated content task for period {start_date} to {end_date}, DMA: {dma_id}, Limit: {item_count}. Run ID: {run_id}")
 
-    # Execute query
-    rows = get_results(start_date, end_date, dma_id, item_count)
-    logger.info(f"Query returned {len(rows)} rows")
-
-    # Save to Redis
+    args = {
+        "start_date": normalize_datetime(start_date),
+        "end_date": normalize_datetime(end_date),
+        "dma_id": int(dma_id) if dma_id else None,
+        "item_count": int(item_count),
+    }
     redis_key = get_curated_content_redis_key(start_date, end_date, dma_id)
-    set_json(redis_key, rows)
 
+    def run() -> Dict[str, Any]:
+        # Execute query
+        rows = get_results(start_date, end_date, dma_id, item_count, statement_timeout_ms=statement_timeout_ms)
+        logger.info(f"Query returned {len(rows)} rows")
+
+        # Save to Redis
+        publish_json(redis_key, rows)
+        if rows:
+            advance_current_week(AliasKind.CURATED, _segment(dma_id), start_date, end_date)
+
+        return {
+            "status": "success",
+            "args": {
+                "start_date": start_date,
+                "end_date": end_date,
+                "dma_id": dma_id,
+                "item_count": item_count
+            },
+            "run_id": run_id,
+            "rows_count": len(rows),
+            "redis_key": redis_key,
+        }
+
+    return run_deduplicated(WorkerNames.CURATED_CONTENT_POPULARITY, args, redis_key, run, run_id, dedup_policy)
+
+
+def run_curated_content_batch(jobs: List[Dict[str, Any]], max_concurrency: Optional[int] = None, run_id: Optional[str] = None, statement_timeout_ms: Optional[int] = None, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Executes many curated content computations concurrently in this process.
+    Queries run on a thread pool whose warehouse sessions are capped by
+    REDSHIFT_MAX_CONCURRENT_SESSIONS; results stream to Redis through one shared pipeline.
+
+    Args:
+        jobs: Keyword arguments of each run (start_date, end_date, dma_id, item_count)
+        max_concurrency: Number of concurrent computations (default REDSHIFT_MAX_CONCURRENT_SESSIONS)
+        run_id: Optional run ID for logging
+        statement_timeout_ms: Server-side timeout of each query (default REDSHIFT_STATEMENT_TIMEOUT_MS)
+        on_progress: Called with the result of each job as it finishes
+    """
+    max_concurrency = max_concurrency or redshift_settings.REDSHIFT_MAX_CONCURRENT_SESSIONS
+    logger.info(f"Running {len(jobs)} curated content jobs with concurrency {max_concurrency}. Run ID: {run_id}")
+    started = time.monotonic()
+
+    def run_job(publisher: BatchPublisher, job: Dict[str, Any]) -> Dict[str, Any]:
+        args = {
+            "start_date": job["start_date"],
+            "end_date": job["end_date"],
+            "dma_id": job.get("dma_id"),
+            "item_count": job.get("item_count", 10),
+        }
+        rows = get_results(args["start_date"], args["end_date"], args["dma_id"], args["item_count"], statement_timeout_ms=statement_timeout_ms)
+        redis_key = get_curated_content_redis_key(args["start_date"], args["end_date"], args["dma_id"])
+        publisher.publish(redis_key, rows)
+        return {"status": "success", "args": args, "rows_count": len(rows), "redis_key": redis_key}
+
+    results = []
+    with BatchPublisher() as publisher, ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {executor.submit(run_job, publisher, job): job for job in jobs}
+        try:
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Curated content job {futures[future]} failed: {e}", exc_info=True)
+                    results.append({"status": "failed", "args": futures[future], "error": str(e)})
+                if on_progress:
+                    on_progress(results[-1])
+        except BaseException:
+            # Interrupted (soft time limit, revoke): drop queued jobs and stop
+            # the statements still running on the pool threads
+            executor.shutdown(wait=False, cancel_futures=True)
+            cancel_running_queries()
+            raise
+
+    # Aliases move only once the publisher has flushed the keys they point at
+    for result in results:
+        if result["status"] == "success" and result["rows_count"]:
+            args = result["args"]
+            advance_current_week(AliasKind.CURATED, _segment(args["dma_id"]), args["start_date"], args["end_date"])
+
+    failed = sum(1 for result in results if result["status"] != "success")
     return {
-        "status": "success",
-        "args": {
-            "start_date": start_date,
-            "end_date": end_date,
-            "dma_id": dma_id,
-            "item_count": item_count
-        },
+        "status": "success" if not failed else "partial",
         "run_id": run_id,
-        "rows_count": len(rows),
-        "redis_key": redis_key,
+        "jobs": len(jobs),
+        "failed": failed,
+        "rows_count": sum(result.get("rows_count", 0) for result in results),
+        "duration_seconds": round(time.monotonic() - started, 3),
+        "results": results,
     }
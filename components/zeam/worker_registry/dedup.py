@@ -0,0 +1,142 @@
+"""
+Task-level idempotency.
+
+Runs are identified by their task name and normalised arguments. A Redis
+marker records the run in flight, and the summary of the last completed run
+is kept so that duplicates (from beat, the scheduler API or retries) return
+it instead of querying the warehouse again. Duplicates joining a run in
+flight are re-enqueued until it finishes rather than holding a worker slot.
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from zeam.config.core import settings
+from zeam.redis_client import RedisRole, acquire_marker, release_marker, sync_client_context
+from zeam.worker_registry.windows import DATETIME_FORMAT
+
+logger = logging.getLogger(__name__)
+
+INFLIGHT_KEY = "zeam-recommender:runs:inflight:{task}:{args_hash}"
+RESULT_KEY = "zeam-recommender:runs:result:{task}:{args_hash}"
+
+
+
+class DedupPolicy:
+    # Return immediately, with the last result when there is one
+    SKIP = "skip"
+    # Retry later (see RunInFlight) and return the result of the run in flight
+    JOIN = "join"
+    # Always run
+    FORCE = "force"
+
+
+DEDUP_POLICIES = [DedupPolicy.SKIP, DedupPolicy.JOIN, DedupPolicy.FORCE]
+
+
+class RunInFlight(Exception):
+    """
+    Raised under the join policy while an identical run is in flight; the
+    task retries after `countdown` seconds, up to `max_retries` times, and
+    then returns `result`.
+    """
+
+    def __init__(self, run_id: str, result: Dict[str, Any]):
+        super().__init__(f"Run {run_id} in flight")
+        self.run_id = run_id
+        self.result = result
+        self.countdown = settings.TASK_DEDUP_JOIN_RETRY_SECONDS
+        self.max_retries = max(1, -(-settings.TASK_DEDUP_JOIN_TIMEOUT_SECONDS // settings.TASK_DEDUP_JOIN_RETRY_SECONDS))
+
+
+def normalize_datetime(value: str) -> str:
+    """Canonical 'YYYY-MM-DD HH:MM:SS' form of a date or datetime string."""
+    return datetime.fromisoformat(value.strip()).strftime(DATETIME_FORMAT)
+
+
+def args_hash(args: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(args, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def _is_published(redis_key: str) -> bool:
+    with sync_client_context() as client:
+        return bool(client.exists(redis_key))
+
+
+def _last_result(key: str) -> Optional[Dict[str, Any]]:
+    with sync_client_context(RedisRole.RESULTS) as client:
+        value = client.get(key)
+    return json.loads(value) if value else None
+
+
+def _store_result(key: str, result: Dict[str, Any]) -> None:
+    stored = {**result, "completed_at": time.time()}
+    with sync_client_context(RedisRole.RESULTS) as client:
+        client.set(key, json.dumps(stored, default=str), ex=settings.TASK_RESULT_TTL_SECONDS)
+
+
+def _reused(result: Optional[Dict[str, Any]], reason: str, **extra: Any) -> Dict[str, Any]:
+    reused = dict(result or {"status": "skipped"})
+    reused.update({"deduplicated": True, "reason": reason, **extra})
+    return reused
+
+
+def run_deduplicated(
+    task_name: str,
+    args: Dict[str, Any],
+    redis_key: str,
+    run: Callable[[], Dict[str, Any]],
+    run_id: Optional[str] = None,
+    policy: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run `run()` unless an identical run is in flight or completed recently,
+    with its result still published in `redis_key`.
+
+    Args:
+        task_name: Task name, part of the run identity
+        args: Normalised task arguments, part of the run identity
+        redis_key: Key the run publishes to; a fresh result is only reused while it exists
+        run: Computes and publishes the result
+        run_id: ID of this run, stored in the in-flight marker
+        policy: One of DEDUP_POLICIES (default TASK_DEDUP_POLICY)
+
+    Raises:
+        RunInFlight: Under the join policy, while an identical run is in flight
+    """
+    policy = policy or settings.TASK_DEDUP_POLICY
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"Unknown dedup policy '{policy}'. Available policies: {DEDUP_POLICIES}")
+
+    identity = args_hash(args)
+    inflight_key = INFLIGHT_KEY.format(task=task_name, args_hash=identity)
+    result_key = RESULT_KEY.format(task=task_name, args_hash=identity)
+    holder = run_id or f"run-{time.time_ns()}"
+
+    if policy != DedupPolicy.FORCE:
+        # Only a run with the same identity counts: other arguments (e.g. a
+        # larger item_count) publishing the same key don't make this one fresh
+        last = _last_result(result_key)
+        completed_at = (last or {}).get("completed_at")
+        if completed_at is not None and time.time() - completed_at < settings.TASK_DEDUP_FRESH_SECONDS and _is_published(redis_key):
+            logger.info(f"Skipping {task_name} {args}: identical run {last.get('run_id')} completed {time.time() - completed_at:.0f}s ago")
+            return _reused(last, "fresh")
+
+    existing = acquire_marker(inflight_key, holder, settings.TASK_INFLIGHT_TTL_SECONDS, RedisRole.RESULTS)
+    if existing is not None and policy != DedupPolicy.FORCE:
+        if policy == DedupPolicy.SKIP:
+            logger.info(f"Skipping {task_name} {args}: run {existing} in flight")
+            return _reused(_last_result(result_key), "in_flight", in_flight_run_id=existing)
+
+        logger.info(f"Joining run {existing} of {task_name} {args}")
+        raise RunInFlight(existing, _reused(_last_result(result_key), "join_timeout", in_flight_run_id=existing))
+
+    try:
+        result = run()
+        _store_result(result_key, result)
+        return result
+    finally:
+        release_marker(inflight_key, holder, RedisRole.RESULTS)
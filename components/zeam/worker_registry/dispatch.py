@@ -0,0 +1,110 @@
+"""
+Helpers for triggering many tasks at once and reading their states back.
+"""
+import json
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from zeam.redis_client import RedisRole, async_client_context
+from zeam.worker_registry.windows import DATETIME_FORMAT
+
+# Celery's Redis result backend key of a task's state, under the worker's
+# result_backend_transport_options global_keyprefix
+TASK_META_KEY = "zeam-recommender:celery-task-meta-{task_id}"
+# Task IDs of a bulk dispatch, kept as long as Celery keeps their results
+GROUP_KEY = "zeam-recommender:groups:{group_id}"
+GROUP_TTL_SECONDS = 86400
+
+MAX_BULK_TASKS = 1000
+
+
+def expand_job_args(
+    args: Dict[str, Any],
+    dma_ids: Optional[List[Optional[int]]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    window_days: int = 7,
+    max_tasks: int = MAX_BULK_TASKS,
+) -> List[Dict[str, Any]]:
+    """
+    Expand one bulk request into the keyword arguments of every task: DMAs × date windows.
+
+    Args:
+        args: Arguments shared by every task
+        dma_ids: DMAs to run for, None meaning global (default: args unchanged)
+        start_date: First day (YYYY-MM-DD) of the range split into windows
+        end_date: Last day (YYYY-MM-DD) of the range
+        window_days: Length of each window in days
+        max_tasks: Largest number of tasks the request may expand to
+    """
+    windows: List[Dict[str, Any]] = [{}]
+    if start_date or end_date:
+        if not (start_date and end_date):
+            raise ValueError("start_date and end_date must be given together")
+        if window_days < 1:
+            raise ValueError("window_days must be at least 1")
+        first, last = date.fromisoformat(start_date[:10]), date.fromisoformat(end_date[:10])
+        if last < first:
+            raise ValueError("end_date is before start_date")
+        windows = []
+        day = first
+        while day <= last:
+            window_end = min(day + timedelta(days=window_days - 1), last)
+            windows.append({
+                "start_date": day.strftime(DATETIME_FORMAT),
+                "end_date": (window_end.strftime("%Y-%m-%d") + " 23:59:59"),
+            })
+            day = window_end + timedelta(days=1)
+
+    segments: List[Dict[str, Any]] = [{}] if dma_ids is None else [{"dma_id": dma_id} for dma_id in dma_ids]
+
+    if len(windows) * len(segments) > max_tasks:
+        raise ValueError(f"Bulk request expands to {len(windows) * len(segments)} tasks, more than {max_tasks}")
+
+    return [{**args, **window, **segment} for window in windows for segment in segments]
+
+
+def _task_state(task_id: str, meta: Optional[str]) -> Dict[str, Any]:
+    if not meta:
+        # Unknown to the backend: queued, not started yet, or expired
+        return {"task_id": task_id, "status": "PENDING"}
+    meta = json.loads(meta)
+    state = {"task_id": task_id, "status": meta.get("status"), "date_done": meta.get("date_done")}
+    if meta.get("status") == "SUCCESS":
+        state["result"] = meta.get("result")
+    elif meta.get("status") == "FAILURE":
+        result = meta.get("result") or {}
+        state["error"] = result.get("exc_message") if isinstance(result, dict) else str(result)
+    return state
+
+
+async def get_task_states(task_ids: List[str]) -> List[Dict[str, Any]]:
+    """States of many tasks from the result backend in one round trip."""
+    if not task_ids:
+        return []
+    async with async_client_context(RedisRole.RESULTS) as client:
+        metas = await client.mget([TASK_META_KEY.format(task_id=task_id) for task_id in task_ids])
+    return [_task_state(task_id, meta) for task_id, meta in zip(task_ids, metas)]
+
+
+async def record_group(group_id: str, task_ids: List[str]) -> None:
+    """Remember the tasks of a bulk dispatch."""
+    key = GROUP_KEY.format(group_id=group_id)
+    async with async_client_context(RedisRole.RESULTS) as client:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.delete(key)
+            pipe.rpush(key, *task_ids)
+            pipe.expire(key, GROUP_TTL_SECONDS)
+            await pipe.execute()
+
+
+async def get_group_task_ids(group_id: str) -> List[str]:
+    async with async_client_context(RedisRole.RESULTS) as client:
+        return await client.lrange(GROUP_KEY.format(group_id=group_id), 0, -1)
+
+
+def summarize_states(states: List[Dict[str, Any]]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for state in states:
+        counts[state["status"]] = counts.get(state["status"], 0) + 1
+    return counts
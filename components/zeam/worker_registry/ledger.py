@@ -0,0 +1,122 @@
+"""
+Compact ledger of task runs.
+
+One capped Redis stream entry per run (task, run id, args hash, duration,
+rows, status) replaces the extended Celery results as the record of what
+ran, so Redis memory stays bounded whatever the number of runs.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from zeam.config.core import settings
+from zeam.redis_client import RedisRole, async_client_context, sync_client_context
+from zeam.worker_registry.dedup import args_hash
+
+logger = logging.getLogger(__name__)
+
+LEDGER_KEY = "zeam-recommender:runs:ledger"
+ERROR_MAX_LENGTH = 200
+
+# Start times of the tasks running in this process, by task id
+_started: Dict[str, float] = {}
+_started_lock = threading.Lock()
+
+
+def record_run(
+    task_name: str,
+    run_id: Optional[str],
+    args: Dict[str, Any],
+    duration_seconds: float,
+    status: str,
+    rows_count: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    """Append a run to the ledger, trimming it to about RUN_LEDGER_MAX_ENTRIES entries."""
+    entry = {
+        "task": task_name,
+        "run_id": run_id or "",
+        "args_hash": args_hash(args),
+        "duration_ms": int(duration_seconds * 1000),
+        "status": status,
+    }
+    if rows_count is not None:
+        entry["rows"] = rows_count
+    if error:
+        entry["error"] = error[:ERROR_MAX_LENGTH]
+
+    with sync_client_context(RedisRole.RESULTS) as client:
+        client.xadd(LEDGER_KEY, entry, maxlen=settings.RUN_LEDGER_MAX_ENTRIES, approximate=True)
+
+
+def mark_run_started(task_id: Optional[str] = None, **kwargs: Any) -> None:
+    """`task_prerun` handler remembering when a task started."""
+    if task_id is not None:
+        with _started_lock:
+            _started[task_id] = time.monotonic()
+
+
+def record_finished_run(
+    task_id: Optional[str] = None,
+    task: Any = None,
+    kwargs: Optional[Dict[str, Any]] = None,
+    retval: Any = None,
+    state: Optional[str] = None,
+    **extra: Any,
+) -> None:
+    """`task_postrun` handler appending the finished run to the ledger."""
+    with _started_lock:
+        started = _started.pop(task_id, None)
+    if task is None or started is None:
+        return
+
+    rows_count = None
+    error = None
+    if isinstance(retval, dict):
+        rows_count = retval.get("rows_count")
+    elif isinstance(retval, BaseException):
+        error = f"{type(retval).__name__}: {retval}"
+
+    try:
+        record_run(
+            task.name,
+            task_id,
+            kwargs or {},
+            time.monotonic() - started,
+            (state or "UNKNOWN").lower(),
+            rows_count,
+            error,
+        )
+    except Exception as e:
+        logger.warning(f"Could not record run {task_id} of {task.name}: {e}")
+
+
+def _parse_entry(entry_id: str, fields: Dict[str, str]) -> Dict[str, Any]:
+    run = {
+        "finished_at": int(entry_id.split("-")[0]) / 1000,
+        "task": fields.get("task"),
+        "run_id": fields.get("run_id") or None,
+        "args_hash": fields.get("args_hash"),
+        "duration_ms": int(fields.get("duration_ms", 0)),
+        "status": fields.get("status"),
+        "rows": int(fields["rows"]) if "rows" in fields else None,
+    }
+    if "error" in fields:
+        run["error"] = fields["error"]
+    return run
+
+
+async def get_runs(count: int = 100, task: Optional[str] = None, status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Most recent runs first, optionally filtered by task name and status.
+    Filters apply to the last `count` runs of the ledger.
+    """
+    async with async_client_context(RedisRole.RESULTS) as client:
+        entries = await client.xrevrange(LEDGER_KEY, count=count)
+
+    runs = [_parse_entry(entry_id, fields) for entry_id, fields in entries]
+    return [
+        run for run in runs
+        if (task is None or run["task"] == task) and (status is None or run["status"] == status)
+    ]
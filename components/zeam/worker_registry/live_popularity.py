@@ -0,0 +1,267 @@
+"""
+Near-real-time popularity from playback events.
+
+Each event adds exp(lambda * (t - landmark)) to its content's score in the
+DMA and global sorted sets (forward decay): stored scores never have to be
+decayed, and ranking by them at any moment is ranking by views weighted
+exp(-lambda * age). The landmark moves every LIVE_GENERATION_SECONDS, to a
+new set of keys, so increments stay far from float overflow; readers merge
+the previous generation scaled to the current landmark. Distinct viewers of
+each item are counted with HyperLogLog, and every view is added to the
+device's "already watched" filter (see `zeam.worker_registry.seen`).
+
+Events come in through the API in batches, or from a Redis stream read by
+a consumer group (`consume_events`); either way one batch is one pipeline.
+"""
+import logging
+import math
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from redis.exceptions import ResponseError
+
+from zeam.config.core import settings
+from zeam.redis_client import RedisRole, async_client_context, sync_client_context
+from zeam.worker_registry.content_popularity import CONTENT_TYPES, get_segment_suffix
+from zeam.worker_registry.seen import queue_seen, seen_item
+
+logger = logging.getLogger(__name__)
+
+EVENTS_STREAM_KEY = "zeam-recommender:live:events"
+CONSUMER_GROUP = "live-ingest"
+TITLES_KEY = "zeam-recommender:live:titles"
+# Candidates read from each generation per item returned
+OVERFETCH = 2
+
+
+def decay_rate() -> float:
+    return math.log(2) / settings.LIVE_HALF_LIFE_SECONDS
+
+
+def generation_of(timestamp: float) -> int:
+    return int(timestamp // settings.LIVE_GENERATION_SECONDS)
+
+
+def forward_decayed_weight(timestamp: float, generation: int, weight: float = 1.0) -> float:
+    """Score increment of a view at `timestamp`, relative to the landmark of `generation`."""
+    landmark = generation * settings.LIVE_GENERATION_SECONDS
+    return weight * math.exp(decay_rate() * (timestamp - landmark))
+
+
+def get_live_scores_key(content_type: str, generation: int, dma_id: Optional[int] = None) -> str:
+    """
+    Sorted set of the decayed views of one content type and segment.
+    The segment is hash-tagged so that its scores and viewer counts share a cluster slot.
+    """
+    return f"zeam-recommender:live:{{{get_segment_suffix(dma_id)}}}:{content_type}:{generation}"
+
+
+def get_live_viewers_key(content_type: str, generation: int, content_id: str, dma_id: Optional[int] = None) -> str:
+    return f"{get_live_scores_key(content_type, generation, dma_id)}:viewers:{content_id}"
+
+
+def queue_events(pipe: Any, events: Iterable[Dict[str, Any]], now: Optional[float] = None) -> int:
+    """
+    Queue the writes of a batch of playback events on a non-transactional
+    pipeline; returns the number of events accepted. Events of an unknown
+    content type, older than the previous generation or with a non-finite
+    timestamp or weight are dropped; future timestamps count as now and
+    weights are capped at LIVE_MAX_EVENT_WEIGHT.
+    """
+    now = now if now is not None else time.time()
+    oldest_generation = generation_of(now) - 1
+    expiring: Dict[str, int] = {}
+    titles: Dict[str, str] = {}
+    views: List[Tuple[str, str, float]] = []
+    accepted = 0
+
+    for event in events:
+        content_type = event.get("content_type")
+        content_id = event.get("content_id")
+        if content_type not in CONTENT_TYPES or not content_id:
+            continue
+        timestamp = min(float(event.get("timestamp") or now), now)
+        weight = float(event.get("weight") or 1.0)
+        # Stream events skip the API's validation: NaN would fail and infinity pin an item on top
+        if not (math.isfinite(timestamp) and math.isfinite(weight)):
+            continue
+        generation = generation_of(timestamp)
+        if generation < oldest_generation:
+            continue
+
+        increment = forward_decayed_weight(timestamp, generation, min(max(weight, 0.0), settings.LIVE_MAX_EVENT_WEIGHT))
+        device_id = event.get("device_id")
+        for dma_id in {event.get("dma_id") or None, None}:
+            scores_key = get_live_scores_key(content_type, generation, dma_id)
+            pipe.zincrby(scores_key, increment, content_id)
+            expiring[scores_key] = generation
+            if device_id:
+                viewers_key = get_live_viewers_key(content_type, generation, content_id, dma_id)
+                pipe.pfadd(viewers_key, device_id)
+                expiring[viewers_key] = generation
+        if device_id:
+            views.append((device_id, seen_item(content_type, content_id), timestamp))
+        if event.get("title"):
+            titles[f"{content_type}:{content_id}"] = event["title"]
+        accepted += 1
+
+    # Keys of a generation live until the end of the next one, when readers stop merging them
+    for key, generation in expiring.items():
+        pipe.expireat(key, (generation + 2) * settings.LIVE_GENERATION_SECONDS)
+    if titles:
+        pipe.hset(TITLES_KEY, mapping=titles)
+        pipe.expire(TITLES_KEY, 2 * settings.LIVE_GENERATION_SECONDS)
+    queue_seen(pipe, views)
+    return accepted
+
+
+def ingest_events(events: List[Dict[str, Any]], now: Optional[float] = None) -> int:
+    """Apply a batch of playback events in one round trip; returns the number accepted."""
+    with sync_client_context() as client:
+        pipe = client.pipeline(transaction=False)
+        accepted = queue_events(pipe, events, now)
+        pipe.execute()
+    return accepted
+
+
+async def ingest_events_async(events: List[Dict[str, Any]], now: Optional[float] = None) -> int:
+    async with async_client_context() as client:
+        pipe = client.pipeline(transaction=False)
+        accepted = queue_events(pipe, events, now)
+        await pipe.execute()
+    return accepted
+
+
+def _merge_generations(current: List[Tuple[str, float]], previous: List[Tuple[str, float]], limit: int) -> List[Tuple[str, float]]:
+    carry = math.exp(-decay_rate() * settings.LIVE_GENERATION_SECONDS)
+    scores: Dict[str, float] = defaultdict(float)
+    for content_id, score in current:
+        scores[content_id] += score
+    for content_id, score in previous:
+        scores[content_id] += score * carry
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+async def get_live_rankings(
+    content_types: List[str],
+    dma_id: Optional[int] = None,
+    limit: int = 10,
+    now: Optional[float] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Top `limit` items of each content type by decayed views in the DMA, or
+    globally when the DMA has none, with their titles and distinct viewers
+    since the start of the previous generation. Two round trips: rankings,
+    then titles and viewer counts. Each generation contributes its top
+    OVERFETCH * limit items, so an item far down both lists can be missed.
+    """
+    now = now if now is not None else time.time()
+    generation = generation_of(now)
+    segments = [dma_id, None] if dma_id else [None]
+
+    async with async_client_context(RedisRole.REPLICA) as client:
+        pipe = client.pipeline(transaction=False)
+        for content_type in content_types:
+            for segment in segments:
+                for scores_generation in (generation, generation - 1):
+                    pipe.zrevrange(get_live_scores_key(content_type, scores_generation, segment), 0, OVERFETCH * limit - 1, withscores=True)
+        ranges = iter(await pipe.execute())
+
+        picked: Dict[str, Tuple[Optional[int], List[Tuple[str, float]]]] = {}
+        for content_type in content_types:
+            merged = [(segment, _merge_generations(next(ranges), next(ranges), limit)) for segment in segments]
+            picked[content_type] = next(((segment, top) for segment, top in merged if top), (None, []))
+
+        pipe = client.pipeline(transaction=False)
+        for content_type, (segment, top) in picked.items():
+            for content_id, _ in top:
+                pipe.hget(TITLES_KEY, f"{content_type}:{content_id}")
+                pipe.pfcount(
+                    get_live_viewers_key(content_type, generation, content_id, segment),
+                    get_live_viewers_key(content_type, generation - 1, content_id, segment),
+                )
+        details = iter(await pipe.execute())
+
+    # Stored scores are relative to the landmark; report them as of now
+    to_now = math.exp(-decay_rate() * (now - generation * settings.LIVE_GENERATION_SECONDS))
+    rankings = {}
+    for content_type, (_, top) in picked.items():
+        rankings[content_type] = [
+            {
+                "id": content_id,
+                "title": next(details) or content_id,
+                "type": content_type,
+                "score": round(score * to_now, 3),
+                "viewers": next(details),
+            }
+            for content_id, score in top
+        ]
+    return rankings
+
+
+def _stream_fields(event: Dict[str, Any]) -> Dict[str, str]:
+    return {name: str(value) for name, value in event.items() if value is not None}
+
+
+def _parse_stream_fields(fields: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    event: Dict[str, Any] = dict(fields or {})
+    if event.get("dma_id"):
+        event["dma_id"] = int(event["dma_id"])
+    for name in ("timestamp", "weight"):
+        if event.get(name):
+            event[name] = float(event[name])
+    return event
+
+
+def append_events(events: List[Dict[str, Any]]) -> None:
+    """Add playback events to the ingest stream, trimmed to about LIVE_STREAM_MAX_ENTRIES entries."""
+    with sync_client_context() as client:
+        pipe = client.pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(EVENTS_STREAM_KEY, _stream_fields(event), maxlen=settings.LIVE_STREAM_MAX_ENTRIES, approximate=True)
+        pipe.execute()
+
+
+def _ensure_group(client: Any) -> None:
+    try:
+        client.xgroup_create(EVENTS_STREAM_KEY, CONSUMER_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def consume_events(consumer: str, max_reads: Optional[int] = None) -> int:
+    """
+    Ingest events from the stream as `consumer` of the CONSUMER_GROUP group,
+    up to LIVE_MAX_BATCH per read, acknowledging each batch in the round trip
+    that applies it. Entries this consumer left unacknowledged (e.g. in a
+    crash) are ingested first. Runs for `max_reads` reads, or forever;
+    returns the number of events accepted.
+    """
+    accepted = 0
+    reads = 0
+    with sync_client_context() as client:
+        _ensure_group(client)
+        stream_id = "0"
+        while max_reads is None or reads < max_reads:
+            response = client.xreadgroup(
+                CONSUMER_GROUP,
+                consumer,
+                {EVENTS_STREAM_KEY: stream_id},
+                count=settings.LIVE_MAX_BATCH,
+                block=settings.LIVE_STREAM_BLOCK_MS,
+            )
+            reads += 1
+            entries = response[0][1] if response else []
+            if not entries:
+                # Nothing left pending: wait for new entries
+                stream_id = ">"
+                continue
+
+            pipe = client.pipeline(transaction=False)
+            accepted += queue_events(pipe, [_parse_stream_fields(fields) for _, fields in entries])
+            pipe.xack(EVENTS_STREAM_KEY, CONSUMER_GROUP, *[entry_id for entry_id, _ in entries])
+            pipe.execute()
+            logger.debug(f"Ingested {len(entries)} stream events")
+    return accepted
@@ -0,0 +1,162 @@
+"""
+Task queues, routing and queue metrics.
+
+Interactive triggers, scheduled refreshes and backfills run on separate
+queues so that each can get its own worker pool, and a manual run never waits
+behind an hour-long sweep. Shared by the Worker, Beat and the API.
+"""
+import logging
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from zeam.config.core import settings
+from zeam.redis_client import RedisRole, async_client_context, sync_client_context
+from zeam.worker_registry.core import WorkerNames
+
+logger = logging.getLogger(__name__)
+
+
+class QueueNames:
+    INTERACTIVE = "interactive"
+    SCHEDULED = "scheduled"
+    BACKFILL = "backfill"
+
+
+QUEUE_NAMES = [
+    QueueNames.INTERACTIVE,
+    QueueNames.SCHEDULED,
+    QueueNames.BACKFILL,
+]
+
+# Default queue of each task when the caller doesn't choose one
+TASK_QUEUES: Dict[str, str] = {
+    WorkerNames.CURATED_CONTENT_POPULARITY: QueueNames.SCHEDULED,
+    WorkerNames.CONTENT_POPULARITY: QueueNames.SCHEDULED,
+    WorkerNames.CURATED_CONTENT_POPULARITY_BATCH: QueueNames.SCHEDULED,
+    WorkerNames.REFRESH_CURRENT_WEEK: QueueNames.SCHEDULED,
+    WorkerNames.CURATED_CONTENT_BACKFILL: QueueNames.BACKFILL,
+    WorkerNames.TRENDING: QueueNames.SCHEDULED,
+    WorkerNames.CONTENT_POPULARITY_CUBE: QueueNames.SCHEDULED,
+}
+
+# Message priority per queue. The Redis transport treats 0 as the highest priority.
+QUEUE_PRIORITIES: Dict[str, int] = {
+    QueueNames.INTERACTIVE: 0,
+    QueueNames.SCHEDULED: 5,
+    QueueNames.BACKFILL: 9,
+}
+
+QUEUE_CONCURRENCY: Dict[str, int] = {
+    QueueNames.INTERACTIVE: settings.WORKER_CONCURRENCY_INTERACTIVE,
+    QueueNames.SCHEDULED: settings.WORKER_CONCURRENCY_SCHEDULED,
+    QueueNames.BACKFILL: settings.WORKER_CONCURRENCY_BACKFILL,
+}
+
+PRIORITY_STEPS = list(range(10))
+PRIORITY_SEPARATOR = ":"
+
+WAIT_TIME_KEY = "zeam-recommender:queues:wait:{queue}"
+WAIT_TIME_SAMPLES = 1000
+
+
+def get_celery_queue_config() -> Dict[str, Any]:
+    """
+    Celery settings for queues, routing and priorities, shared by every app
+    that sends or consumes tasks.
+    """
+    from kombu import Queue
+
+    return {
+        "task_queues": [Queue(name, routing_key=name) for name in QUEUE_NAMES],
+        "task_default_queue": QueueNames.SCHEDULED,
+        "task_default_priority": QUEUE_PRIORITIES[QueueNames.SCHEDULED],
+        "task_routes": {name: {"queue": queue} for name, queue in TASK_QUEUES.items()},
+        "broker_transport_options": {
+            "priority_steps": PRIORITY_STEPS,
+            "sep": PRIORITY_SEPARATOR,
+            "queue_order_strategy": "priority",
+        },
+    }
+
+
+def get_send_options(worker_name: str, queue: Optional[str] = None) -> Dict[str, Any]:
+    """Queue and priority for sending `worker_name`, defaulting to its routed queue."""
+    queue = queue or TASK_QUEUES.get(worker_name, QueueNames.SCHEDULED)
+    if queue not in QUEUE_NAMES:
+        raise ValueError(f"Unknown queue '{queue}'. Available queues: {QUEUE_NAMES}")
+    return {"queue": queue, "priority": QUEUE_PRIORITIES[queue]}
+
+
+def get_worker_concurrency(queues: List[str]) -> int:
+    """Pool size of a worker consuming `queues`: the sum of their configured concurrency."""
+    return sum(QUEUE_CONCURRENCY[queue] for queue in queues)
+
+
+def stamp_enqueued_at(headers: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+    """`before_task_publish` handler recording when a message was sent."""
+    if headers is not None:
+        headers.setdefault("enqueued_at", time.time())
+
+
+def record_wait_time(task: Any = None, **kwargs: Any) -> None:
+    """`task_prerun` handler storing how long the task waited in its queue."""
+    if task is None:
+        return
+    enqueued_at = getattr(task.request, "enqueued_at", None)
+    queue = (task.request.delivery_info or {}).get("routing_key")
+    if enqueued_at is None or queue not in QUEUE_NAMES:
+        return
+
+    wait_ms = max(0, int((time.time() - float(enqueued_at)) * 1000))
+    key = WAIT_TIME_KEY.format(queue=queue)
+    try:
+        with sync_client_context(RedisRole.BROKER) as client:
+            pipe = client.pipeline(transaction=False)
+            pipe.lpush(key, wait_ms)
+            pipe.ltrim(key, 0, WAIT_TIME_SAMPLES - 1)
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not record wait time for queue {queue}: {e}")
+
+
+def _priority_lists(queue: str) -> List[str]:
+    # Priority 0 uses the bare queue name, others "{queue}:{priority}"
+    return [queue] + [f"{queue}{PRIORITY_SEPARATOR}{step}" for step in PRIORITY_STEPS if step]
+
+
+def _wait_stats(samples: List[str]) -> Dict[str, Any]:
+    values = sorted(int(sample) for sample in samples)
+    if not values:
+        return {"samples": 0, "p50_ms": None, "p95_ms": None, "max_ms": None}
+    return {
+        "samples": len(values),
+        "p50_ms": int(statistics.median(values)),
+        "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+        "max_ms": values[-1],
+    }
+
+
+async def get_queue_report() -> Dict[str, Dict[str, Any]]:
+    """
+    Depth (messages waiting, all priorities) and recent wait-time statistics
+    of every queue, read in one pipelined round trip.
+    """
+    async with async_client_context(RedisRole.BROKER) as client:
+        pipe = client.pipeline(transaction=False)
+        for queue in QUEUE_NAMES:
+            for key in _priority_lists(queue):
+                pipe.llen(key)
+            pipe.lrange(WAIT_TIME_KEY.format(queue=queue), 0, -1)
+        results = await pipe.execute()
+
+    report = {}
+    width = len(PRIORITY_STEPS) + 1
+    for index, queue in enumerate(QUEUE_NAMES):
+        chunk = results[index * width:(index + 1) * width]
+        report[queue] = {
+            "depth": sum(chunk[:-1]),
+            "concurrency": QUEUE_CONCURRENCY[queue],
+            "wait_time": _wait_stats(chunk[-1]),
+        }
+    return report
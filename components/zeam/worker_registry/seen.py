@@ -0,0 +1,61 @@
+"""
+Per-device "already watched" filters.
+
+Each device gets one Bloom filter per SEEN_PERIOD_SECONDS, a fixed
+SEEN_FILTER_BITS / 8 bytes whatever it watches. Readers check the current
+and previous periods, so watched items are remembered for one to two
+periods and old history never saturates a filter. With the defaults, a
+device watching 200 items a week sees about 1% of unwatched items dropped
+as false positives.
+"""
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from zeam.config.core import settings
+from zeam.redis_client import BloomFilter, RedisRole, async_client_context
+
+seen_filter = BloomFilter(settings.SEEN_FILTER_BITS, settings.SEEN_FILTER_HASHES)
+
+
+def period_of(timestamp: float) -> int:
+    return int(timestamp // settings.SEEN_PERIOD_SECONDS)
+
+
+def get_seen_key(device_id: str, period: int) -> str:
+    """The device is hash-tagged so that both periods of its filter share a cluster slot."""
+    return f"zeam-recommender:seen:{{{device_id}}}:{period}"
+
+
+def seen_item(content_type: str, content_id: str) -> str:
+    return f"{content_type}:{content_id}"
+
+
+def queue_seen(pipe: Any, views: Iterable[Tuple[str, str, float]]) -> None:
+    """Queue marking (device_id, item, timestamp) views as watched, one write per device and period."""
+    items_by_key: Dict[Tuple[str, int], List[str]] = defaultdict(list)
+    for device_id, item, timestamp in views:
+        items_by_key[(device_id, period_of(timestamp))].append(item)
+
+    for (device_id, period), items in items_by_key.items():
+        key = get_seen_key(device_id, period)
+        seen_filter.queue_add(pipe, key, items)
+        pipe.expireat(key, (period + 2) * settings.SEEN_PERIOD_SECONDS)
+
+
+async def get_seen_bitmap(device_id: str, now: Optional[float] = None) -> bytes:
+    """Union of the device's current and previous filters, in one round trip."""
+    period = period_of(now if now is not None else time.time())
+    async with async_client_context(RedisRole.REPLICA) as client:
+        pipe = client.pipeline(transaction=False)
+        for seen_period in (period, period - 1):
+            seen_filter.queue_read(pipe, get_seen_key(device_id, seen_period))
+        current, previous = await pipe.execute()
+    return seen_filter.union(seen_filter.decode(current), seen_filter.decode(previous))
+
+
+def drop_seen(items: List[Dict[str, Any]], bitmap: bytes) -> List[Dict[str, Any]]:
+    """Items, shaped like the API's ContentItem, not in the device's filters."""
+    if not any(bitmap):
+        return items
+    return [item for item in items if not seen_filter.contains(bitmap, seen_item(item.get("type"), item.get("id")))]
@@ -0,0 +1,150 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from zeam.worker_registry.aliases import (
+    CURRENT_WEEK_ALIAS_KEY,
+    AliasCache,
+    AliasKind,
+    advance_current_week,
+    advance_current_weeks,
+    as_calendar_week,
+    get_refresh_jobs,
+    parse_segment,
+    resolve_current_week,
+)
+from zeam.worker_registry.content_popularity import run_content_popularity_task
+
+WEEK = ("2025-01-06 00:00:00", "2025-01-12 23:59:59")
+
+
+def test_calendar_weeks():
+    assert as_calendar_week(*WEEK) == WEEK
+    assert as_calendar_week("2025-01-06", "2025-01-12") == WEEK
+    assert as_calendar_week("2025-01-01 00:00:00", "2025-01-07 23:59:59") is None
+    assert as_calendar_week("2025-01-06", "2025-01-19") is None
+
+
+def test_parse_segment():
+    assert parse_segment("global") == (None, None)
+    assert parse_segment("501") == (501, None)
+    assert parse_segment("501:p3") == (501, 3)
+    assert parse_segment("global:p3") == (None, 3)
+
+
+@patch("zeam.worker_registry.aliases.advance_field")
+def test_published_calendar_week_advances_alias(mock_advance):
+    mock_advance.return_value = True
+
+    assert advance_current_week(AliasKind.POPULARITY, "501:p3", "2025-01-06", "2025-01-12")
+    mock_advance.assert_called_once_with(CURRENT_WEEK_ALIAS_KEY, "popularity:501:p3", "2025-01-06 00:00:00|2025-01-12 23:59:59")
+
+    mock_advance.reset_mock()
+    assert not advance_current_week(AliasKind.CURATED, "501", "2025-01-01", "2025-01-07")
+    mock_advance.assert_not_called()
+
+
+@patch("zeam.worker_registry.aliases.advance_field")
+def test_alias_failure_does_not_fail_the_run(mock_advance):
+    mock_advance.side_effect = ConnectionError("redis down")
+    assert not advance_current_week(AliasKind.CURATED, "global", *WEEK)
+
+
+@patch("zeam.worker_registry.content_popularity.advance_current_week")
+@patch("zeam.worker_registry.content_popularity.publish_json")
+@patch("zeam.worker_registry.content_popularity.get_results")
+def test_content_popularity_run_advances_its_segment(mock_get_results, mock_publish_json, mock_advance):
+    mock_get_results.return_value = [{"content_type": "show", "content_id": 1, "title": "S", "viewers": 1, "sessions": 1, "duration_minutes": 1.0}]
+
+    run_content_popularity_task(*WEEK, dma_id=501, client_platform_id=3)
+
+    mock_advance.assert_called_once_with(AliasKind.POPULARITY, "501:p3", *WEEK)
+
+
+@patch("zeam.worker_registry.aliases.sync_client_context")
+def test_refresh_jobs_cover_recent_aliases(mock_context):
+    client = MagicMock()
+    client.hgetall.return_value = {
+        "popularity:501:p3": "2025-01-06 00:00:00|2025-01-12 23:59:59",
+        "curated:global": "2025-01-13 00:00:00|2025-01-19 23:59:59",
+        # Not computed for weeks, left to lapse
+        "curated:777": "2024-11-04 00:00:00|2024-11-10 23:59:59",
+    }
+    mock_context.return_value.__enter__.return_value = client
+
+    jobs = get_refresh_jobs(datetime(2025, 1, 13, 0, 0, 5))
+
+    new_week = {"start_date": "2025-01-13 00:00:00", "end_date": "2025-01-19 23:59:59"}
+    assert jobs == [
+        ("workers.curated_content_popularity", {**new_week, "dma_id": None}),
+        ("workers.content_popularity", {**new_week, "dma_id": 501, "client_platform_id": 3}),
+    ]
+
+
+@patch("zeam.worker_registry.aliases.sync_client_context")
+def test_cube_alias_replaces_single_segment_popularity_runs(mock_context):
+    client = MagicMock()
+    client.hgetall.return_value = {
+        "popularity-cube:all": "2025-01-06 00:00:00|2025-01-12 23:59:59",
+        "popularity:501:p3": "2025-01-06 00:00:00|2025-01-12 23:59:59",
+        "popularity:global": "2025-01-06 00:00:00|2025-01-12 23:59:59",
+        "curated:501": "2025-01-06 00:00:00|2025-01-12 23:59:59",
+    }
+    mock_context.return_value.__enter__.return_value = client
+
+    jobs = get_refresh_jobs(datetime(2025, 1, 13, 0, 0, 5))
+
+    new_week = {"start_date": "2025-01-13 00:00:00", "end_date": "2025-01-19 23:59:59"}
+    assert jobs == [
+        ("workers.curated_content_popularity", {**new_week, "dma_id": 501}),
+        ("workers.content_popularity_cube", new_week),
+    ]
+
+
+@patch("zeam.worker_registry.aliases.advance_fields")
+def test_many_segments_advance_in_one_call(mock_advance_fields):
+    mock_advance_fields.return_value = 2
+
+    assert advance_current_weeks(AliasKind.POPULARITY, ["501:p3", "global"], *WEEK) == 2
+    mock_advance_fields.assert_called_once_with(
+        CURRENT_WEEK_ALIAS_KEY, ["popularity:501:p3", "popularity:global"], "2025-01-06 00:00:00|2025-01-12 23:59:59"
+    )
+
+    mock_advance_fields.reset_mock()
+    assert advance_current_weeks(AliasKind.POPULARITY, ["501"], "2025-01-01", "2025-01-07") == 0
+    mock_advance_fields.assert_not_called()
+
+
+def test_alias_cache_reads_at_most_once_per_ttl():
+    client = MagicMock()
+    client.hgetall = AsyncMock(return_value={"curated:501": "|".join(WEEK)})
+
+    @asynccontextmanager
+    async def context(role=None):
+        yield client
+
+    cache = AliasCache(ttl_seconds=60)
+    with patch("zeam.worker_registry.aliases.async_client_context", context):
+        first = asyncio.run(cache.get())
+        second = asyncio.run(cache.get())
+
+    assert first == second == {"curated:501": WEEK}
+    assert client.hgetall.await_count == 1
+    assert resolve_current_week(first, AliasKind.CURATED, "501") == WEEK
+
+
+def test_alias_cache_keeps_copy_when_redis_fails():
+    client = MagicMock()
+    client.hgetall = AsyncMock(side_effect=[{"curated:501": "|".join(WEEK)}, ConnectionError("redis down")])
+
+    @asynccontextmanager
+    async def context(role=None):
+        yield client
+
+    cache = AliasCache(ttl_seconds=0)
+    with patch("zeam.worker_registry.aliases.async_client_context", context):
+        asyncio.run(cache.get())
+        aliases = asyncio.run(cache.get())
+
+    assert aliases == {"curated:501": WEEK}
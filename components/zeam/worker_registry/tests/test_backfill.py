@@ -0,0 +1,182 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from zeam.worker_registry.backfill import (
+    BackfillStatus,
+    _lease_seconds,
+    _parse_state,
+    expand_chunks,
+    next_concurrency,
+    run_backfill_slice,
+)
+
+SPEC = {
+    "start_date": "2025-01-01",
+    "end_date": "2025-01-28",
+    "dma_ids": [501, 502],
+    "window_days": 7,
+    "item_count": 10,
+    "max_concurrency": 4,
+}
+
+
+def make_state(**fields):
+    state = {
+        "status": "queued",
+        "spec": json.dumps(SPEC),
+        "total": "8",
+        "cursor": "0",
+        "failed": "0",
+        "rows": "0",
+        "active_seconds": "0",
+        "concurrency": "2",
+    }
+    state.update({name: str(value) for name, value in fields.items()})
+    return state
+
+
+@pytest.fixture
+def redis_client():
+    with patch("zeam.worker_registry.backfill.sync_client_context") as mock_context, \
+            patch("zeam.worker_registry.backfill.acquire_marker", return_value=None), \
+            patch("zeam.worker_registry.backfill.release_marker") as mock_release, \
+            patch("zeam.worker_registry.backfill.renew_marker", return_value=True) as mock_renew:
+        client = MagicMock()
+        client.hget.return_value = None
+        mock_context.return_value.__enter__.return_value = client
+        client.release = mock_release
+        client.renew = mock_renew
+        yield client
+
+
+def checkpoints(client):
+    pipe = client.pipeline.return_value
+    return [call[1]["mapping"] for call in pipe.hset.call_args_list if call[0][0].endswith("}")]
+
+
+def test_chunks_expand_past_bulk_limit():
+    spec = dict(SPEC, start_date="2024-01-01", end_date="2024-12-31", window_days=1, dma_ids=list(range(1, 11)))
+
+    chunks = expand_chunks(spec)
+
+    assert len(chunks) == 3660
+    assert chunks[0] == {"item_count": 10, "start_date": "2024-01-01 00:00:00", "end_date": "2024-01-01 23:59:59", "dma_id": 1}
+
+
+def test_concurrency_halves_on_congestion_and_grows_back():
+    assert next_concurrency(4, 120.0, 4) == 2
+    assert next_concurrency(1, 120.0, 4) == 1
+    assert next_concurrency(2, 0.0, 4) == 3
+    assert next_concurrency(4, 0.0, 4) == 4
+
+
+def test_status_reports_throughput_and_eta():
+    status = _parse_state("b1", make_state(status="running", cursor=4, active_seconds=20))
+
+    assert status["progress"] == 0.5
+    assert status["chunks_per_second"] == 0.2
+    assert status["eta_seconds"] == 20
+    assert _parse_state("b1", make_state(status="stopped", cursor=4, active_seconds=20))["eta_seconds"] is None
+
+
+@patch("zeam.worker_registry.backfill.get_queue_wait_seconds", return_value=0.0)
+@patch("zeam.worker_registry.backfill.run_curated_content_batch")
+def test_slice_runs_waves_and_checkpoints(mock_batch, mock_queue, redis_client):
+    redis_client.hgetall.return_value = make_state()
+
+    def batch(jobs, concurrency, run_id, statement_timeout_ms, on_progress=None):
+        results = [{"status": "success", "args": job, "rows_count": 10} for job in jobs]
+        results[0] = {"status": "failed", "args": jobs[0], "error": "warehouse error"}
+        for job_result in results:
+            on_progress(job_result)
+        return {"failed": 1, "rows_count": 10 * (len(jobs) - 1), "results": results}
+
+    mock_batch.side_effect = batch
+
+    result = run_backfill_slice("b1", "run-1")
+
+    assert result["status"] == BackfillStatus.COMPLETED
+    assert result["continue"] is False
+    # Waves of 2 chunks per concurrent query, concurrency growing from 2 to 3
+    assert [len(call[0][0]) for call in mock_batch.call_args_list] == [6, 2]
+    assert [call[0][1] for call in mock_batch.call_args_list] == [3, 4]
+    progress = [mapping for mapping in checkpoints(redis_client) if "cursor" in mapping]
+    assert [mapping["cursor"] for mapping in progress] == [6, 8]
+    assert progress[-1]["failed"] == 2
+    assert progress[-1]["rows"] == 60
+    assert checkpoints(redis_client)[-1]["status"] == BackfillStatus.COMPLETED
+    errors = [call[1]["mapping"] for call in redis_client.pipeline.return_value.hset.call_args_list if call[0][0].endswith(":errors")]
+    assert list(errors[0]) == [0] and list(errors[1]) == [6]
+    redis_client.release.assert_called_once()
+    # The lease is renewed as each chunk finishes, not only at checkpoints
+    assert redis_client.renew.call_count == 8
+
+
+def test_lease_outlives_a_wave_of_slow_queries():
+    assert _lease_seconds(3600 * 1000) == 7200
+    assert _lease_seconds(0) == 1200
+    assert _lease_seconds(1000) == 1200
+
+
+@patch("zeam.worker_registry.backfill.get_queue_wait_seconds", return_value=0.0)
+@patch("zeam.worker_registry.backfill.run_curated_content_batch")
+def test_slice_resumes_from_checkpoint(mock_batch, mock_queue, redis_client):
+    redis_client.hgetall.return_value = make_state(cursor=6, concurrency=4)
+    mock_batch.return_value = {"failed": 0, "rows_count": 20, "results": []}
+
+    run_backfill_slice("b1", "run-2")
+
+    jobs = mock_batch.call_args[0][0]
+    assert jobs == expand_chunks(SPEC)[6:]
+
+
+@patch("zeam.worker_registry.backfill.run_curated_content_batch")
+def test_slice_stops_when_requested(mock_batch, redis_client):
+    redis_client.hgetall.return_value = make_state(cursor=2)
+    redis_client.hget.return_value = "1"
+
+    result = run_backfill_slice("b1", "run-3")
+
+    assert result["status"] == BackfillStatus.STOPPED
+    assert result["continue"] is False
+    mock_batch.assert_not_called()
+
+
+@patch("zeam.worker_registry.backfill.time.sleep")
+@patch("zeam.worker_registry.backfill.get_queue_wait_seconds", side_effect=[120.0, 0.0])
+@patch("zeam.worker_registry.backfill.run_curated_content_batch")
+def test_slice_throttles_on_warehouse_queue(mock_batch, mock_queue, mock_sleep, redis_client):
+    redis_client.hgetall.return_value = make_state(concurrency=4, cursor=4)
+    mock_batch.return_value = {"failed": 0, "rows_count": 0, "results": []}
+
+    run_backfill_slice("b1", "run-4")
+
+    mock_sleep.assert_called_once()
+    # Halved to 2 while congested, then back up to 3
+    assert mock_batch.call_args[0][1] == 3
+
+
+@patch("zeam.worker_registry.backfill.get_queue_wait_seconds", return_value=0.0)
+@patch("zeam.worker_registry.backfill.run_curated_content_batch", side_effect=RuntimeError("boom"))
+def test_failed_slice_keeps_checkpoint(mock_batch, mock_queue, redis_client):
+    redis_client.hgetall.return_value = make_state(cursor=2)
+
+    with pytest.raises(RuntimeError):
+        run_backfill_slice("b1", "run-5")
+
+    last = checkpoints(redis_client)[-1]
+    assert last["status"] == BackfillStatus.FAILED
+    assert last["error"] == "RuntimeError: boom"
+    assert not any("cursor" in mapping for mapping in checkpoints(redis_client))
+    redis_client.release.assert_called_once()
+
+
+@patch("zeam.worker_registry.backfill.acquire_marker", return_value="run-1")
+@patch("zeam.worker_registry.backfill.run_curated_content_batch")
+def test_slice_skips_backfill_held_by_another_run(mock_batch, mock_acquire):
+    result = run_backfill_slice("b1", "run-6")
+
+    assert result["status"] == "skipped"
+    mock_batch.assert_not_called()
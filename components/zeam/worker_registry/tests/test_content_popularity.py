@@ -0,0 +1,112 @@
+from unittest.mock import MagicMock, patch
+
+from zeam.worker_registry.aliases import AliasKind
+from zeam.worker_registry.content_popularity import (
+    CONTENT_TYPES,
+    get_content_popularity_redis_key,
+    get_segment_fallbacks,
+    run_content_popularity_cube_task,
+    run_content_popularity_task,
+)
+
+
+def test_content_popularity_redis_key():
+    key = get_content_popularity_redis_key("show", "2025-01-01 00:00:00", "2025-01-07 23:59:59", 123, 4)
+    assert key == "zeam-recommender:popularity:show:{2025-01-01:2025-01-07}:123:p4"
+
+    key = get_content_popularity_redis_key("clip", "2025-01-01", "2025-01-07")
+    assert key == "zeam-recommender:popularity:clip:{2025-01-01:2025-01-07}:global"
+
+
+def test_segment_fallbacks_deduplicated():
+    assert get_segment_fallbacks(None, None) == [(None, None)]
+    assert get_segment_fallbacks(12, None) == [(12, None), (None, None)]
+
+
+@patch("zeam.worker_registry.content_popularity.publish_json")
+@patch("zeam.worker_registry.content_popularity.get_results")
+def test_run_content_popularity_task_publishes_every_type(mock_get_results, mock_publish_json):
+    mock_get_results.return_value = [
+        {"content_type": "show", "content_id": 10, "title": "Show", "viewers": 5, "sessions": 6, "duration_minutes": 7.5},
+        {"content_type": "vod", "content_id": 11, "title": "Movie", "viewers": 3, "sessions": 3, "duration_minutes": 90.0},
+    ]
+
+    result = run_content_popularity_task("2025-01-01 00:00:00", "2025-01-07 23:59:59", dma_id=5, item_count=3)
+
+    mock_get_results.assert_called_once_with("2025-01-01 00:00:00", "2025-01-07 23:59:59", 5, None, 3, statement_timeout_ms=None)
+    assert mock_publish_json.call_count == len(CONTENT_TYPES)
+    written = {call[0][0]: call[0][1] for call in mock_publish_json.call_args_list}
+    assert written["zeam-recommender:popularity:show:{2025-01-01:2025-01-07}:5"] == [
+        {"id": "10", "title": "Show", "type": "show", "viewers": 5, "sessions": 6, "duration_minutes": 7.5}
+    ]
+    assert written["zeam-recommender:popularity:channel:{2025-01-01:2025-01-07}:5"] == []
+    assert result["rows_by_type"]["vod"] == 1
+
+
+
+def _cube_row(dma_id, client_platform_id, content_type, content_id, viewers):
+    return {
+        "dma_rollup": int(dma_id is None), "platform_rollup": int(client_platform_id is None),
+        "dma_id": dma_id, "client_platform_id": client_platform_id, "content_type": content_type,
+        "content_id": content_id, "title": f"Title {content_id}", "viewers": viewers, "sessions": viewers,
+        "duration_minutes": 1.0, "popularity_rank": 1,
+    }
+
+
+@patch("zeam.worker_registry.content_popularity.advance_current_week")
+@patch("zeam.worker_registry.content_popularity.advance_current_weeks")
+@patch("zeam.worker_registry.content_popularity.get_published_popularity_keys")
+@patch("zeam.worker_registry.content_popularity.BatchPublisher")
+@patch("zeam.worker_registry.content_popularity.get_cube_results")
+def test_cube_publishes_every_segment_from_one_query(mock_get_cube_results, mock_publisher, mock_published_keys, mock_advance_many, mock_advance):
+    window = "{2025-01-06:2025-01-12}"
+    # Published by an earlier run: one list is refreshed, the others are now empty
+    mock_published_keys.return_value = {
+        f"zeam-recommender:popularity:show:{window}:501:p3",
+        f"zeam-recommender:popularity:vod:{window}:501:p3",
+        f"zeam-recommender:popularity:show:{window}:777",
+    }
+    mock_get_cube_results.return_value = [
+        _cube_row(501, 3, "show", 10, 40),
+        _cube_row(501, None, "show", 10, 50),
+        _cube_row(501, None, "vod", 11, 9),
+        _cube_row(None, 3, "show", 10, 60),
+        _cube_row(None, None, "show", 10, 70),
+    ]
+    publisher = MagicMock()
+    mock_publisher.return_value.__enter__.return_value = publisher
+
+    result = run_content_popularity_cube_task("2025-01-06 00:00:00", "2025-01-12 23:59:59", item_count=5, min_viewers=2)
+
+    mock_get_cube_results.assert_called_once_with("2025-01-06 00:00:00", "2025-01-12 23:59:59", 5, 2, statement_timeout_ms=None)
+    written = {call[0][0]: call[0][1] for call in publisher.publish.call_args_list}
+    assert [item["viewers"] for item in written[f"zeam-recommender:popularity:show:{window}:501:p3"]] == [40]
+    assert [item["viewers"] for item in written[f"zeam-recommender:popularity:show:{window}:501"]] == [50]
+    assert [item["id"] for item in written[f"zeam-recommender:popularity:vod:{window}:501"]] == ["11"]
+    assert [item["viewers"] for item in written[f"zeam-recommender:popularity:show:{window}:global:p3"]] == [60]
+    assert [item["viewers"] for item in written[f"zeam-recommender:popularity:show:{window}:global"]] == [70]
+    # Empty lists are removed so that the API falls back to coarser segments
+    assert f"zeam-recommender:popularity:vod:{window}:501:p3" not in written
+    assert sorted(call[0][0] for call in publisher.unpublish.call_args_list) == [
+        f"zeam-recommender:popularity:show:{window}:777",
+        f"zeam-recommender:popularity:vod:{window}:501:p3",
+    ]
+
+    mock_advance_many.assert_called_once_with(
+        AliasKind.POPULARITY, ["501:p3", "501", "global:p3", "global"], "2025-01-06 00:00:00", "2025-01-12 23:59:59"
+    )
+    mock_advance.assert_called_once_with(AliasKind.POPULARITY_CUBE, "all", "2025-01-06 00:00:00", "2025-01-12 23:59:59")
+    assert result["segments"] == 4
+    assert result["rows_count"] == 5
+
+
+def test_cube_segments_follow_grouping_flags():
+    from zeam.worker_registry.content_popularity import group_rows_by_segment
+
+    rows = [
+        _cube_row(501, 3, "show", 1, 10),
+        # Rolled up platform: whatever the column holds, the row belongs to the DMA segment
+        {**_cube_row(501, None, "show", 1, 20), "client_platform_id": 3},
+    ]
+
+    assert sorted(group_rows_by_segment(rows), key=str) == [(501, 3), (501, None)]
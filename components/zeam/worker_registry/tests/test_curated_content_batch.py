@@ -0,0 +1,63 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from zeam.worker_registry.curated_content import run_curated_content_batch
+
+
+@patch("zeam.worker_registry.curated_content.BatchPublisher")
+@patch("zeam.worker_registry.curated_content.get_results")
+def test_batch_runs_jobs_concurrently(mock_get_results, mock_publisher_cls):
+    publisher = MagicMock()
+    mock_publisher_cls.return_value.__enter__.return_value = publisher
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_query(start_date, end_date, dma_id, limit, statement_timeout_ms=None):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return [{"show_id": dma_id}]
+
+    mock_get_results.side_effect = slow_query
+    jobs = [{"start_date": "2025-01-01", "end_date": "2025-01-07", "dma_id": dma_id} for dma_id in range(1, 9)]
+
+    result = run_curated_content_batch(jobs, max_concurrency=4)
+
+    assert result["status"] == "success"
+    assert result["jobs"] == 8
+    assert result["rows_count"] == 8
+    assert peak == 4
+    published_keys = sorted(call[0][0] for call in publisher.publish.call_args_list)
+    assert published_keys[0] == "zeam-recommender:popularity:curated:{2025-01-01:2025-01-07}:1"
+    assert len(published_keys) == 8
+
+
+@patch("zeam.worker_registry.curated_content.BatchPublisher")
+@patch("zeam.worker_registry.curated_content.get_results")
+def test_batch_reports_failed_jobs(mock_get_results, mock_publisher_cls):
+    mock_publisher_cls.return_value.__enter__.return_value = MagicMock()
+
+    def query(start_date, end_date, dma_id, limit, statement_timeout_ms=None):
+        if dma_id == 2:
+            raise RuntimeError("warehouse error")
+        return []
+
+    mock_get_results.side_effect = query
+    jobs = [{"start_date": "2025-01-01", "end_date": "2025-01-07", "dma_id": dma_id} for dma_id in (1, 2, 3)]
+
+    progress = []
+    result = run_curated_content_batch(jobs, max_concurrency=2, on_progress=progress.append)
+
+    assert result["status"] == "partial"
+    assert result["failed"] == 1
+    failed = [job for job in result["results"] if job["status"] == "failed"]
+    assert failed[0]["error"] == "warehouse error"
+    # Every job is reported as it finishes, failed ones included
+    assert sorted(job["args"]["dma_id"] for job in progress) == [1, 2, 3]
@@ -0,0 +1,129 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from zeam.worker_registry.dedup import RunInFlight, args_hash, normalize_datetime, run_deduplicated
+
+ARGS = {"start_date": "2025-01-01 00:00:00", "end_date": "2025-01-07 23:59:59", "dma_id": None, "item_count": 10}
+KEY = "zeam-recommender:popularity:curated:{2025-01-01:2025-01-07}:global"
+
+
+def test_args_are_normalised():
+    assert normalize_datetime("2025-01-01") == "2025-01-01 00:00:00"
+    assert normalize_datetime(" 2025-01-01T08:30:00 ") == "2025-01-01 08:30:00"
+    assert args_hash(ARGS) == args_hash(dict(reversed(list(ARGS.items()))))
+
+
+@pytest.fixture
+def redis_state():
+    state = {"holder": None, "result": None, "published": True}
+
+    def acquire(key, holder, ttl, role=None):
+        if state["holder"] is None:
+            state["holder"] = holder
+            return None
+        return state["holder"]
+
+    def release(key, holder, role=None):
+        if state["holder"] == holder:
+            state["holder"] = None
+
+    with patch("zeam.worker_registry.dedup.acquire_marker", side_effect=acquire), \
+            patch("zeam.worker_registry.dedup.release_marker", side_effect=release), \
+            patch("zeam.worker_registry.dedup._is_published", side_effect=lambda key: state["published"]), \
+            patch("zeam.worker_registry.dedup._last_result", side_effect=lambda key: state["result"]), \
+            patch("zeam.worker_registry.dedup._store_result", side_effect=lambda key, result: state.update(result={**result, "completed_at": time.time()})):
+        yield state
+
+
+def test_runs_and_stores_result(redis_state):
+    run = MagicMock(return_value={"status": "success", "run_id": "a"})
+
+    result = run_deduplicated("task", ARGS, KEY, run, run_id="a", policy="join")
+
+    assert result == {"status": "success", "run_id": "a"}
+    assert redis_state["result"]["run_id"] == "a"
+    assert redis_state["holder"] is None
+
+
+def test_fresh_result_is_reused(redis_state):
+    redis_state["result"] = {"status": "success", "run_id": "a", "completed_at": time.time() - 5}
+    run = MagicMock()
+
+    result = run_deduplicated("task", ARGS, KEY, run, run_id="b", policy="join")
+
+    run.assert_not_called()
+    assert result["run_id"] == "a"
+    assert result["deduplicated"] is True
+    assert result["reason"] == "fresh"
+
+
+def test_stale_or_unpublished_result_runs_again(redis_state):
+    run = MagicMock(return_value={"status": "success", "run_id": "b"})
+
+    redis_state["result"] = {"status": "success", "run_id": "a", "completed_at": time.time() - 3600}
+    assert run_deduplicated("task", ARGS, KEY, run, run_id="b", policy="skip")["run_id"] == "b"
+
+    redis_state["result"] = {"status": "success", "run_id": "a", "completed_at": time.time()}
+    redis_state["published"] = False
+    assert run_deduplicated("task", ARGS, KEY, run, run_id="c", policy="skip")["run_id"] == "b"
+    assert run.call_count == 2
+
+
+def test_result_of_other_arguments_is_not_reused(redis_state):
+    results = {}
+    with patch("zeam.worker_registry.dedup._last_result", side_effect=lambda key: results.get(key)), \
+            patch("zeam.worker_registry.dedup._store_result", side_effect=lambda key, result: results.update({key: {**result, "completed_at": time.time()}})):
+        run_deduplicated("task", ARGS, KEY, MagicMock(return_value={"run_id": "a"}), run_id="a", policy="skip")
+        run = MagicMock(return_value={"run_id": "b"})
+
+        result = run_deduplicated("task", {**ARGS, "item_count": 30}, KEY, run, run_id="b", policy="skip")
+
+    run.assert_called_once()
+    assert result["run_id"] == "b"
+
+
+def test_skip_returns_while_in_flight(redis_state):
+    redis_state["holder"] = "a"
+    run = MagicMock()
+
+    result = run_deduplicated("task", ARGS, KEY, run, run_id="b", policy="skip")
+
+    run.assert_not_called()
+    assert result["reason"] == "in_flight"
+    assert result["in_flight_run_id"] == "a"
+
+
+def test_join_retries_until_run_in_flight_finishes(redis_state):
+    redis_state["holder"] = "a"
+    run = MagicMock()
+
+    with pytest.raises(RunInFlight) as raised:
+        run_deduplicated("task", ARGS, KEY, run, run_id="b", policy="join")
+    assert raised.value.run_id == "a"
+    assert raised.value.result["reason"] == "join_timeout"
+
+    # The retry finds the result of the run it joined
+    redis_state.update(holder=None, result={"status": "success", "run_id": "a", "rows_count": 3, "completed_at": time.time()})
+    result = run_deduplicated("task", ARGS, KEY, run, run_id="b", policy="join")
+
+    run.assert_not_called()
+    assert result["reason"] == "fresh"
+    assert result["rows_count"] == 3
+
+
+def test_force_runs_despite_fresh_result(redis_state):
+    redis_state["result"] = {"status": "success", "run_id": "a", "completed_at": time.time()}
+    redis_state["holder"] = "a"
+    run = MagicMock(return_value={"status": "success", "run_id": "b"})
+
+    result = run_deduplicated("task", ARGS, KEY, run, run_id="b", policy="force")
+
+    run.assert_called_once()
+    assert result["run_id"] == "b"
+
+
+def test_unknown_policy(redis_state):
+    with pytest.raises(ValueError):
+        run_deduplicated("task", ARGS, KEY, MagicMock(), policy="maybe")
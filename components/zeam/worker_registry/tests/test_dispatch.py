@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from zeam.worker_registry.dispatch import _task_state, expand_job_args
+
+
+def test_expand_dmas_by_weekly_windows():
+    jobs = expand_job_args({"item_count": 5}, dma_ids=[501, None], start_date="2025-01-01", end_date="2025-01-10")
+
+    assert jobs == [
+        {"item_count": 5, "start_date": "2025-01-01 00:00:00", "end_date": "2025-01-07 23:59:59", "dma_id": 501},
+        {"item_count": 5, "start_date": "2025-01-01 00:00:00", "end_date": "2025-01-07 23:59:59", "dma_id": None},
+        {"item_count": 5, "start_date": "2025-01-08 00:00:00", "end_date": "2025-01-10 23:59:59", "dma_id": 501},
+        {"item_count": 5, "start_date": "2025-01-08 00:00:00", "end_date": "2025-01-10 23:59:59", "dma_id": None},
+    ]
+
+
+def test_expand_without_dates_keeps_args():
+    assert expand_job_args({"start_date": "x"}, dma_ids=[1, 2]) == [
+        {"start_date": "x", "dma_id": 1},
+        {"start_date": "x", "dma_id": 2},
+    ]
+    assert expand_job_args({"a": 1}) == [{"a": 1}]
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"start_date": "2025-01-01"},
+    {"start_date": "2025-01-10", "end_date": "2025-01-01"},
+    {"start_date": "2025-01-01", "end_date": "2025-01-07", "window_days": 0},
+    {"start_date": "2020-01-01", "end_date": "2025-01-01", "window_days": 1},
+])
+def test_expand_rejects_invalid_ranges(kwargs):
+    with pytest.raises(ValueError):
+        expand_job_args({}, **kwargs)
+
+
+def test_task_state_from_backend_meta():
+    assert _task_state("a", None) == {"task_id": "a", "status": "PENDING"}
+
+    success = _task_state("b", json.dumps({"status": "SUCCESS", "result": {"rows_count": 3}, "date_done": "2025-01-01T00:00:00"}))
+    assert success["result"] == {"rows_count": 3}
+
+    failure = _task_state("c", json.dumps({"status": "FAILURE", "result": {"exc_type": "ValueError", "exc_message": ["boom"]}}))
+    assert failure["error"] == ["boom"]
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from zeam.worker_registry.ledger import LEDGER_KEY, _parse_entry, mark_run_started, record_finished_run
+
+
+@patch("zeam.worker_registry.ledger.sync_client_context")
+def test_finished_run_is_appended_to_capped_stream(mock_context):
+    client = MagicMock()
+    mock_context.return_value.__enter__.return_value = client
+    task = SimpleNamespace(name="workers.curated_content_popularity")
+
+    mark_run_started(task_id="t1")
+    record_finished_run(task_id="t1", task=task, kwargs={"dma_id": 501}, retval={"rows_count": 7}, state="SUCCESS")
+
+    key, entry = client.xadd.call_args[0]
+    assert key == LEDGER_KEY
+    assert entry["task"] == "workers.curated_content_popularity"
+    assert entry["run_id"] == "t1"
+    assert entry["status"] == "success"
+    assert entry["rows"] == 7
+    assert len(entry["args_hash"]) == 16
+    assert client.xadd.call_args[1] == {"maxlen": 10000, "approximate": True}
+
+
+@patch("zeam.worker_registry.ledger.sync_client_context")
+def test_failed_run_records_error(mock_context):
+    client = MagicMock()
+    mock_context.return_value.__enter__.return_value = client
+
+    mark_run_started(task_id="t2")
+    record_finished_run(task_id="t2", task=SimpleNamespace(name="w"), kwargs={}, retval=ValueError("bad date"), state="FAILURE")
+
+    entry = client.xadd.call_args[0][1]
+    assert entry["status"] == "failure"
+    assert entry["error"] == "ValueError: bad date"
+    assert "rows" not in entry
+
+
+@patch("zeam.worker_registry.ledger.sync_client_context")
+def test_run_without_start_is_ignored(mock_context):
+    record_finished_run(task_id="unknown", task=SimpleNamespace(name="w"), kwargs={}, retval=None, state="SUCCESS")
+
+    mock_context.assert_not_called()
+
+
+def test_parse_entry():
+    run = _parse_entry("1735689600000-0", {"task": "w", "run_id": "t1", "args_hash": "abc", "duration_ms": "1500", "status": "success", "rows": "7"})
+
+    assert run == {
+        "finished_at": 1735689600.0,
+        "task": "w",
+        "run_id": "t1",
+        "args_hash": "abc",
+        "duration_ms": 1500,
+        "status": "success",
+        "rows": 7,
+    }
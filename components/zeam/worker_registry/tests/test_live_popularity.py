@@ -0,0 +1,120 @@
+import math
+from unittest.mock import MagicMock
+
+import pytest
+
+from zeam.config.core import settings
+from zeam.worker_registry.live_popularity import (
+    TITLES_KEY,
+    _merge_generations,
+    _parse_stream_fields,
+    forward_decayed_weight,
+    generation_of,
+    get_live_scores_key,
+    get_live_viewers_key,
+    queue_events,
+)
+
+DAY = 86400
+# Noon of a generation, so an hour either side stays within it
+NOW = 20000 * DAY + DAY / 2
+
+
+def test_weight_halves_every_half_life():
+    generation = generation_of(NOW)
+
+    recent = forward_decayed_weight(NOW, generation)
+    hour_ago = forward_decayed_weight(NOW - 3600, generation)
+
+    assert hour_ago / recent == pytest.approx(0.5)
+    assert forward_decayed_weight(NOW, generation, weight=3.0) == pytest.approx(3 * recent)
+
+
+def test_keys_are_tagged_by_segment():
+    assert get_live_scores_key("show", 20000, 501) == "zeam-recommender:live:{501}:show:20000"
+    assert get_live_scores_key("show", 20000) == "zeam-recommender:live:{global}:show:20000"
+    assert get_live_viewers_key("show", 20000, "42") == "zeam-recommender:live:{global}:show:20000:viewers:42"
+
+
+def test_events_update_dma_and_global_segments():
+    pipe = MagicMock()
+    events = [
+        {"content_id": "42", "content_type": "show", "title": "News", "dma_id": 501, "device_id": "d1", "timestamp": NOW},
+        {"content_id": "42", "content_type": "show", "timestamp": NOW},
+    ]
+
+    accepted = queue_events(pipe, events, now=NOW)
+
+    assert accepted == 2
+    increments = {(call.args[0], call.args[2]) for call in pipe.zincrby.call_args_list}
+    assert increments == {
+        ("zeam-recommender:live:{501}:show:20000", "42"),
+        ("zeam-recommender:live:{global}:show:20000", "42"),
+    }
+    assert pipe.zincrby.call_count == 3
+    viewers = {call.args for call in pipe.pfadd.call_args_list}
+    assert viewers == {
+        ("zeam-recommender:live:{501}:show:20000:viewers:42", "d1"),
+        ("zeam-recommender:live:{global}:show:20000:viewers:42", "d1"),
+    }
+    # Each key gets its expiry once per batch, at the end of the next generation
+    expiries = {call.args[0]: call.args[1] for call in pipe.expireat.call_args_list if ":live:" in call.args[0]}
+    assert len(expiries) == 4
+    assert set(expiries.values()) == {20002 * DAY}
+    pipe.hset.assert_called_once_with(TITLES_KEY, mapping={"show:42": "News"})
+    # The device's view goes to its watched filter
+    assert pipe.execute_command.call_args.args[:2] == ("BITFIELD", f"zeam-recommender:seen:{{d1}}:{int(NOW // (7 * DAY))}")
+
+
+def test_unknown_old_and_future_events():
+    pipe = MagicMock()
+    events = [
+        {"content_id": "1", "content_type": "podcast"},
+        {"content_id": "2", "content_type": "vod", "timestamp": NOW - 2 * DAY},
+        {"content_id": "3", "content_type": "vod", "timestamp": NOW + 3600},
+    ]
+
+    accepted = queue_events(pipe, events, now=NOW)
+
+    assert accepted == 1
+    key, increment, content_id = pipe.zincrby.call_args.args
+    assert content_id == "3"
+    assert increment == pytest.approx(forward_decayed_weight(NOW, generation_of(NOW)))
+    pipe.hset.assert_not_called()
+
+
+def test_non_finite_events_are_dropped_and_weights_capped():
+    pipe = MagicMock()
+    events = [
+        {"content_id": "1", "content_type": "show", "timestamp": math.nan},
+        {"content_id": "2", "content_type": "show", "timestamp": -math.inf},
+        {"content_id": "3", "content_type": "show", "weight": math.inf},
+        {"content_id": "4", "content_type": "show", "timestamp": NOW, "weight": 10 ** 9},
+    ]
+
+    accepted = queue_events(pipe, events, now=NOW)
+
+    assert accepted == 1
+    key, increment, content_id = pipe.zincrby.call_args.args
+    assert content_id == "4"
+    assert increment == pytest.approx(forward_decayed_weight(NOW, generation_of(NOW), settings.LIVE_MAX_EVENT_WEIGHT))
+
+
+def test_previous_generation_is_scaled_to_current_landmark():
+    # With a one hour half-life, a day-old landmark weighs 2 ** -24
+    merged = _merge_generations([("a", 1.0)], [("a", 2.0 ** 24), ("b", 3 * 2.0 ** 24)], limit=2)
+
+    assert merged == [("b", pytest.approx(3.0)), ("a", pytest.approx(2.0))]
+
+
+def test_parse_stream_fields():
+    fields = {"content_id": "42", "content_type": "show", "dma_id": "501", "timestamp": "1735689600.5", "weight": "2"}
+
+    assert _parse_stream_fields(fields) == {
+        "content_id": "42",
+        "content_type": "show",
+        "dma_id": 501,
+        "timestamp": 1735689600.5,
+        "weight": 2.0,
+    }
+    assert _parse_stream_fields(None) == {}
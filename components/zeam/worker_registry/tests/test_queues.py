@@ -0,0 +1,64 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from zeam.worker_registry.core import WorkerNames
+from zeam.worker_registry.queues import (
+    QueueNames,
+    _wait_stats,
+    get_celery_queue_config,
+    get_send_options,
+    get_worker_concurrency,
+    record_wait_time,
+    stamp_enqueued_at,
+)
+
+
+def test_every_worker_is_routed():
+    routes = get_celery_queue_config()["task_routes"]
+    assert routes[WorkerNames.CURATED_CONTENT_POPULARITY] == {"queue": QueueNames.SCHEDULED}
+    assert routes[WorkerNames.CONTENT_POPULARITY] == {"queue": QueueNames.SCHEDULED}
+
+
+def test_send_options():
+    assert get_send_options(WorkerNames.CONTENT_POPULARITY) == {"queue": "scheduled", "priority": 5}
+    assert get_send_options(WorkerNames.CONTENT_POPULARITY, "interactive") == {"queue": "interactive", "priority": 0}
+    with pytest.raises(ValueError):
+        get_send_options(WorkerNames.CONTENT_POPULARITY, "nope")
+
+
+def test_worker_concurrency_sums_queues():
+    assert get_worker_concurrency([QueueNames.INTERACTIVE, QueueNames.BACKFILL]) == 4
+
+
+def test_stamp_enqueued_at_keeps_existing_value():
+    headers = {"enqueued_at": 1.0}
+    stamp_enqueued_at(headers=headers)
+    assert headers["enqueued_at"] == 1.0
+
+    headers = {}
+    stamp_enqueued_at(headers=headers)
+    assert headers["enqueued_at"] <= time.time()
+
+
+@patch("zeam.worker_registry.queues.sync_client_context")
+def test_record_wait_time(mock_context):
+    client = MagicMock()
+    mock_context.return_value.__enter__.return_value = client
+    task = SimpleNamespace(request=SimpleNamespace(enqueued_at=time.time() - 2, delivery_info={"routing_key": "interactive"}))
+
+    record_wait_time(task=task)
+
+    pipe = client.pipeline.return_value
+    key, wait_ms = pipe.lpush.call_args[0]
+    assert key == "zeam-recommender:queues:wait:interactive"
+    assert 2000 <= wait_ms < 3000
+    pipe.ltrim.assert_called_once_with(key, 0, 999)
+
+
+def test_wait_stats():
+    assert _wait_stats([])["samples"] == 0
+    stats = _wait_stats([str(value) for value in range(1, 101)])
+    assert stats == {"samples": 100, "p50_ms": 50, "p95_ms": 96, "max_ms": 100}
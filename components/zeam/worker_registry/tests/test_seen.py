@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock
+
+from zeam.worker_registry.seen import drop_seen, get_seen_key, period_of, queue_seen, seen_filter, seen_item
+
+WEEK = 7 * 86400
+NOW = 3000 * WEEK + 3600
+
+
+def test_views_are_written_once_per_device_and_period():
+    pipe = MagicMock()
+    views = [
+        ("d1", seen_item("show", "1"), NOW),
+        ("d1", seen_item("vod", "2"), NOW),
+        ("d1", seen_item("show", "3"), NOW - 2 * 3600),
+        ("d2", seen_item("show", "1"), NOW),
+    ]
+
+    queue_seen(pipe, views)
+
+    keys = [call.args[1] for call in pipe.execute_command.call_args_list]
+    assert keys == [get_seen_key("d1", 3000), get_seen_key("d1", 2999), get_seen_key("d2", 3000)]
+    expiries = {call.args[0]: call.args[1] for call in pipe.expireat.call_args_list}
+    assert expiries[get_seen_key("d1", 3000)] == 3002 * WEEK
+    assert period_of(NOW) == 3000
+
+
+def test_seen_key_is_tagged_by_device():
+    assert get_seen_key("abc", 3000) == "zeam-recommender:seen:{abc}:3000"
+
+
+def test_drop_seen():
+    bitmap = bytearray(seen_filter.bits // 8)
+    for offset in seen_filter.positions(seen_item("show", "1")):
+        bitmap[offset // 8] |= 0x80 >> (offset % 8)
+    items = [{"id": "1", "type": "show", "title": "A"}, {"id": "2", "type": "show", "title": "B"}]
+
+    assert drop_seen(items, bytes(bitmap)) == [items[1]]
+    assert drop_seen(items, b"") == items
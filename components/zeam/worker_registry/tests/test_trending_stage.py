@@ -0,0 +1,59 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from zeam.worker_registry.trending import get_published_dmas, get_trending_redis_key, previous_window, run_trending_task, window_days
+
+WEEK = ("2025-01-06 00:00:00", "2025-01-12 23:59:59")
+
+
+def test_previous_window_has_the_same_length():
+    assert previous_window(*WEEK) == ("2024-12-30 00:00:00", "2025-01-05 23:59:59")
+    assert previous_window("2025-01-10", "2025-01-10") == ("2025-01-09 00:00:00", "2025-01-09 23:59:59")
+
+
+def test_window_days_of_a_window_in_progress():
+    assert window_days(*WEEK, now=datetime(2025, 1, 9, 12)) == 3.5
+    assert window_days(*WEEK, now=datetime(2025, 1, 6, 2)) == 1.0
+    assert window_days(*WEEK, now=datetime(2025, 2, 1)) == 7
+
+
+def test_trending_key_shares_the_curated_window_tag():
+    assert get_trending_redis_key(*WEEK, 501) == "zeam-recommender:popularity:trending:{2025-01-06:2025-01-12}:501"
+
+
+@patch("zeam.worker_registry.trending.sync_client_context")
+def test_published_dmas_skip_version_keys(mock_context):
+    client = MagicMock()
+    client.scan_iter.return_value = [
+        "zeam-recommender:popularity:curated:{2025-01-06:2025-01-12}:501",
+        "zeam-recommender:popularity:curated:{2025-01-06:2025-01-12}:501:v:abc",
+        "zeam-recommender:popularity:curated:{2025-01-06:2025-01-12}:global",
+    ]
+    mock_context.return_value.__enter__.return_value = client
+
+    assert get_published_dmas(*WEEK) == [None, 501]
+    assert client.scan_iter.call_args[1]["match"] == "zeam-recommender:popularity:curated:{2025-01-06:2025-01-12}:*"
+
+
+@patch("zeam.worker_registry.trending.BatchPublisher")
+@patch("zeam.worker_registry.trending.read_many_json")
+def test_trending_task_reads_both_windows_in_one_call(mock_read, mock_publisher_cls):
+    publisher = mock_publisher_cls.return_value.__enter__.return_value
+    current = [{"show_id": 1, "show_title": "Rising", "viewers": 400}, {"show_id": 2, "show_title": "Steady", "viewers": 300}]
+    previous = [{"show_id": 2, "show_title": "Steady", "viewers": 300}, {"show_id": 1, "show_title": "Rising", "viewers": 100}]
+    mock_read.return_value = [current, None, previous, previous]
+
+    result = run_trending_task(*WEEK, dma_ids=[501, 502])
+
+    keys = mock_read.call_args[0][0]
+    assert keys == [
+        "zeam-recommender:popularity:curated:{2025-01-06:2025-01-12}:501",
+        "zeam-recommender:popularity:curated:{2025-01-06:2025-01-12}:502",
+        "zeam-recommender:popularity:curated:{2024-12-30:2025-01-05}:501",
+        "zeam-recommender:popularity:curated:{2024-12-30:2025-01-05}:502",
+    ]
+    published = {call[0][0]: call[0][1] for call in publisher.publish.call_args_list}
+    assert [item["id"] for item in published[get_trending_redis_key(*WEEK, 501)]] == ["1"]
+    assert published[get_trending_redis_key(*WEEK, 502)] is None
+    assert result["segments"] == 2
+    assert result["rows_count"] == 1
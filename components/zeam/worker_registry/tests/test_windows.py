@@ -0,0 +1,15 @@
+from datetime import datetime, timezone
+
+from zeam.worker_registry.windows import current_week_window, seconds_until_next_refresh
+
+
+def test_current_week_window():
+    assert current_week_window(datetime(2025, 1, 8, 15, 30)) == ("2025-01-06 00:00:00", "2025-01-12 23:59:59")
+    assert current_week_window(datetime(2025, 1, 6, 0, 0)) == ("2025-01-06 00:00:00", "2025-01-12 23:59:59")
+
+
+def test_seconds_until_next_refresh():
+    now = datetime(2025, 1, 6, 10, 59, 30, tzinfo=timezone.utc)
+    assert seconds_until_next_refresh(now, interval_minutes=60) == 30
+    assert seconds_until_next_refresh(now, interval_minutes=15) == 30
+    assert seconds_until_next_refresh(now.replace(minute=0, second=0), interval_minutes=60) == 3600
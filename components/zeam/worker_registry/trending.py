@@ -0,0 +1,109 @@
+"""
+Trending shows, derived from published curated content popularity.
+
+The stage reads the curated lists of a window and of the window of the same
+length just before it, for every DMA at once, and publishes the shows whose
+viewers grow fastest under the trending keys. No warehouse query is run.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from zeam.analytics.trending import rank_trending
+from zeam.config.core import settings
+from zeam.redis_client import BatchPublisher, read_many_json, sync_client_context
+from zeam.worker_registry.content_popularity import get_segment_suffix
+from zeam.worker_registry.curated_content import get_curated_content_redis_key
+from zeam.worker_registry.windows import DATETIME_FORMAT, current_week_window, window_hash_tag
+
+logger = logging.getLogger(__name__)
+
+# The current window counts as at least this much data, so that its first
+# hours don't turn small counts into large daily rates
+MIN_CURRENT_DAYS = 1.0
+
+
+def get_trending_redis_key(start_date: str, end_date: str, dma_id: Optional[int] = None) -> str:
+    """Redis key of the trending shows of a window, hash-tagged like the curated keys it comes from."""
+    return f"zeam-recommender:popularity:trending:{window_hash_tag(start_date, end_date)}:{get_segment_suffix(dma_id)}"
+
+
+def previous_window(start_date: str, end_date: str) -> Tuple[str, str]:
+    """The window of as many days as start_date to end_date, ending the day before start_date."""
+    first = datetime.fromisoformat(start_date.strip()[:10])
+    days = (datetime.fromisoformat(end_date.strip()[:10]) - first).days + 1
+    previous_start = first - timedelta(days=days)
+    previous_end = (first - timedelta(days=1)).replace(hour=23, minute=59, second=59)
+    return previous_start.strftime(DATETIME_FORMAT), previous_end.strftime(DATETIME_FORMAT)
+
+
+def window_days(start_date: str, end_date: str, now: Optional[datetime] = None) -> float:
+    """Days of data in a window by `now`, between MIN_CURRENT_DAYS and its length."""
+    first = datetime.fromisoformat(start_date.strip()[:10])
+    length = (datetime.fromisoformat(end_date.strip()[:10]) - first).days + 1
+    elapsed = ((now or datetime.now()) - first).total_seconds() / 86400
+    return min(max(elapsed, MIN_CURRENT_DAYS), length)
+
+
+def get_published_dmas(start_date: str, end_date: str) -> List[Optional[int]]:
+    """DMAs (None for global) with a curated list published for a window."""
+    prefix = get_curated_content_redis_key(start_date, end_date).rsplit(":", 1)[0] + ":"
+    dma_ids = set()
+    with sync_client_context() as client:
+        for key in client.scan_iter(match=f"{prefix}*", count=1000):
+            segment = key[len(prefix):]
+            # Skip the version keys of published lists
+            if ":" not in segment:
+                dma_ids.add(None if segment == "global" else int(segment))
+    return sorted(dma_ids, key=lambda dma_id: dma_id or 0)
+
+
+def run_trending_task(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    dma_ids: Optional[List[Optional[int]]] = None,
+    item_count: int = 10,
+    run_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Publishes the trending shows of a window (default the current week) for
+    `dma_ids` (default every DMA with a curated list in that window), from
+    its curated lists and those of the previous window.
+    """
+    if not start_date or not end_date:
+        start_date, end_date = current_week_window()
+    previous_start, previous_end = previous_window(start_date, end_date)
+    logger.info(f"Running trending task for period {start_date} to {end_date} against {previous_start} to {previous_end}. Run ID: {run_id}")
+
+    started = time.monotonic()
+    dma_ids = dma_ids if dma_ids is not None else get_published_dmas(start_date, end_date)
+    keys = [get_curated_content_redis_key(start_date, end_date, dma_id) for dma_id in dma_ids]
+    keys += [get_curated_content_redis_key(previous_start, previous_end, dma_id) for dma_id in dma_ids]
+    lists = read_many_json(keys)
+    segments = [get_segment_suffix(dma_id) for dma_id in dma_ids]
+    current = dict(zip(segments, lists[:len(dma_ids)]))
+    previous = dict(zip(segments, lists[len(dma_ids):]))
+
+    ranked = rank_trending(
+        current,
+        previous,
+        window_days(start_date, end_date),
+        window_days(previous_start, previous_end),
+        item_count,
+        settings.TRENDING_MIN_VIEWERS,
+        settings.TRENDING_PRIOR_VIEWERS,
+    )
+    with BatchPublisher() as publisher:
+        for dma_id, segment in zip(dma_ids, segments):
+            publisher.publish(get_trending_redis_key(start_date, end_date, dma_id), ranked.get(segment))
+
+    return {
+        "status": "success",
+        "args": {"start_date": start_date, "end_date": end_date, "item_count": item_count},
+        "run_id": run_id,
+        "segments": len(dma_ids),
+        "segments_ranked": len(ranked),
+        "rows_count": sum(len(items) for items in ranked.values()),
+        "duration_seconds": round(time.monotonic() - started, 3),
+    }
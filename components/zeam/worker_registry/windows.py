@@ -0,0 +1,45 @@
+"""
+Time window helpers shared by the workers and the API.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from zeam.config.core import settings
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def current_week_window(now: Optional[datetime] = None) -> Tuple[str, str]:
+    """
+    Returns the (start, end) strings of the week containing `now`,
+    from Monday 00:00:00 to Sunday 23:59:59.
+    """
+    now = now or datetime.now()
+    start_of_week = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_week = (start_of_week + timedelta(days=6)).replace(hour=23, minute=59, second=59)
+    return start_of_week.strftime(DATETIME_FORMAT), end_of_week.strftime(DATETIME_FORMAT)
+
+
+def previous_week_window(now: Optional[datetime] = None) -> Tuple[str, str]:
+    """Returns the (start, end) strings of the week before the one containing `now`."""
+    return current_week_window((now or datetime.now()) - timedelta(days=7))
+
+
+def window_hash_tag(start_date: str, end_date: str) -> str:
+    """
+    Redis Cluster hash tag of a window, "{YYYY-MM-DD:YYYY-MM-DD}".
+    Every key of one window carries it, so they share a slot and can be read
+    in one multi-key call or pipeline.
+    """
+    return "{" + start_date.split(' ')[0] + ":" + end_date.split(' ')[0] + "}"
+
+
+def seconds_until_next_refresh(now: Optional[datetime] = None, interval_minutes: Optional[int] = None) -> int:
+    """
+    Returns the number of seconds until the next scheduled worker refresh.
+    Refreshes run every WORKER_INTERVAL_MINUTES, aligned to midnight UTC.
+    """
+    now = now or datetime.now(timezone.utc)
+    interval = (interval_minutes or settings.WORKER_INTERVAL_MINUTES) * 60
+    seconds_since_midnight = now.hour * 3600 + now.minute * 60 + now.second
+    return interval - seconds_since_midnight % interval
@@ -0,0 +1,103 @@
+"""
+Benchmark API cold start: app import time and time-to-first-request.
+
+Each measurement runs in a fresh interpreter. The production server
+(`python -m zeam.api`) is started with one worker on a free port and polled
+until /api/health answers. Exits non-zero when a budget is exceeded, so it
+can gate CI.
+
+    PYTHONPATH=bases:components uv run --project development/zeam/dev \
+        python development/zeam/dev/benchmarks/api_startup.py [--runs 5]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+HEAVY_MODULES = ("celery", "kombu", "redshift_connector", "pandas")
+
+IMPORT_PROBE = (
+    "import time, sys; started = time.perf_counter(); import zeam.api.main; "
+    "print(time.perf_counter() - started); "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def _env(**extra):
+    return {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path), **extra}
+
+
+def measure_import():
+    result = subprocess.run([sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, env=_env(), check=True)
+    lines = result.stdout.splitlines()
+    heavy = lines[1].split(",") if len(lines) > 1 else []
+    return float(lines[0]), [module for module in heavy if module]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_request(timeout: float = 30.0):
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "zeam.api"],
+        env=_env(SERVER_HOST="127.0.0.1", SERVER_PORT=str(port), SERVER_WORKERS="1"),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"API did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-seconds", type=float, default=1.5)
+    parser.add_argument("--max-first-request-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    imports, heavy = [], set()
+    for _ in range(args.runs):
+        seconds, modules = measure_import()
+        imports.append(seconds)
+        heavy.update(modules)
+    first_requests = [measure_first_request() for _ in range(args.runs)]
+
+    import_median = statistics.median(imports)
+    first_request_median = statistics.median(first_requests)
+    print(f"import zeam.api.main:   median {import_median * 1000:.0f} ms, max {max(imports) * 1000:.0f} ms")
+    print(f"time to first request:  median {first_request_median * 1000:.0f} ms, max {max(first_requests) * 1000:.0f} ms")
+    print(f"heavy modules imported: {', '.join(sorted(heavy)) or 'none'}")
+
+    failures = []
+    if heavy:
+        failures.append(f"app import pulled in {sorted(heavy)}")
+    if import_median > args.max_import_seconds:
+        failures.append(f"import median {import_median:.2f}s > {args.max_import_seconds}s")
+    if first_request_median > args.max_first_request_seconds:
+        failures.append(f"first request median {first_request_median:.2f}s > {args.max_first_request_seconds}s")
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
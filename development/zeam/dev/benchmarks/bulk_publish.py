@@ -0,0 +1,59 @@
+"""
+Benchmark bulk publishing to Redis in keys/sec and MB/sec.
+
+Synthetic curated results (one key per DMA × weekly window, ~30 rows each)
+are published to the configured Redis cache (`make redis-local`) through
+`publish_many`: one round trip per key, then in pipelined chunks, plain and
+compressed, non-transactional and MULTI. The keys written expire after a
+minute.
+
+    PYTHONPATH=bases:components uv run --project development/zeam/dev \
+        python development/zeam/dev/benchmarks/bulk_publish.py [--keys 20000] [--single-keys 2000]
+"""
+import argparse
+import random
+
+from zeam.redis_client import publish_many
+
+TTL_SECONDS = 60
+
+
+def synthetic_items(count: int, rows: int = 30, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(count):
+        week, dma_id = divmod(i, 210)
+        key = f"zeam-recommender:bench:popularity:curated:{{week-{week}}}:{500 + dma_id}"
+        data = [
+            {"show_id": rng.randrange(100_000), "title": f"Show {rng.randrange(100_000)}", "views": rng.randrange(1_000_000)}
+            for _ in range(rows)
+        ]
+        yield key, data, TTL_SECONDS
+
+
+def report(label: str, keys: int, size: int, seconds: float):
+    print(f"{label:<28} {keys / seconds:>10,.0f} keys/s  {size / seconds / 1e6:>8.1f} MB/s  ({seconds:.2f}s for {keys:,} keys)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keys", type=int, default=20_000)
+    parser.add_argument("--single-keys", type=int, default=2_000, help="Keys published one round trip at a time")
+    args = parser.parse_args()
+
+    stats = publish_many(synthetic_items(args.single_keys), chunk_keys=1)
+    report("one round trip per key", stats["keys"], stats["bytes"], stats["seconds"])
+
+    items = list(synthetic_items(args.keys))
+    for label, options in (
+        ("publish_many", {}),
+        ("publish_many compressed", {"compress": True}),
+        ("publish_many MULTI", {"transaction": True}),
+    ):
+        stats = publish_many(items, **options)
+        report(label, stats["keys"], stats["bytes"], stats["seconds"])
+        if options.get("compress"):
+            print(f"{'':<28} {stats['raw_bytes'] / stats['bytes']:.1f}x compression")
+
+
+if __name__ == "__main__":
+    main()
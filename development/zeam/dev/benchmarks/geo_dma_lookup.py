@@ -0,0 +1,90 @@
+"""
+Benchmark coordinate to DMA lookups against the in-memory spatial index.
+
+Uses a synthetic set of ~210 DMAs tiling the continental US with wavy,
+densely sampled borders (a few thousand vertices each, like real boundaries),
+or a real boundary file when one is given.
+
+    PYTHONPATH=bases:components uv run --project development/zeam/dev \
+        python development/zeam/dev/benchmarks/geo_dma_lookup.py [--file dmas.geojson]
+"""
+import argparse
+import json
+import math
+import random
+import time
+import tracemalloc
+
+from zeam.geo.index import DmaIndex
+
+MIN_LON, MAX_LON = -125.0, -67.0
+MIN_LAT, MAX_LAT = 24.0, 49.0
+
+
+def _border(x0: float, y_from: float, y_to: float, points: int):
+    """A vertical border wobbling around x0, identical for both neighbours."""
+    step = (y_to - y_from) / points
+    return [[x0 + 0.15 * math.sin(7.0 * (y_from + i * step) + x0), y_from + i * step] for i in range(points + 1)]
+
+
+def synthetic_boundaries(columns: int = 15, rows: int = 14, points_per_edge: int = 800):
+    width = (MAX_LON - MIN_LON) / columns
+    height = (MAX_LAT - MIN_LAT) / rows
+    features = []
+    for column in range(columns):
+        for row in range(rows):
+            x_left, x_right = MIN_LON + column * width, MIN_LON + (column + 1) * width
+            y_bottom, y_top = MIN_LAT + row * height, MIN_LAT + (row + 1) * height
+            left = _border(x_left, y_bottom, y_top, points_per_edge) if column else [[x_left, y_bottom], [x_left, y_top]]
+            right = _border(x_right, y_bottom, y_top, points_per_edge) if column < columns - 1 else [[x_right, y_bottom], [x_right, y_top]]
+            ring = [[left[0][0], y_bottom], [right[0][0], y_bottom]] + right[1:] + list(reversed(left))
+            features.append({
+                "type": "Feature",
+                "properties": {"dma_id": 500 + column * rows + row},
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+            })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--file", help="GeoJSON boundary file (default: synthetic DMAs)")
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--cell-degrees", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file) as f:
+            boundaries = json.load(f)
+    else:
+        boundaries = synthetic_boundaries()
+
+    started = time.perf_counter()
+    index = DmaIndex.from_geojson(boundaries, cell_degrees=args.cell_degrees)
+    build_seconds = time.perf_counter() - started
+
+    # Second build under tracemalloc, which slows allocation down too much to time the first one
+    tracemalloc.start()
+    traced = DmaIndex.from_geojson(boundaries, cell_degrees=args.cell_degrees)
+    traced_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+
+    rng = random.Random(42)
+    points = [(rng.uniform(MIN_LAT, MAX_LAT), rng.uniform(MIN_LON, MAX_LON)) for _ in range(args.lookups)]
+
+    lookup = index.lookup
+    started = time.perf_counter()
+    resolved = sum(1 for lat, lon in points if lookup(lat, lon) is not None)
+    elapsed = time.perf_counter() - started
+
+    print(f"polygons:          {len(index)}")
+    print(f"build time:        {build_seconds:.2f} s")
+    print(f"index memory:      {index.memory_bytes() / (1024 * 1024):.1f} MiB estimated, {traced_bytes / (1024 * 1024):.1f} MiB traced")
+    print(f"lookups:           {args.lookups} ({resolved} resolved)")
+    print(f"lookups/sec:       {args.lookups / elapsed:,.0f}")
+    print(f"mean lookup:       {elapsed / args.lookups * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
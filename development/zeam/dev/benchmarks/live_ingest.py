@@ -0,0 +1,91 @@
+"""
+Benchmark live popularity ingest throughput in events/sec.
+
+Synthetic playback events (Zipf-distributed content, ~210 DMAs, a pool of
+devices) are applied in batches: first to a pipeline that is never sent, to
+measure the cost of building the writes, then to the configured Redis cache
+(`make redis-local`), directly and through the ingest stream. The live keys
+written expire with their generation.
+
+    PYTHONPATH=bases:components uv run --project development/zeam/dev \
+        python development/zeam/dev/benchmarks/live_ingest.py [--events 100000] [--batch 500]
+"""
+import argparse
+import math
+import random
+import time
+
+from zeam.config.core import settings
+from zeam.worker_registry.content_popularity import CONTENT_TYPES
+from zeam.worker_registry.live_popularity import append_events, consume_events, ingest_events, queue_events
+
+
+def synthetic_events(count: int, contents: int = 5000, devices: int = 50_000, seed: int = 42):
+    rng = random.Random(seed)
+    # Zipf-like popularity: a few items get most of the views
+    weights = [1 / (rank + 1) for rank in range(contents)]
+    content_ids = rng.choices(range(contents), weights=weights, k=count)
+    now = time.time()
+    return [
+        {
+            "content_id": str(content_id),
+            "content_type": CONTENT_TYPES[content_id % len(CONTENT_TYPES)],
+            "title": f"Title {content_id}",
+            "dma_id": 500 + rng.randrange(210),
+            "device_id": f"device-{rng.randrange(devices)}",
+            "timestamp": now - rng.uniform(0, 600),
+        }
+        for content_id in content_ids
+    ]
+
+
+class NullPipeline:
+    """Accepts and drops pipeline commands."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def batches(events, size):
+    for start in range(0, len(events), size):
+        yield events[start:start + size]
+
+
+def report(label: str, events: int, seconds: float):
+    print(f"{label:<24} {events / seconds:>12,.0f} events/s  ({seconds:.2f}s for {events:,} events)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--skip-redis", action="store_true", help="Only measure building the writes")
+    args = parser.parse_args()
+
+    events = synthetic_events(args.events)
+
+    started = time.perf_counter()
+    for batch in batches(events, args.batch):
+        queue_events(NullPipeline(), batch)
+    report("build writes", len(events), time.perf_counter() - started)
+    if args.skip_redis:
+        return
+
+    started = time.perf_counter()
+    accepted = sum(ingest_events(batch) for batch in batches(events, args.batch))
+    report("direct ingest", accepted, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for batch in batches(events, args.batch):
+        append_events(batch)
+    appended = time.perf_counter() - started
+    report("stream append", len(events), appended)
+
+    started = time.perf_counter()
+    # The consumer first reads its pending entries (none), then LIVE_MAX_BATCH entries per read
+    consumed = consume_events("benchmark", max_reads=1 + math.ceil(len(events) / settings.LIVE_MAX_BATCH))
+    report("stream consume", consumed, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()